@@ -0,0 +1,137 @@
+"""Synthetic Clutch.co profile pages for benchmarks.
+
+Pages follow the markup the parsers understand (Open Graph tags, schema.org
+microdata, review cards) and pad it with the kind of noise real profile pages
+carry - inline scripts, styles, navigation and tracking markup - so parse
+costs are representative. Everything is deterministic for a given seed.
+"""
+
+from __future__ import annotations
+
+import html
+import random
+from typing import Dict, List, Optional
+
+_WORDS = (
+    "agile delivery platform cloud native design product strategy team "
+    "engineering quality budget timeline communication project launch "
+    "mobile web data analytics migration support scalable responsive"
+).split()
+
+_CITIES = (
+    ("Austin", "TX", "US", "78701"),
+    ("Buenos Aires", "CABA", "AR", "C1001"),
+    ("Warsaw", "MZ", "PL", "00-001"),
+    ("Lisbon", "LX", "PT", "1100-001"),
+)
+
+# Named corpus sizes used by the benchmarks: (reviews per page, filler KiB).
+SIZES: Dict[str, tuple] = {
+    "small": (5, 20),
+    "medium": (25, 120),
+    "large": (100, 400),
+}
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[:1].upper() + text[1:] + "."
+
+def _filler(rng: random.Random, kib: int) -> str:
+    """Scripts, styles and navigation markup adding up to about ``kib`` KiB."""
+    parts: List[str] = []
+    size = 0
+    i = 0
+    while size < kib * 1024:
+        if i % 3 == 0:
+            block = "<script>window.__data_%d = %r;</script>" % (
+                i,
+                {"k": [rng.random() for _ in range(20)]},
+            )
+        elif i % 3 == 1:
+            block = "<style>.c%d{margin:%dpx;padding:%dpx}</style>" % (
+                i,
+                rng.randint(0, 40),
+                rng.randint(0, 40),
+            )
+        else:
+            links = "".join(
+                f'<li class="nav__item"><a href="/directory/{rng.choice(_WORDS)}">'
+                f"{rng.choice(_WORDS).title()}</a></li>"
+                for _ in range(10)
+            )
+            block = f'<nav class="nav nav-{i}"><ul>{links}</ul></nav>'
+        parts.append(block)
+        size += len(block)
+        i += 1
+    return "\n".join(parts)
+
+def _review(rng: random.Random, index: int) -> str:
+    return f"""
+  <div class="review-card" itemscope itemtype="http://schema.org/Review">
+    <h3 itemprop="name">{html.escape(_sentence(rng, 4))}</h3>
+    <span itemprop="datePublished">2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</span>
+    <div itemprop="reviewRating" itemscope itemtype="http://schema.org/Rating">
+      <span itemprop="ratingValue">{rng.choice(("3.5", "4.0", "4.5", "5.0"))}</span>
+    </div>
+    <p itemprop="reviewBody">{html.escape(" ".join(_sentence(rng, 15) for _ in range(4)))}</p>
+    <span itemprop="author">Reviewer {index}</span>
+  </div>"""
+
+def profile_page(
+    slug: str,
+    reviews: int = 25,
+    filler_kib: int = 120,
+    review_pages: int = 1,
+    page: int = 0,
+    seed: Optional[int] = None,
+) -> str:
+    """Render one synthetic profile page.
+
+    ``page`` selects which of ``review_pages`` review pages to render; every
+    page links to the others the way Clutch's review pagination does.
+    """
+    rng = random.Random(f"{slug}:{page}" if seed is None else seed)
+    name = slug.replace("-", " ").title()
+    street, region, country, postal = rng.choice(_CITIES)
+    review_html = "".join(_review(rng, page * reviews + i) for i in range(reviews))
+    pager = "".join(
+        f'<a class="page-link" href="/profile/{slug}?page={n}#reviews">{n + 1}</a>'
+        for n in range(review_pages)
+        if n != page
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en"><head>
+  <meta charset="utf-8">
+  <meta property="og:title" content="{html.escape(name)}">
+  <meta property="og:description" content="{html.escape(_sentence(rng, 20))}">
+  <meta property="og:url" content="https://clutch.co/profile/{slug}">
+  <meta property="og:image" content="https://img.clutch.co/logos/{slug}.png">
+  <meta property="og:site_name" content="Clutch">
+  <meta name="csrf-token" content="{rng.getrandbits(64):x}">
+  {_filler(rng, filler_kib // 2)}
+</head><body>
+  <header class="provider-heading"><h1>{html.escape(name)}</h1>
+    <h2>{html.escape(_sentence(rng, 6))}</h2></header>
+  <div class="summary-description">{html.escape(" ".join(_sentence(rng, 12) for _ in range(6)))}</div>
+  <div itemscope itemtype="http://schema.org/AggregateRating">
+    <span itemprop="ratingValue">4.{rng.randint(0, 9)}</span>
+    <span itemprop="reviewCount">{reviews * review_pages}</span>
+  </div>
+  <ul class="quick-facts"><li>Founded {rng.randint(1990, 2022)}</li></ul>
+  <div itemscope itemtype="http://schema.org/PostalAddress">
+    <span itemprop="streetAddress">{rng.randint(1, 999)} Main St</span>
+    <span itemprop="addressLocality">{street}</span>
+    <span itemprop="addressRegion">{region}</span>
+    <span itemprop="addressCountry">{country}</span>
+    <span itemprop="postalCode">{postal}</span>
+  </div>
+  <a class="website-link" href="https://www.{slug}.example">Visit website</a>
+  <section id="reviews">{review_html}</section>
+  <nav class="pagination">{pager}</nav>
+  {_filler(rng, filler_kib - filler_kib // 2)}
+</body></html>"""
+
+def sized_page(size: str, slug: str = "benchmark-co") -> str:
+    """A profile page of one of the named ``SIZES``."""
+    reviews, filler_kib = SIZES[size]
+    return profile_page(slug, reviews=reviews, filler_kib=filler_kib)
@@ -0,0 +1,108 @@
+"""A local stand-in for clutch.co serving synthetic profile pages."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+
+from corpus import profile_page
+
+class MockClutchServer:
+    """Serves ``/profile/<slug>[?page=N]`` with configurable latency and errors.
+
+    Each response waits ``latency`` seconds (plus up to ``jitter``); a
+    fraction ``error_rate`` of requests fail with a 503 carrying
+    ``Retry-After: 0`` so the scraper's retry path is exercised without
+    slowing the run down. Use as a context manager.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        reviews: int = 25,
+        filler_kib: int = 120,
+        review_pages: int = 1,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        @lru_cache(maxsize=4096)
+        def render(slug: str, page: int) -> bytes:
+            return profile_page(
+                slug,
+                reviews=reviews,
+                filler_kib=filler_kib,
+                review_pages=review_pages,
+                page=page,
+            ).encode("utf-8")
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                parts = urlsplit(self.path)
+                with server._lock:
+                    server.requests += 1
+                    delay = server.latency + server._rng.random() * server.jitter
+                    fail = server._rng.random() < server.error_rate
+                    if fail:
+                        server.errors += 1
+                time.sleep(delay)
+                if not parts.path.startswith("/profile/"):
+                    self.send_error(404)
+                    return
+                if fail:
+                    self.send_response(503)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                page = int(parse_qs(parts.query).get("page", ["0"])[0])
+                body = render(parts.path[len("/profile/"):].strip("/"), page)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def profile_urls(self, count: int) -> List[str]:
+        return [f"{self.url}/profile/company-{i}" for i in range(count)]
+
+    def start(self) -> "MockClutchServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockClutchServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,378 @@
+"""Benchmark the parsers and the full scrape, writing results as JSON.
+
+Examples::
+
+    python benchmarks/run_benchmarks.py --output results/baseline.json
+    python benchmarks/run_benchmarks.py --suite e2e --urls 500 --latency 0.05 \
+        --error-rate 0.02 --concurrency 32 --engine async
+    python benchmarks/run_benchmarks.py --suite reparse --archive pages-*.warc.gz
+
+Compare two result files with ``--compare old.json new.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+SRC_DIR = ROOT / "src"
+for path in (SRC_DIR, BENCH_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from corpus import SIZES, profile_page, sized_page  # noqa: E402
+from mock_server import MockClutchServer  # noqa: E402
+from parsers.company_profile_parser import (  # noqa: E402
+    extract_company_profile,
+    parse_company_profile,
+)
+from parsers.document import BACKENDS, build_page  # noqa: E402
+from parsers.reviews_parser import extract_reviews, parse_reviews  # noqa: E402
+from pipelines.normalization import normalize_company_data  # noqa: E402
+
+import main  # noqa: E402
+
+def _timings(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """Time ``func``; each of ``repeat`` samples runs it for at least ``min_time``."""
+    func()  # warm up
+    samples: List[float] = []
+    for _ in range(repeat):
+        loops = 0
+        started = time.perf_counter()
+        while True:
+            func()
+            loops += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        samples.append(elapsed / loops)
+    return {
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_sec": 1.0 / statistics.median(samples),
+        "repeat": repeat,
+    }
+
+def _available_backends() -> List[str]:
+    backends = []
+    for backend in BACKENDS:
+        try:
+            build_page("<html></html>", backend)
+        except RuntimeError:
+            continue
+        backends.append(backend)
+    return backends
+
+def run_micro(repeat: int, min_time: float) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    url = "https://clutch.co/profile/benchmark-co"
+    for size in SIZES:
+        html = sized_page(size)
+        for backend in _available_backends():
+            profile = parse_company_profile(html, url, backend=backend)
+            reviews = parse_reviews(html, backend=backend)
+            cases = {
+                "build_page": lambda: build_page(html, backend),
+                "parse_company_profile": lambda: parse_company_profile(
+                    html, url, backend=backend
+                ),
+                "parse_reviews": lambda: parse_reviews(html, backend=backend),
+                "process_html": lambda: main.process_html(html, url, backend),
+            }
+            for name, func in cases.items():
+                key = f"{name}[{size},{backend}]"
+                results[key] = dict(
+                    _timings(func, repeat, min_time),
+                    page_bytes=len(html.encode("utf-8")),
+                    reviews=len(reviews),
+                )
+                logging.info("%-45s %10.1f ops/s", key, results[key]["ops_per_sec"])
+        key = f"normalize_company_data[{size}]"
+        results[key] = dict(
+            _timings(lambda: normalize_company_data(profile, reviews), repeat, min_time),
+            reviews=len(reviews),
+        )
+        logging.info("%-45s %10.1f ops/s", key, results[key]["ops_per_sec"])
+    return results
+
+def _retained_bytes(build: Callable[[], Any]) -> int:
+    """Memory still allocated by whatever ``build`` returns."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+def run_memory(records: int) -> Dict[str, Any]:
+    """Bytes per record held in memory as nested dicts vs the slotted model."""
+    results: Dict[str, Any] = {}
+    url = "https://clutch.co/profile/benchmark-co"
+    for size in SIZES:
+        # Every record comes from its own page, as in a real run; page
+        # filler does not end up in records, so it is left out.
+        reviews = SIZES[size][0]
+        pages = [
+            build_page(profile_page(f"co-{i}", reviews=reviews, filler_kib=0, seed=i))
+            for i in range(records)
+        ]
+
+        def as_dicts() -> List[Dict[str, Any]]:
+            return [
+                normalize_company_data(parse_company_profile(p, url), parse_reviews(p))
+                for p in pages
+            ]
+
+        def as_models() -> List[Any]:
+            return [
+                normalize_company_data(extract_company_profile(p, url), extract_reviews(p))
+                for p in pages
+            ]
+
+        dict_bytes = _retained_bytes(as_dicts)
+        model_bytes = _retained_bytes(as_models)
+        key = f"record_memory[{size}]"
+        results[key] = {
+            "records": records,
+            "reviews_per_record": reviews,
+            "dict_bytes_per_record": dict_bytes // records,
+            "model_bytes_per_record": model_bytes // records,
+            "saving": round(1.0 - model_bytes / dict_bytes, 3) if dict_bytes else 0.0,
+        }
+        logging.info(
+            "%-45s %8d -> %8d bytes/record (%.0f%% less)",
+            key,
+            results[key]["dict_bytes_per_record"],
+            results[key]["model_bytes_per_record"],
+            100 * results[key]["saving"],
+        )
+    return results
+
+def run_end_to_end(args: argparse.Namespace) -> Dict[str, Any]:
+    reviews, filler_kib = SIZES[args.page_size]
+    server = MockClutchServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        reviews=reviews,
+        filler_kib=filler_kib,
+        review_pages=args.review_pages,
+    )
+    with server, tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        input_path = tmp_dir / "input.json"
+        output_path = tmp_dir / "output.jsonl"
+        settings_path = tmp_dir / "settings.json"
+        input_path.write_text(json.dumps(server.profile_urls(args.urls)), "utf-8")
+        settings_path.write_text(
+            json.dumps(
+                {
+                    "timeout": 30,
+                    "max_retries": 5,
+                    "retry_backoff_base": 0.01,
+                    "max_review_pages": args.review_pages,
+                }
+            ),
+            "utf-8",
+        )
+        started = time.perf_counter()
+        main.run(
+            input_path=input_path,
+            output_path=output_path,
+            settings_path=settings_path,
+            logging_config_path=None,
+            concurrency=args.concurrency,
+            engine=args.engine,
+            parser_backend=args.parser_backend,
+            parse_workers=args.parse_workers,
+            stream=args.stream,
+        )
+        elapsed = time.perf_counter() - started
+        records = 0
+        if output_path.exists():
+            with output_path.open("rb") as f:
+                records = sum(1 for _ in f)
+        run_report = json.loads((tmp_dir / "output.jsonl.metrics.json").read_text("utf-8"))
+
+    result = {
+        "urls": args.urls,
+        "records": records,
+        "elapsed_s": elapsed,
+        "pages_per_sec": records / elapsed if elapsed else 0.0,
+        "requests": server.requests,
+        "injected_errors": server.errors,
+        "stages": run_report["stages"],
+        "config": {
+            "engine": args.engine,
+            "concurrency": args.concurrency,
+            "parser_backend": args.parser_backend,
+            "parse_workers": args.parse_workers,
+            "stream": args.stream,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "page_size": args.page_size,
+            "review_pages": args.review_pages,
+        },
+    }
+    logging.info(
+        "end_to_end: %d/%d records in %.2fs (%.1f pages/s, %d requests)",
+        records,
+        args.urls,
+        elapsed,
+        result["pages_per_sec"],
+        server.requests,
+    )
+    return result
+
+def run_reparse(args: argparse.Namespace) -> Dict[str, Any]:
+    """Re-parse real pages kept with ``--archive-dir``: a reproducible corpus."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / "output.jsonl"
+        started = time.perf_counter()
+        main.reparse(
+            args.archive,
+            output_path,
+            settings_path=None,
+            logging_config_path=None,
+            parser_backend=args.parser_backend,
+            parse_workers=args.parse_workers,
+        )
+        elapsed = time.perf_counter() - started
+        with output_path.open("rb") as f:
+            records = sum(1 for _ in f)
+    result = {
+        "archives": [str(path) for path in args.archive],
+        "records": records,
+        "elapsed_s": elapsed,
+        "pages_per_sec": records / elapsed if elapsed else 0.0,
+        "config": {
+            "parser_backend": args.parser_backend,
+            "parse_workers": args.parse_workers,
+        },
+    }
+    logging.info("reparse: %d records in %.2fs (%.1f pages/s)", records, elapsed,
+                 result["pages_per_sec"])
+    return result
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def compare(old_path: Path, new_path: Path) -> None:
+    """Print the median-time change of every micro-benchmark in both files."""
+    old = json.loads(old_path.read_text("utf-8"))
+    new = json.loads(new_path.read_text("utf-8"))
+    for name, result in new.get("micro", {}).items():
+        before = old.get("micro", {}).get(name)
+        if before:
+            change = result["median_s"] / before["median_s"] - 1.0
+            print(f"{name:45s} {change:+8.1%}")
+    if old.get("end_to_end") and new.get("end_to_end"):
+        before = old["end_to_end"]["pages_per_sec"]
+        after = new["end_to_end"]["pages_per_sec"]
+        print(f"{'end_to_end pages/sec':45s} {after / before - 1.0:+8.1%}")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", choices=["micro", "memory", "e2e", "reparse", "all"],
+                        default="all")
+    parser.add_argument("--output", "-o", type=Path, default=None,
+                        help="Write results JSON here (default: stdout).")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("OLD", "NEW"),
+                        help="Compare two result files instead of running.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum seconds per timing sample.")
+    parser.add_argument("--records", type=int, default=200,
+                        help="Records held in memory by the memory suite.")
+    parser.add_argument("--urls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--engine", choices=["sync", "async"], default="sync")
+    parser.add_argument("--parser-backend", choices=list(BACKENDS), default="html.parser")
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse pages while they download (lxml).")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Mock server response latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with a retryable 503.")
+    parser.add_argument("--page-size", choices=list(SIZES), default="medium")
+    parser.add_argument("--review-pages", type=int, default=1)
+    parser.add_argument("--archive", nargs="+", type=Path, default=None,
+                        help="Page archives (from --archive-dir) for the reparse suite.")
+    return parser.parse_args(argv)
+
+def main_cli(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    bench_logger = logging.getLogger()
+    results: Dict[str, Any] = {"environment": _environment()}
+    bench_logger.setLevel(logging.INFO)
+    # Keep the scraper's own per-URL logging out of the benchmark output.
+    for name in ("main", "pipelines", "parsers", "utils"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    # Retries of injected errors are expected; only report real failures.
+    for name in ("ClutchClient", "AsyncClutchClient"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+    if args.suite in ("micro", "all"):
+        results["micro"] = run_micro(args.repeat, args.min_time)
+    if args.suite in ("memory", "all"):
+        results["memory"] = run_memory(args.records)
+    if args.suite in ("e2e", "all"):
+        results["end_to_end"] = run_end_to_end(args)
+    if args.suite == "reparse" or (args.suite == "all" and args.archive):
+        if not args.archive:
+            raise SystemExit("--suite reparse needs --archive")
+        results["reparse"] = run_reparse(args)
+
+    text = json.dumps(results, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, "utf-8")
+        logging.info("Wrote benchmark results to %s", args.output)
+
+if __name__ == "__main__":
+    main_cli()
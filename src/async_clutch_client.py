@@ -0,0 +1,239 @@
+import asyncio
+import functools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Tuple, Union
+
+from parsers.streaming import PageStream, StreamedPage
+from utils.http_cache import HttpCache, conditional_headers
+from utils.metrics import run_metrics
+from utils.retry import (
+    THROTTLE_STATUSES,
+    AimdRateController,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+@dataclass
+class AsyncClutchClient:
+    """asyncio counterpart of ClutchClient for keeping many requests in flight.
+
+    Connections come from one bounded aiohttp pool (``max_connections`` in
+    total, ``per_host_limit`` per host), and ``requests_per_second`` caps the
+    global request rate when set; a shared ``rate_controller`` replaces that
+    fixed limit with an adaptive one. ``fetch_profile`` honours the same
+    timeout, retry, logging and ``stream`` contract as the blocking client.
+    """
+
+    timeout: float = 15.0
+    max_retries: int = 3
+    user_agent: str = "AdvancedClutchScraper/1.0"
+    max_connections: int = 100
+    per_host_limit: int = 8
+    requests_per_second: Optional[float] = None
+    cache: Optional[HttpCache] = None
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+    rate_controller: Optional[AimdRateController] = None
+    stream: bool = False
+    stream_stop_markers: Tuple[str, ...] = ()
+    stream_chunk_size: int = 64 * 1024
+
+    def __post_init__(self) -> None:
+        if aiohttp is None:
+            raise RuntimeError(
+                "AsyncClutchClient requires aiohttp; install it with "
+                "'pip install aiohttp'."
+            )
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.session: Optional["aiohttp.ClientSession"] = None
+        self._rate_lock: Optional[asyncio.Lock] = None
+        self._next_request_at = 0.0
+
+    def _ensure_session(self) -> "aiohttp.ClientSession":
+        # Sessions are bound to the event loop they are created in, so build
+        # lazily from inside the loop that runs the fetches.
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.per_host_limit,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                # Per connect and per read, like the blocking client's timeout;
+                # a total would also count time spent queued for a connection.
+                timeout=aiohttp.ClientTimeout(
+                    total=None, sock_connect=self.timeout, sock_read=self.timeout
+                ),
+                headers={
+                    "User-Agent": self.user_agent,
+                    "Accept-Language": "en-US,en;q=0.9",
+                },
+            )
+            self._rate_lock = asyncio.Lock()
+        return self.session
+
+    async def _throttle(self) -> None:
+        if self.rate_controller is not None:
+            await self.rate_controller.acquire_async()
+            return
+        if not self.requests_per_second:
+            return
+        interval = 1.0 / self.requests_per_second
+        async with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @staticmethod
+    async def _off_loop(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        # Cache reads and writes (SQLite, zlib) block; on the loop they would
+        # stall every request in flight.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def fetch_profile(self, url: str) -> Optional[Union[str, StreamedPage]]:
+        """Fetch a Clutch.co profile page and return its HTML (or StreamedPage)."""
+        session = self._ensure_session()
+        cached = None
+        if self.cache is not None:
+            cached = await self._off_loop(self.cache.get, url)
+        if cached is not None and self.cache.is_fresh(cached):
+            self.logger.debug("Serving %s from cache", url)
+            run_metrics.inc("http_cache_hits")
+            return cached.body
+        headers = conditional_headers(cached)
+
+        for attempt in range(1, self.max_retries + 1):
+            if attempt > 1:
+                run_metrics.inc("retries")
+            await self._throttle()
+            retry_after = None
+            try:
+                async with session.get(url, headers=headers) as resp:
+                    if self.stream and resp.status == 200:
+                        return await self._read_stream(url, resp)
+                    body = await resp.read()
+                    self._record_response(resp.status, len(body))
+                    if resp.status == 304 and cached is not None:
+                        self.logger.debug("Not modified: %s (served from cache)", url)
+                        self._on_success()
+                        await self._off_loop(self.cache.touch, url)
+                        return cached.body
+                    if resp.status == 200:
+                        text = body.decode(resp.get_encoding())
+                        self.logger.debug("Fetched %s (len=%d)", url, len(text))
+                        self._on_success()
+                        if self.cache is not None:
+                            await self._off_loop(
+                                self.cache.put,
+                                url,
+                                text,
+                                etag=resp.headers.get("ETag"),
+                                last_modified=resp.headers.get("Last-Modified"),
+                            )
+                        return text
+
+                    self.logger.warning(
+                        "Non-200 status for %s on attempt %d/%d: %s",
+                        url,
+                        attempt,
+                        self.max_retries,
+                        resp.status,
+                    )
+                    if not self.retry_policy.is_retryable(resp.status):
+                        self.logger.error(
+                            "Not retrying %s: status %s is not retryable",
+                            url,
+                            resp.status,
+                        )
+                        return None
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    if resp.status in THROTTLE_STATUSES:
+                        self._on_throttle(retry_after)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                run_metrics.inc("request_errors")
+                self.logger.warning(
+                    "Request error for %s on attempt %d/%d: %s",
+                    url,
+                    attempt,
+                    self.max_retries,
+                    exc,
+                )
+                if isinstance(exc, asyncio.TimeoutError):
+                    self._on_throttle(None)
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.retry_policy.backoff(attempt, retry_after))
+        self.logger.error("Failed to fetch %s after %d attempts", url, self.max_retries)
+        return None
+
+    async def _read_stream(self, url: str, resp: "aiohttp.ClientResponse") -> StreamedPage:
+        # The body is not read yet, so only a declared charset can be used.
+        encoding = resp.charset
+        stream = PageStream(
+            encoding,
+            [marker.encode("utf-8") for marker in self.stream_stop_markers],
+            keep_body=self.cache is not None,
+        )
+        async for chunk in resp.content.iter_chunked(self.stream_chunk_size):
+            if stream.feed(chunk):
+                # Drop the connection instead of reading the rest.
+                resp.close()
+                break
+        document = stream.close()
+        self._record_response(resp.status, document.size)
+        self._on_success()
+        if document.truncated:
+            run_metrics.inc("stream_early_stops")
+        self.logger.debug(
+            "Streamed %s (%d bytes%s)",
+            url,
+            document.size,
+            ", stopped early" if document.truncated else "",
+        )
+        # A page cut short at a stop marker is not cached as the full page.
+        if self.cache is not None and not document.truncated:
+            await self._off_loop(
+                self.cache.put,
+                url,
+                document.body.decode(encoding or "utf-8", errors="replace"),
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+            document.body = None
+        return document
+
+    @staticmethod
+    def _record_response(status: int, size: int) -> None:
+        run_metrics.inc("http_requests")
+        run_metrics.inc(f"http_status:{status}")
+        run_metrics.inc("bytes_downloaded", size)
+
+    def _on_success(self) -> None:
+        if self.rate_controller is not None:
+            self.rate_controller.on_success()
+
+    def _on_throttle(self, retry_after: Optional[float]) -> None:
+        if self.rate_controller is not None:
+            self.rate_controller.on_throttle()
+            if retry_after:
+                self.rate_controller.pause(retry_after)
+
+    async def close(self) -> None:
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def __aenter__(self) -> "AsyncClutchClient":
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -1,18 +1,42 @@
 import logging
-from dataclasses import dataclass
-from typing import Optional
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from parsers.streaming import PageStream, StreamedPage
+from utils.http_cache import HttpCache, conditional_headers
+from utils.metrics import run_metrics
+from utils.retry import (
+    THROTTLE_STATUSES,
+    AimdRateController,
+    RetryPolicy,
+    parse_retry_after,
+)
 
 @dataclass
 class ClutchClient:
     timeout: float = 15.0
     max_retries: int = 3
     user_agent: str = "AdvancedClutchScraper/1.0"
+    pool_size: int = 10
+    cache: Optional[HttpCache] = None
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+    rate_controller: Optional[AimdRateController] = None
+    # Streaming mode: parse the body while it downloads (see PageStream).
+    stream: bool = False
+    stream_stop_markers: Tuple[str, ...] = ()
+    stream_chunk_size: int = 64 * 1024
 
     def __post_init__(self) -> None:
         self.logger = logging.getLogger(self.__class__.__name__)
         self.session = requests.Session()
+        # Size the connection pool so concurrent fetch workers can share it.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update(
             {
                 "User-Agent": self.user_agent,
@@ -20,13 +44,52 @@ class ClutchClient:
             }
         )
 
-    def fetch_profile(self, url: str) -> Optional[str]:
-        """Fetch a Clutch.co profile page and return its HTML."""
+    def fetch_profile(self, url: str) -> Optional[Union[str, StreamedPage]]:
+        """Fetch a Clutch.co profile page and return its HTML.
+
+        With a ``cache`` configured, fresh entries are returned without a
+        request and stale ones are revalidated with a conditional GET. In
+        ``stream`` mode a downloaded page comes back as a StreamedPage,
+        parsed as its chunks arrived.
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and self.cache.is_fresh(cached):
+            self.logger.debug("Serving %s from cache", url)
+            run_metrics.inc("http_cache_hits")
+            return cached.body
+        headers = conditional_headers(cached)
+
         for attempt in range(1, self.max_retries + 1):
+            if attempt > 1:
+                run_metrics.inc("retries")
+            if self.rate_controller is not None:
+                self.rate_controller.acquire()
+            retry_after = None
             try:
-                resp = self.session.get(url, timeout=self.timeout)
+                if self.stream:
+                    resp = self.session.get(
+                        url, timeout=self.timeout, headers=headers, stream=True
+                    )
+                    if resp.status_code == 200:
+                        return self._read_stream(url, resp)
+                else:
+                    resp = self.session.get(url, timeout=self.timeout, headers=headers)
+                self._record_response(resp.status_code, len(resp.content))
+                if resp.status_code == 304 and cached is not None:
+                    self.logger.debug("Not modified: %s (served from cache)", url)
+                    self._on_success()
+                    self.cache.touch(url)
+                    return cached.body
                 if resp.status_code == 200:
                     self.logger.debug("Fetched %s (len=%d)", url, len(resp.text))
+                    self._on_success()
+                    if self.cache is not None:
+                        self.cache.put(
+                            url,
+                            resp.text,
+                            etag=resp.headers.get("ETag"),
+                            last_modified=resp.headers.get("Last-Modified"),
+                        )
                     return resp.text
 
                 self.logger.warning(
@@ -36,7 +99,18 @@ class ClutchClient:
                     self.max_retries,
                     resp.status_code,
                 )
+                if not self.retry_policy.is_retryable(resp.status_code):
+                    self.logger.error(
+                        "Not retrying %s: status %s is not retryable",
+                        url,
+                        resp.status_code,
+                    )
+                    return None
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                if resp.status_code in THROTTLE_STATUSES:
+                    self._on_throttle(retry_after)
             except requests.RequestException as exc:
+                run_metrics.inc("request_errors")
                 self.logger.warning(
                     "Request error for %s on attempt %d/%d: %s",
                     url,
@@ -44,5 +118,60 @@ class ClutchClient:
                     self.max_retries,
                     exc,
                 )
+                if isinstance(exc, requests.Timeout):
+                    self._on_throttle(None)
+            if attempt < self.max_retries:
+                time.sleep(self.retry_policy.backoff(attempt, retry_after))
         self.logger.error("Failed to fetch %s after %d attempts", url, self.max_retries)
-        return None
\ No newline at end of file
+        return None
+
+    def _read_stream(self, url: str, resp: requests.Response) -> StreamedPage:
+        stream = PageStream(
+            resp.encoding,
+            [marker.encode("utf-8") for marker in self.stream_stop_markers],
+            keep_body=self.cache is not None,
+        )
+        try:
+            for chunk in resp.iter_content(self.stream_chunk_size):
+                if stream.feed(chunk):
+                    break
+        finally:
+            # Closing early drops the connection instead of reading the rest.
+            resp.close()
+        document = stream.close()
+        self._record_response(resp.status_code, document.size)
+        self._on_success()
+        if document.truncated:
+            run_metrics.inc("stream_early_stops")
+        self.logger.debug(
+            "Streamed %s (%d bytes%s)",
+            url,
+            document.size,
+            ", stopped early" if document.truncated else "",
+        )
+        # A page cut short at a stop marker is not cached as the full page.
+        if self.cache is not None and not document.truncated:
+            self.cache.put(
+                url,
+                document.body.decode(resp.encoding or "utf-8", errors="replace"),
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+            document.body = None
+        return document
+
+    @staticmethod
+    def _record_response(status: int, size: int) -> None:
+        run_metrics.inc("http_requests")
+        run_metrics.inc(f"http_status:{status}")
+        run_metrics.inc("bytes_downloaded", size)
+
+    def _on_success(self) -> None:
+        if self.rate_controller is not None:
+            self.rate_controller.on_success()
+
+    def _on_throttle(self, retry_after: Optional[float]) -> None:
+        if self.rate_controller is not None:
+            self.rate_controller.on_throttle()
+            if retry_after:
+                self.rate_controller.pause(retry_after)
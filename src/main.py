@@ -1,21 +1,50 @@
 import argparse
+import contextlib
+import functools
 import json
 import logging
+import os
 import sys
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple, Union
 
 # Ensure src/ is on sys.path so namespace packages (parsers, pipelines, utils) are importable
 CURRENT_DIR = Path(__file__).resolve().parent
 if str(CURRENT_DIR) not in sys.path:
     sys.path.insert(0, str(CURRENT_DIR))
 
+from async_clutch_client import AsyncClutchClient
 from clutch_client import ClutchClient
-from parsers.company_profile_parser import parse_company_profile
-from parsers.reviews_parser import parse_reviews
+from parsers.company_profile_parser import extract_company_profile
+from parsers.document import BACKENDS, DEFAULT_BACKEND, build_page
+from parsers.models import CompanyRecord, Review
+from parsers.reviews_parser import extract_reviews
+from parsers.streaming import StreamedPage
+from pipelines.archive import (
+    PROFILE,
+    REVIEW_PAGE,
+    ArchiveReader,
+    PageArchive,
+    archive_path_for,
+)
+from pipelines.changefeed import ChangeFeed, changes_path_for
+from pipelines.checkpoint import ProgressJournal, journal_path_for
+from pipelines.concurrency import run_pipeline
+from pipelines.crawler import crawl_profile_urls
 from pipelines.normalization import normalize_company_data
-from pipelines.exporters import export_to_json
+from pipelines.exporters import FORMATS, open_exporter
+from pipelines.inputs import dedupe_urls, iter_input_urls
+from pipelines.fingerprints import Canonicalizer, FingerprintStore
+from pipelines.review_pages import HarvestedProfile, ReviewHarvester, merge_reviews
+from pipelines.scheduler import RefreshScheduler
+from pipelines.service import ScrapeService, serve
+from pipelines.sharding import merge_outputs, parse_shard, shard_urls
+from utils.http_cache import HttpCache
 from utils.logging_config import setup_logging
+from utils.metrics import MetricsPublisher, run_metrics, summary_path_for
+from utils.profiling import PROFILE_MODES, Profiler, profile_path_for
+from utils.retry import AimdRateController, RetryPolicy
 
 def load_settings(path: Optional[Path]) -> Dict[str, Any]:
     if not path:
@@ -36,87 +65,812 @@ def load_settings(path: Optional[Path]) -> Dict[str, Any]:
             return {}
     return settings
 
-def load_input_urls(path: Path) -> List[str]:
-    if not path.exists():
-        raise FileNotFoundError(f"Input URLs file not found: {path}")
+def process_html(
+    html: Union[str, StreamedPage, HarvestedProfile],
+    url: str,
+    backend: str = DEFAULT_BACKEND,
+) -> CompanyRecord:
+    """Parse and normalize an already fetched profile page.
 
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    Reviews a ReviewHarvester collected from further review pages are merged
+    in before the rating aggregates are computed. A page parsed while it
+    was streamed is used as is. The record is turned into its JSON form by
+    the exporter.
+    """
+    extra_reviews: List[Review] = []
+    if isinstance(html, HarvestedProfile):
+        extra_reviews = html.reviews
+        html = html.html
+    if isinstance(html, StreamedPage):
+        page = html.page
+    else:
+        with run_metrics.timer("build_page"):
+            page = build_page(html, backend)
+    with run_metrics.timer("parse_profile"):
+        profile_data = extract_company_profile(page, url)
+    with run_metrics.timer("parse_reviews"):
+        reviews = merge_reviews(extract_reviews(page), extra_reviews)
+    with run_metrics.timer("normalize"):
+        return normalize_company_data(profile_data, reviews)
 
-    if isinstance(data, list):
-        return [str(u) for u in data]
+def _review_count(record: Optional[Union[CompanyRecord, Dict[str, Any]]]) -> Optional[int]:
+    if record is None:
+        return None
+    if isinstance(record, CompanyRecord):
+        return len(record.reviews or ())
+    return len(record.get("reviews") or ())
 
-    if isinstance(data, dict):
-        if "profile_urls" in data and isinstance(data["profile_urls"], list):
-            return [str(u) for u in data["profile_urls"]]
-        if "urls" in data and isinstance(data["urls"], list):
-            return [str(u) for u in data["urls"]]
+def _open_cache(
+    settings: Dict[str, Any], cache_dir: Optional[Path], cache_ttl: Optional[float]
+) -> Optional[HttpCache]:
+    if cache_dir is None and settings.get("cache_dir"):
+        cache_dir = Path(settings["cache_dir"])
+    if cache_ttl is None:
+        cache_ttl = float(settings.get("cache_ttl", 24 * 3600))
+    if cache_dir is None:
+        return None
+    logging.getLogger(__name__).info(
+        "Using HTTP cache in %s (ttl=%ss)", cache_dir, cache_ttl
+    )
+    return HttpCache(
+        cache_dir,
+        ttl=cache_ttl,
+        max_bytes=int(float(settings.get("cache_max_mb", 512)) * 1024 * 1024),
+    )
 
-    raise ValueError(
-        "Unsupported input format. Expected a list of URLs or an object with "
-        '"profile_urls"/"urls" key.'
+def _open_fingerprints(
+    settings: Dict[str, Any], fingerprint_db: Optional[Path], parser_backend: str
+) -> Optional[FingerprintStore]:
+    if fingerprint_db is None:
+        return None
+    return FingerprintStore(
+        fingerprint_db,
+        canonicalizer=Canonicalizer(settings.get("fingerprint_strip_patterns")),
+        # Records parsed by another backend or parser version are not reused.
+        salt=f"{parser_backend}:{settings.get('fingerprint_salt', '')}",
     )
 
-def process_url(
-    client: ClutchClient,
-    url: str,
-) -> Optional[Dict[str, Any]]:
-    logger = logging.getLogger(__name__)
-    try:
-        html = client.fetch_profile(url)
-        if not html:
-            logger.warning("Empty HTML for URL: %s", url)
-            return None
-
-        profile_data = parse_company_profile(html, url)
-        reviews = parse_reviews(html)
-        normalized = normalize_company_data(profile_data, reviews)
-        return normalized
-    except Exception as e:  # noqa: BLE001
-        logger.exception("Failed to process %s: %s", url, e)
+def _rate_controller(
+    settings: Dict[str, Any], adaptive_rate: Optional[bool]
+) -> Optional[AimdRateController]:
+    if adaptive_rate is None:
+        adaptive_rate = bool(settings.get("adaptive_rate", False))
+    if not adaptive_rate:
         return None
+    return AimdRateController(
+        initial_rate=float(settings.get("rate_initial", 4.0)),
+        min_rate=float(settings.get("rate_min", 0.5)),
+        max_rate=float(settings.get("rate_max", 20.0)),
+    )
+
+def _client_kwargs(
+    settings: Dict[str, Any],
+    cache: Optional[HttpCache],
+    rate_controller: Optional[AimdRateController],
+) -> Dict[str, Any]:
+    """Client options shared by the profile and listing clients."""
+    return dict(
+        timeout=float(settings.get("timeout", 15.0)),
+        max_retries=int(settings.get("max_retries", 3)),
+        user_agent=settings.get(
+            "user_agent",
+            "AdvancedClutchScraper/1.0 (+https://bitbash.dev)",
+        ),
+        cache=cache,
+        retry_policy=RetryPolicy(
+            backoff_base=float(settings.get("retry_backoff_base", 0.5)),
+            backoff_max=float(settings.get("retry_backoff_max", 30.0)),
+        ),
+        rate_controller=rate_controller,
+    )
+
+def _build_fetch(
+    settings: Dict[str, Any],
+    client_kwargs: Dict[str, Any],
+    engine: str,
+    concurrency: int,
+    parser_backend: str,
+    max_review_pages: int,
+    stream: bool = False,
+    archive: Optional[PageArchive] = None,
+) -> Tuple[Callable[[str], Any], Callable[[], Any]]:
+    """The profile fetch for ``run_pipeline`` and the cleanup that closes it."""
+    stream_kwargs: Dict[str, Any] = dict(
+        stream=stream,
+        stream_stop_markers=tuple(settings.get("stream_stop_markers", ())),
+        stream_chunk_size=int(settings.get("stream_chunk_size", 64 * 1024)),
+    )
+    if engine == "async":
+        rps = settings.get("requests_per_second")
+        client = AsyncClutchClient(
+            **client_kwargs,
+            **stream_kwargs,
+            max_connections=int(settings.get("max_connections", max(100, concurrency))),
+            per_host_limit=int(settings.get("per_host_limit", 8)),
+            requests_per_second=float(rps) if rps else None,
+        )
+        fetch_cleanup = client.close
+    elif engine == "sync":
+        client = ClutchClient(
+            **client_kwargs, **stream_kwargs, pool_size=max(10, concurrency)
+        )
+        fetch_cleanup = client.session.close
+    else:
+        raise ValueError(f"Unknown fetch engine: {engine!r}")
+
+    fetch = page_fetch = client.fetch_profile
+    if archive is not None:
+        fetch = archive.recording(client.fetch_profile, PROFILE)
+        page_fetch = archive.recording(client.fetch_profile, REVIEW_PAGE)
+    if max_review_pages > 1:
+        harvester = ReviewHarvester(
+            fetch,
+            max_pages=max_review_pages,
+            page_workers=int(settings.get("review_page_workers", 4)),
+            backend=parser_backend,
+            page_fetch=page_fetch,
+        )
+        client_cleanup = fetch_cleanup
+        if engine == "async":
+            fetch = harvester.fetch_async
+
+            async def fetch_cleanup() -> None:
+                harvester.close()
+                await client_cleanup()
+        else:
+            fetch = harvester.fetch
+
+            def fetch_cleanup() -> None:
+                harvester.close()
+                client_cleanup()
+    return fetch, fetch_cleanup
 
 def run(
     input_path: Path,
     output_path: Path,
     settings_path: Optional[Path],
     logging_config_path: Optional[Path],
+    concurrency: Optional[int] = None,
+    ordered: Optional[bool] = None,
+    engine: Optional[str] = None,
+    parser_backend: Optional[str] = None,
+    parse_workers: Optional[int] = None,
+    output_format: Optional[str] = None,
+    cache_dir: Optional[Path] = None,
+    cache_ttl: Optional[float] = None,
+    resume: bool = False,
+    fingerprint_db: Optional[Path] = None,
+    adaptive_rate: Optional[bool] = None,
+    max_review_pages: Optional[int] = None,
+    crawl: Optional[List[str]] = None,
+    crawl_max_pages: Optional[int] = None,
+    crawl_max_depth: Optional[int] = None,
+    metrics_file: Optional[Path] = None,
+    metrics_textfile: Optional[Path] = None,
+    metrics_port: Optional[int] = None,
+    metrics_host: Optional[str] = None,
+    profile: Optional[str] = None,
+    profile_memory: bool = False,
+    profile_output: Optional[Path] = None,
+    profile_top: int = 30,
+    stream: Optional[bool] = None,
+    archive_dir: Optional[Path] = None,
+    shard: Optional[str] = None,
+    delta_state: Optional[Path] = None,
+    delta_output: Optional[Path] = None,
+    delta_only: Optional[bool] = None,
+    schedule_db: Optional[Path] = None,
+    refresh_budget: Optional[int] = None,
 ) -> None:
     setup_logging(logging_config_path)
     logger = logging.getLogger(__name__)
 
     settings = load_settings(settings_path)
     logger.debug("Loaded settings: %s", settings)
+    run_metrics.reset()
 
-    urls = load_input_urls(input_path)
-    if not urls:
-        logger.warning("No URLs found in input file: %s", input_path)
-        return
+    urls: Iterable[str] = []
+    if not crawl:
+        urls = dedupe_urls(
+            iter_input_urls(input_path),
+            expected=int(settings.get("input_expected_urls", 5_000_000)),
+        )
 
-    logger.info("Starting scrape for %d URLs", len(urls))
+    journal = ProgressJournal(
+        journal_path_for(output_path),
+        batch_size=int(settings.get("journal_batch_size", 100)),
+        flush_interval=float(settings.get("journal_flush_interval", 5.0)),
+    )
+    resume_offset = None
+    state = None
+    if resume:
+        state = journal.load()
+        resume_offset = state.offset
 
-    client = ClutchClient(
-        timeout=float(settings.get("timeout", 15.0)),
-        max_retries=int(settings.get("max_retries", 3)),
-        user_agent=settings.get(
-            "user_agent",
-            "AdvancedClutchScraper/1.0 (+https://bitbash.dev)",
-        ),
+    if concurrency is None:
+        concurrency = int(settings.get("concurrency", 1))
+    if ordered is None:
+        ordered = bool(settings.get("ordered_output", False))
+
+    if engine is None:
+        engine = settings.get("engine", "sync")
+    if parse_workers is None:
+        parse_workers = int(settings.get("parse_workers", 0))
+    if parser_backend is None:
+        parser_backend = settings.get("parser_backend", DEFAULT_BACKEND)
+    if parser_backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown parser backend {parser_backend!r}; expected one of {BACKENDS}"
+        )
+
+    if stream is None:
+        stream = bool(settings.get("stream", False))
+    if stream:
+        # Streamed pages are lxml trees: they cannot be re-parsed by another
+        # backend, pickled to parse workers or fingerprinted as HTML.
+        if parser_backend != "lxml":
+            logger.info("Streaming mode parses with the lxml backend")
+            parser_backend = "lxml"
+        if parse_workers > 0:
+            logger.warning("Streaming mode parses in-process; ignoring parse workers")
+            parse_workers = 0
+
+    cache = _open_cache(settings, cache_dir, cache_ttl)
+
+    if fingerprint_db is None and settings.get("fingerprint_db"):
+        fingerprint_db = Path(settings["fingerprint_db"])
+    if fingerprint_db is not None and stream:
+        logger.warning("Streaming mode keeps no page HTML; fingerprints are disabled")
+        fingerprint_db = None
+    fingerprints = _open_fingerprints(settings, fingerprint_db, parser_backend)
+
+    if archive_dir is None and settings.get("archive_dir"):
+        archive_dir = Path(settings["archive_dir"])
+    if archive_dir is not None and stream:
+        logger.warning("Streaming mode keeps no page HTML; the page archive is disabled")
+        archive_dir = None
+    archive = None
+    if archive_dir is not None:
+        archive = PageArchive(
+            archive_path_for(archive_dir),
+            compresslevel=int(settings.get("archive_compresslevel", 6)),
+        )
+        logger.info("Archiving fetched pages to %s", archive.path)
+
+    rate_controller = _rate_controller(settings, adaptive_rate)
+    client_kwargs = _client_kwargs(settings, cache, rate_controller)
+    if max_review_pages is None:
+        max_review_pages = int(settings.get("max_review_pages", 1))
+    fetch, fetch_cleanup = _build_fetch(
+        settings,
+        client_kwargs,
+        engine,
+        concurrency,
+        parser_backend,
+        max_review_pages,
+        stream=stream,
+        archive=archive,
     )
+    crawl_client = None
+    if crawl:
+        if crawl_max_pages is None and settings.get("crawl_max_pages") is not None:
+            crawl_max_pages = int(settings["crawl_max_pages"])
+        if crawl_max_depth is None and settings.get("crawl_max_depth") is not None:
+            crawl_max_depth = int(settings["crawl_max_depth"])
+        crawl_workers = int(settings.get("crawl_workers", 4))
+        # Listing pages go through their own blocking client so the crawl can
+        # run beside either fetch engine; it shares the rate controller. It
+        # skips the HTTP cache: listings change daily, and a stale page hides
+        # new profiles.
+        crawl_client = ClutchClient(
+            **{**client_kwargs, "cache": None}, pool_size=max(10, crawl_workers)
+        )
+        urls = crawl_profile_urls(
+            crawl,
+            crawl_client.fetch_profile,
+            workers=crawl_workers,
+            max_pages=crawl_max_pages,
+            max_depth=crawl_max_depth,
+            expected_profiles=int(settings.get("crawl_expected_profiles", 1_000_000)),
+        )
+        logger.info("Starting crawl from %d listing URLs", len(crawl))
+    else:
+        logger.info("Starting scrape of URLs from %s", input_path)
+    if shard is None:
+        shard = settings.get("shard")
+    if shard:
+        node_shard = parse_shard(str(shard))
+        logger.info("Scraping shard %d of %d", *node_shard)
+        urls = shard_urls(urls, node_shard)
+    if state is not None:
+        urls = state.pending(urls, int(settings.get("resume_max_attempts", 3)))
+
+    if schedule_db is None and settings.get("schedule_db"):
+        schedule_db = Path(settings["schedule_db"])
+    if refresh_budget is None and settings.get("refresh_budget") is not None:
+        refresh_budget = int(settings["refresh_budget"])
+    scheduler = None
+    if schedule_db is not None:
+        scheduler = RefreshScheduler(
+            schedule_db,
+            default_change_days=float(settings.get("schedule_default_change_days", 30.0)),
+            min_age_hours=float(settings.get("schedule_min_age_hours", 0.0)),
+        )
+        if refresh_budget is not None:
+            if state is not None:
+                # The interrupted run already spent part of the budget.
+                refresh_budget = max(0, refresh_budget - len(state.completed))
+            urls = scheduler.plan(urls, refresh_budget)
+    elif refresh_budget is not None:
+        raise ValueError("--refresh-budget needs --schedule-db")
+
+    logger.info(
+        "Using %s fetch engine with concurrency %d and %s parser backend",
+        engine,
+        concurrency,
+        parser_backend,
+    )
+
+    if delta_state is None and settings.get("delta_state"):
+        delta_state = Path(settings["delta_state"])
+    if delta_only is None:
+        delta_only = bool(settings.get("delta_only", False))
+    feed = None
+    if delta_state is not None:
+        feed = ChangeFeed(
+            delta_state, delta_output or changes_path_for(output_path), resume=resume
+        )
+        logger.info("Writing changes since the last run to %s", feed.events_path)
+    elif delta_only:
+        raise ValueError("--delta-only needs --delta-state")
 
-    results: List[Dict[str, Any]] = []
-    for url in urls:
-        logger.info("Processing %s", url)
-        record = process_url(client, url)
-        if record is not None:
-            results.append(record)
+    exporter = None
+    if not delta_only:
+        exporter = open_exporter(
+            output_path,
+            output_format or settings.get("output_format"),
+            resume_offset=resume_offset,
+            sqlite_batch_size=int(settings.get("sqlite_batch_size", 500)),
+        )
+
+    def before_flush() -> None:
+        # Buffered (SQLite) records and change-feed state are committed
+        # before the journal marks their URLs done.
+        if exporter is not None:
+            exporter.flush()
+        if feed is not None:
+            feed.flush()
+        if scheduler is not None:
+            scheduler.flush()
+
+    journal.before_flush = before_flush
+    if metrics_textfile is None and settings.get("metrics_textfile"):
+        metrics_textfile = Path(settings["metrics_textfile"])
+    if metrics_port is None and settings.get("metrics_port"):
+        metrics_port = int(settings["metrics_port"])
+    if metrics_host is None:
+        metrics_host = settings.get("metrics_host", "127.0.0.1")
+    publisher = MetricsPublisher(
+        run_metrics,
+        textfile=metrics_textfile,
+        port=metrics_port,
+        interval=float(settings.get("metrics_interval", 15.0)),
+        host=metrics_host,
+    )
+
+    profiler = None
+    if profile is not None or profile_memory:
+        if parse_workers > 0:
+            logger.warning(
+                "Profiling covers the main process only; pages parsed by the "
+                "%d parse workers will not show up (use --parse-workers 0).",
+                parse_workers,
+            )
+        profiler = Profiler(
+            profile, memory=profile_memory, top=profile_top, slow_urls=profile_top
+        )
+        profiler.start()
 
-    if not results:
+    failed = 0
+    total = 0
+    records = 0
+    with contextlib.ExitStack() as stack:
+        if exporter is not None:
+            stack.enter_context(exporter)
+        if feed is not None:
+            stack.enter_context(feed)
+        if scheduler is not None:
+            stack.enter_context(scheduler)
+        stack.enter_context(journal.open(append=resume))
+        stack.enter_context(publisher)
+        for result in run_pipeline(
+            urls,
+            fetch,
+            functools.partial(process_html, backend=parser_backend),
+            fetch_workers=concurrency,
+            ordered=ordered,
+            fetch_cleanup=fetch_cleanup,
+            parse_workers=parse_workers,
+            parse_batch_size=int(settings.get("parse_batch_size", 8)),
+            record_cache=fingerprints,
+        ):
+            total += 1
+            if result.record is not None:
+                records += 1
+                with run_metrics.timer("export"):
+                    if exporter is not None:
+                        exporter.write(result.record)
+                    if feed is not None:
+                        feed.observe(result.record)
+                journal.record(
+                    result.url, ok=True, offset=exporter.offset if exporter is not None else 0
+                )
+            else:
+                failed += 1
+                if feed is not None:
+                    feed.seen(result.url)
+                journal.record(result.url, ok=False)
+            if scheduler is not None:
+                scheduler.record(result.url, result.record)
+            if profiler is not None:
+                profiler.slow_urls.add(
+                    result.url,
+                    result.fetch_seconds,
+                    result.parse_seconds,
+                    result.html_size,
+                    _review_count(result.record),
+                )
+        if scheduler is not None:
+            scheduler.log_stats()
+        if feed is not None:
+            # A capped crawl or a refresh budget sees part of the catalogue:
+            # what it skipped is not gone.
+            partial = refresh_budget is not None or (
+                bool(crawl) and (crawl_max_pages is not None or crawl_max_depth is not None)
+            )
+            if partial:
+                logger.info("Partial run; not reporting missing companies as removed")
+            feed.finish(report_removed=not partial)
+            feed.log_stats()
+
+    if profiler is not None:
+        profiler.stop()
+        profiler.write_report(profile_output or profile_path_for(output_path))
+
+    if crawl_client is not None:
+        crawl_client.session.close()
+    if cache is not None:
+        cache.close()
+    if archive is not None:
+        archive.close()
+    if fingerprints is not None:
+        fingerprints.log_stats()
+        fingerprints.close()
+
+    summary = run_metrics.write_summary(
+        metrics_file or summary_path_for(output_path),
+        urls=total,
+        records=records,
+        failed=failed,
+    )
+    logger.info(
+        "Run took %.1fs: %.2f pages/sec, %d bytes downloaded, %d retries",
+        summary["elapsed_s"],
+        summary["pages_per_sec"],
+        summary["bytes_downloaded"],
+        summary["retries"],
+    )
+
+    if not total:
+        if resume:
+            logger.info("Nothing left to resume for %s", output_path)
+        elif not crawl:
+            logger.warning("No URLs found in input file: %s", input_path)
+    if failed:
+        logger.warning("%d of %d URLs failed to process", failed, total)
+
+    if not records:
         logger.warning("No records processed successfully; nothing to export.")
         return
 
-    export_to_json(results, output_path)
-    logger.info("Exported %d records to %s", len(results), output_path)
+    if exporter is not None:
+        logger.info("Exported %d records to %s", exporter.count, output_path)
+
+def reparse(
+    archive_paths: List[Path],
+    output_path: Path,
+    settings_path: Optional[Path],
+    logging_config_path: Optional[Path],
+    parser_backend: Optional[str] = None,
+    parse_workers: Optional[int] = None,
+    output_format: Optional[str] = None,
+    max_review_pages: Optional[int] = None,
+) -> None:
+    """Parse the pages of ``--archive-dir`` archives again, without network.
+
+    Profiles go through the same pipeline, parsers and normalization as a
+    live run, with pages read from the archives instead of fetched; parsing
+    is spread over ``parse_workers`` processes (default: one per CPU).
+    """
+    setup_logging(logging_config_path)
+    logger = logging.getLogger(__name__)
+
+    settings = load_settings(settings_path)
+    run_metrics.reset()
+
+    if parser_backend is None:
+        parser_backend = settings.get("parser_backend", DEFAULT_BACKEND)
+    if parser_backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown parser backend {parser_backend!r}; expected one of {BACKENDS}"
+        )
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+    if max_review_pages is None:
+        max_review_pages = int(settings.get("max_review_pages", 1))
+
+    reader = ArchiveReader(archive_paths)
+    logger.info(
+        "Re-parsing %d archived profiles (%d extra review pages) with the %s backend",
+        len(reader),
+        reader.review_pages,
+        parser_backend,
+    )
+    fetch: Any = reader.get
+    harvester = None
+    if max_review_pages > 1 and reader.review_pages:
+        harvester = ReviewHarvester(
+            reader.get,
+            max_pages=max_review_pages,
+            page_workers=int(settings.get("review_page_workers", 4)),
+            backend=parser_backend,
+        )
+        fetch = harvester.fetch
+
+    started = time.perf_counter()
+    failed = 0
+    total = 0
+    exporter = open_exporter(
+        output_path,
+        output_format or settings.get("output_format"),
+        sqlite_batch_size=int(settings.get("sqlite_batch_size", 500)),
+    )
+    with reader, exporter:
+        for result in run_pipeline(
+            reader.profile_urls(),
+            fetch,
+            functools.partial(process_html, backend=parser_backend),
+            fetch_workers=int(settings.get("reparse_read_workers", 4)),
+            ordered=True,
+            parse_workers=parse_workers,
+            parse_batch_size=int(settings.get("parse_batch_size", 8)),
+        ):
+            total += 1
+            if result.record is None:
+                failed += 1
+                continue
+            exporter.write(result.record)
+    if harvester is not None:
+        harvester.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Re-parsed %d pages in %.1fs (%.1f pages/sec)",
+        total,
+        elapsed,
+        total / elapsed if elapsed else 0.0,
+    )
+    if failed:
+        logger.warning("%d of %d archived pages failed to parse", failed, total)
+    logger.info("Exported %d records to %s", exporter.count, output_path)
+
+def serve_jobs(
+    settings_path: Optional[Path],
+    logging_config_path: Optional[Path],
+    address: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    parser_backend: Optional[str] = None,
+    cache_dir: Optional[Path] = None,
+    fingerprint_db: Optional[Path] = None,
+    adaptive_rate: Optional[bool] = None,
+    max_review_pages: Optional[int] = None,
+    job_workers: Optional[int] = None,
+    max_queued_jobs: Optional[int] = None,
+) -> None:
+    """Keep one warm scraper process and take URL batches over a local HTTP API.
+
+    The client, its connection pool, the HTTP cache and the fingerprint
+    store are set up once and shared by every job. Jobs are POSTed to
+    ``/jobs`` and their records streamed back as JSON Lines.
+    """
+    setup_logging(logging_config_path)
+    logger = logging.getLogger(__name__)
+    settings = load_settings(settings_path)
+
+    if address is None:
+        address = str(settings.get("serve_address", "127.0.0.1:8700"))
+    if concurrency is None:
+        concurrency = int(settings.get("concurrency", 1))
+    if parser_backend is None:
+        parser_backend = settings.get("parser_backend", DEFAULT_BACKEND)
+    if parser_backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown parser backend {parser_backend!r}; expected one of {BACKENDS}"
+        )
+    if settings.get("engine", "sync") != "sync":
+        # An aiohttp session belongs to one event loop; every job gets its own.
+        logger.info("Service mode fetches with the sync engine")
+    if max_review_pages is None:
+        max_review_pages = int(settings.get("max_review_pages", 1))
+    if fingerprint_db is None and settings.get("fingerprint_db"):
+        fingerprint_db = Path(settings["fingerprint_db"])
+    if job_workers is None:
+        job_workers = int(settings.get("serve_job_workers", 2))
+    if max_queued_jobs is None:
+        max_queued_jobs = int(settings.get("serve_max_queued_jobs", 8))
+
+    cache = _open_cache(settings, cache_dir, None)
+    fingerprints = _open_fingerprints(settings, fingerprint_db, parser_backend)
+    client_kwargs = _client_kwargs(settings, cache, _rate_controller(settings, adaptive_rate))
+    fetch, fetch_cleanup = _build_fetch(
+        settings, client_kwargs, "sync", concurrency, parser_backend, max_review_pages
+    )
+    service = ScrapeService(
+        fetch,
+        functools.partial(process_html, backend=parser_backend),
+        fetch_workers=concurrency,
+        job_workers=job_workers,
+        max_queued_jobs=max_queued_jobs,
+        max_job_urls=int(settings.get("serve_max_job_urls", 1000)),
+        record_cache=fingerprints,
+    )
+    try:
+        serve(service, address)
+    finally:
+        fetch_cleanup()
+        if cache is not None:
+            cache.close()
+        if fingerprints is not None:
+            fingerprints.log_stats()
+            fingerprints.close()
+
+def parse_serve_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    root = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(
+        prog="main.py serve",
+        description="Keep a warm scraper running and take URL batches over local HTTP: "
+        'POST /jobs with {"urls": [...]} streams back one JSON line per profile.',
+    )
+    parser.add_argument(
+        "--address",
+        default=None,
+        help='Where to listen: [HOST:]PORT or unix:/path/to.sock (default: settings '
+        '"serve_address" or 127.0.0.1:8700).',
+    )
+    parser.add_argument(
+        "--settings",
+        "-s",
+        type=Path,
+        default=root / "config" / "settings.example.json",
+    )
+    parser.add_argument(
+        "--logging-config",
+        "-l",
+        type=Path,
+        default=root / "config" / "logging.example.yaml",
+    )
+    parser.add_argument("--concurrency", "-c", type=int, default=None)
+    parser.add_argument("--parser-backend", choices=list(BACKENDS), default=None)
+    parser.add_argument("--cache-dir", type=Path, default=None)
+    parser.add_argument("--fingerprint-db", type=Path, default=None)
+    parser.add_argument("--adaptive-rate", action="store_true", default=None)
+    parser.add_argument("--max-review-pages", type=int, default=None)
+    parser.add_argument(
+        "--job-workers",
+        type=int,
+        default=None,
+        help='Jobs scraped at the same time (default: settings "serve_job_workers" or 2).',
+    )
+    parser.add_argument(
+        "--max-queued-jobs",
+        type=int,
+        default=None,
+        help="Jobs that may wait for a turn; more are refused with 429 "
+        '(default: settings "serve_max_queued_jobs" or 8).',
+    )
+    return parser.parse_args(argv)
+
+def merge(
+    input_paths: List[Path],
+    output_path: Path,
+    logging_config_path: Optional[Path],
+    output_format: Optional[str] = None,
+    run_size: int = 10_000,
+    tmp_dir: Optional[Path] = None,
+) -> None:
+    """Merge the outputs of ``--shard`` runs, one record per profile."""
+    setup_logging(logging_config_path)
+    merge_outputs(input_paths, output_path, output_format, run_size=run_size, tmp_dir=tmp_dir)
+
+def parse_merge_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    root = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(
+        prog="main.py merge",
+        description="Merge the outputs of --shard runs, de-duplicated by profileURL.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        type=Path,
+        metavar="SHARD_OUTPUT",
+        help="JSON or JSON Lines outputs (optionally .gz); for a profile found in "
+        "several, the record from the last one listed is kept.",
+    )
+    parser.add_argument("--output", "-o", type=Path, required=True)
+    parser.add_argument("--format", "-f", dest="output_format", choices=list(FORMATS))
+    parser.add_argument(
+        "--logging-config",
+        "-l",
+        type=Path,
+        default=root / "config" / "logging.example.yaml",
+    )
+    parser.add_argument(
+        "--run-size",
+        type=int,
+        default=10_000,
+        help="Records sorted in memory at a time (default: 10000).",
+    )
+    parser.add_argument(
+        "--tmp-dir",
+        type=Path,
+        default=None,
+        help="Directory for the temporary sorted runs (default: system temp dir).",
+    )
+    return parser.parse_args(argv)
+
+def parse_reparse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    root = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(
+        prog="main.py reparse",
+        description="Re-parse pages archived with --archive-dir, without network.",
+    )
+    parser.add_argument(
+        "archives",
+        nargs="+",
+        type=Path,
+        metavar="ARCHIVE",
+        help="Archive files (.warc.gz); a page archived more than once is taken "
+        "from the last archive listed.",
+    )
+    parser.add_argument("--output", "-o", type=Path, required=True)
+    parser.add_argument(
+        "--settings",
+        "-s",
+        type=Path,
+        default=root / "config" / "settings.example.json",
+    )
+    parser.add_argument(
+        "--logging-config",
+        "-l",
+        type=Path,
+        default=root / "config" / "logging.example.yaml",
+    )
+    parser.add_argument("--format", "-f", dest="output_format", choices=list(FORMATS))
+    parser.add_argument("--parser-backend", choices=list(BACKENDS), default=None)
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Parse in a pool of N processes (default: one per CPU; 0 parses in a "
+        "thread of the main process).",
+    )
+    parser.add_argument(
+        "--max-review-pages",
+        type=int,
+        default=None,
+        help='Review pages per profile to merge (default: settings "max_review_pages").',
+    )
+    return parser.parse_args(argv)
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     root = Path(__file__).resolve().parents[1]
@@ -133,7 +887,8 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         "-i",
         type=Path,
         default=default_input,
-        help=f"Path to input JSON with profile URLs (default: {default_input})",
+        help="Profile URLs as JSON, JSON Lines or one per line, optionally .gz "
+        f"(default: {default_input})",
     )
     parser.add_argument(
         "--output",
@@ -156,14 +911,286 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=default_logging,
         help="Path to logging YAML config.",
     )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=None,
+        help='Number of concurrent fetch workers (default: settings "concurrency").',
+    )
+    parser.add_argument(
+        "--ordered",
+        action="store_true",
+        default=None,
+        help="Write records in input order instead of completion order.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["sync", "async"],
+        default=None,
+        help='Fetch engine: thread pool ("sync") or asyncio/aiohttp ("async").',
+    )
+    parser.add_argument(
+        "--parser-backend",
+        choices=list(BACKENDS),
+        default=None,
+        help='HTML parser backend (default: settings "parser_backend" or html.parser).',
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Parse in a pool of N processes (0 parses in a thread of the main process).",
+    )
+    parser.add_argument(
+        "--format",
+        "-f",
+        dest="output_format",
+        choices=list(FORMATS),
+        default=None,
+        help="Output format: streamed JSON array, JSON Lines or indexed SQLite tables "
+        "(default: from the output suffix; .db/.sqlite mean sqlite). Outputs ending "
+        "in .gz are gzip-compressed.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory for the on-disk HTTP response cache (disabled by default).",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help="Seconds a cached page is served without revalidation (default: 86400).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run: skip URLs the progress journal marks "
+        "as done, retry failed ones and append to the existing output.",
+    )
+    parser.add_argument(
+        "--fingerprint-db",
+        type=Path,
+        default=None,
+        help="SQLite file of page fingerprints; unchanged pages reuse their "
+        "previous record instead of being re-parsed.",
+    )
+    parser.add_argument(
+        "--adaptive-rate",
+        action="store_true",
+        default=None,
+        help="Adapt the request rate to the site: back off on 429s/timeouts and "
+        'speed up again when they stop (bounds from settings "rate_*").',
+    )
+    parser.add_argument(
+        "--max-review-pages",
+        type=int,
+        default=None,
+        help="Also fetch up to N review pages per profile, concurrently (default: "
+        'settings "max_review_pages" or 1, only the reviews on the profile page).',
+    )
+    parser.add_argument(
+        "--crawl",
+        nargs="+",
+        metavar="LISTING_URL",
+        default=None,
+        help="Discover profiles by crawling these category/listing URLs (and their "
+        "pagination) instead of reading --input; profiles are scraped as they are found.",
+    )
+    parser.add_argument(
+        "--crawl-max-pages",
+        type=int,
+        default=None,
+        help="Stop crawling after N listing pages (default: no limit).",
+    )
+    parser.add_argument(
+        "--crawl-max-depth",
+        type=int,
+        default=None,
+        help="Follow pagination at most N hops from a start URL (default: no limit).",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        help="Where to write the JSON run summary (default: <output>.metrics.json).",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        default=None,
+        help="Keep a Prometheus text-format metrics file up to date during the run.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics on http://HOST:PORT/metrics during the run.",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default=None,
+        help="Interface for --metrics-port (default: 127.0.0.1; 0.0.0.0 for all).",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILE_MODES),
+        default=None,
+        help="Profile the run: deterministic cProfile of every thread (cpu) or a "
+        "low-overhead stack sampler (sample).",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also trace allocations with tracemalloc and report the top allocation sites.",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=Path,
+        default=None,
+        help="Where to write the profiling report (default: <output>.profile.txt).",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=30,
+        help="Number of functions, allocation sites and slowest URLs to report.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=None,
+        help="Parse pages (with lxml) while they download instead of after, and stop "
+        'reading at any of settings "stream_stop_markers".',
+    )
+    parser.add_argument(
+        "--archive-dir",
+        type=Path,
+        default=None,
+        help="Keep every fetched page in a compressed archive in this directory, "
+        "for 'main.py reparse' to parse again later without network.",
+    )
+    parser.add_argument(
+        "--shard",
+        default=None,
+        metavar="K/N",
+        help="Only scrape the profiles of shard K of N (1 <= K <= N), chosen by a "
+        "stable hash of the profile URL; combine the outputs with 'main.py merge'.",
+    )
+    parser.add_argument(
+        "--delta-state",
+        type=Path,
+        default=None,
+        help="Keep fingerprints of every company and review in this SQLite file and "
+        "write only what changed since the previous run to the change feed "
+        "(use one state file per --shard).",
+    )
+    parser.add_argument(
+        "--delta-output",
+        type=Path,
+        default=None,
+        help="Change feed path (default: <output>.changes.jsonl; .gz to compress).",
+    )
+    parser.add_argument(
+        "--delta-only",
+        action="store_true",
+        default=None,
+        help="Write only the change feed, not the full output.",
+    )
+    parser.add_argument(
+        "--schedule-db",
+        type=Path,
+        default=None,
+        help="Keep each profile's fetch history (changes, review growth, failures) "
+        "in this SQLite file, for --refresh-budget.",
+    )
+    parser.add_argument(
+        "--refresh-budget",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Only fetch the N input profiles most likely to have changed since "
+        "their last fetch, according to --schedule-db.",
+    )
 
     return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    args = parse_args()
-    run(
-        input_path=args.input,
-        output_path=args.output,
-        settings_path=args.settings,
-        logging_config_path=args.logging_config,
-    )
\ No newline at end of file
+    if sys.argv[1:2] == ["reparse"]:
+        args = parse_reparse_args(sys.argv[2:])
+        reparse(
+            archive_paths=args.archives,
+            output_path=args.output,
+            settings_path=args.settings,
+            logging_config_path=args.logging_config,
+            parser_backend=args.parser_backend,
+            parse_workers=args.parse_workers,
+            output_format=args.output_format,
+            max_review_pages=args.max_review_pages,
+        )
+    elif sys.argv[1:2] == ["serve"]:
+        args = parse_serve_args(sys.argv[2:])
+        serve_jobs(
+            settings_path=args.settings,
+            logging_config_path=args.logging_config,
+            address=args.address,
+            concurrency=args.concurrency,
+            parser_backend=args.parser_backend,
+            cache_dir=args.cache_dir,
+            fingerprint_db=args.fingerprint_db,
+            adaptive_rate=args.adaptive_rate,
+            max_review_pages=args.max_review_pages,
+            job_workers=args.job_workers,
+            max_queued_jobs=args.max_queued_jobs,
+        )
+    elif sys.argv[1:2] == ["merge"]:
+        args = parse_merge_args(sys.argv[2:])
+        merge(
+            input_paths=args.inputs,
+            output_path=args.output,
+            logging_config_path=args.logging_config,
+            output_format=args.output_format,
+            run_size=args.run_size,
+            tmp_dir=args.tmp_dir,
+        )
+    else:
+        args = parse_args()
+        run(
+            input_path=args.input,
+            output_path=args.output,
+            settings_path=args.settings,
+            logging_config_path=args.logging_config,
+            concurrency=args.concurrency,
+            ordered=args.ordered,
+            engine=args.engine,
+            parser_backend=args.parser_backend,
+            parse_workers=args.parse_workers,
+            output_format=args.output_format,
+            cache_dir=args.cache_dir,
+            cache_ttl=args.cache_ttl,
+            resume=args.resume,
+            fingerprint_db=args.fingerprint_db,
+            adaptive_rate=args.adaptive_rate,
+            max_review_pages=args.max_review_pages,
+            crawl=args.crawl,
+            crawl_max_pages=args.crawl_max_pages,
+            crawl_max_depth=args.crawl_max_depth,
+            metrics_file=args.metrics_file,
+            metrics_textfile=args.metrics_textfile,
+            metrics_port=args.metrics_port,
+            metrics_host=args.metrics_host,
+            profile=args.profile,
+            profile_memory=args.profile_memory,
+            profile_output=args.profile_output,
+            profile_top=args.profile_top,
+            stream=args.stream,
+            archive_dir=args.archive_dir,
+            shard=args.shard,
+            delta_state=args.delta_state,
+            delta_output=args.delta_output,
+            delta_only=args.delta_only,
+            schedule_db=args.schedule_db,
+            refresh_budget=args.refresh_budget,
+        )
\ No newline at end of file
@@ -1,142 +1,290 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple, Union
 
 from bs4 import BeautifulSoup
 
+from parsers.document import (
+    DEFAULT_BACKEND,
+    LxmlPage,
+    Page,
+    ParsedPage,
+    as_page,
+    has_class,
+    lxml_text,
+)
+from parsers.extraction import ExtractionEngine, first_match, is_inside
+from parsers.models import Address, CompanyRecord
+
 logger = logging.getLogger(__name__)
 
-def _get_meta(soup: BeautifulSoup, prop: str, attr: str = "property") -> str | None:
-    tag = soup.find("meta", {attr: prop})
-    if tag and tag.get("content"):
-        return tag["content"].strip()
+def _get_meta(page: Page, prop: str, attr: str = "property") -> str | None:
+    tag = page.meta_tag(prop, attr)
+    if tag is not None and tag.get("content"):
+        return tag.get("content").strip()
     return None
 
-def parse_company_profile(html: str, url: str) -> Dict[str, Any]:
+_ADDRESS_ITEMPROPS = (
+    "streetAddress",
+    "addressLocality",
+    "addressRegion",
+    "addressCountry",
+    "postalCode",
+)
+
+def parse_company_profile(
+    html: Union[str, BeautifulSoup, Page],
+    url: str,
+    backend: str = DEFAULT_BACKEND,
+) -> Dict[str, Any]:
     """Parse high-level company profile information from a Clutch.co HTML page.
 
     This parser is intentionally resilient: it relies on Open Graph tags and common
     layout patterns so it continues working even if the page structure changes.
+    ``html`` may also be a page shared with the reviews parser; raw HTML is
+    parsed with ``backend`` ("html.parser" or "lxml").
     """
-    soup = BeautifulSoup(html, "html.parser")
-
-    og_title = _get_meta(soup, "og:title")
-    og_description = _get_meta(soup, "og:description")
-    og_url = _get_meta(soup, "og:url")
-    og_image = _get_meta(soup, "og:image")
-    og_site_name = _get_meta(soup, "og:site_name")
-
-    # Name / tagline fallbacks
-    h1 = soup.find("h1")
-    headline_text = h1.get_text(strip=True) if h1 else None
-
-    name = og_title or headline_text or og_site_name or "Unknown Company"
-
-    # Rating and review count: try schema.org AggregateRating if present
-    rating_value = None
-    rating_count = None
-    aggregate_rating = soup.find(attrs={"itemtype": "http://schema.org/AggregateRating"})
-    if aggregate_rating:
-        rating_value_tag = aggregate_rating.find(attrs={"itemprop": "ratingValue"})
-        rating_count_tag = aggregate_rating.find(attrs={"itemprop": "reviewCount"})
-        if rating_value_tag:
-            rating_value = rating_value_tag.get_text(strip=True)
-        if rating_count_tag:
-            rating_count = rating_count_tag.get_text(strip=True)
-
-    summary: Dict[str, Any] = {
-        "name": name,
-        "logo": og_image,
-        "tagLine": None,
-        "description": og_description,
-        "totalReview": rating_count,
-        "rating": rating_value,
-        "verificationStatus": None,
-        "minProjectSize": None,
-        "averageHourlyRate": None,
-        "employees": None,
-        "founded": None,
-        "video_url": None,
-        "languages": [],  # type: List[str]
-        "timezones": [],  # type: List[str]
+    return extract_company_profile(html, url, backend).to_dict()
+
+def extract_company_profile(
+    html: Union[str, BeautifulSoup, Page],
+    url: str,
+    backend: str = DEFAULT_BACKEND,
+) -> CompanyRecord:
+    """``parse_company_profile`` returning the in-memory CompanyRecord."""
+    page = as_page(html, backend)
+    if page.backend == "lxml":
+        fields = _extract_fields_lxml(page)
+    else:
+        fields = _extract_fields_soup(page)
+
+    # Addresses: we keep this generic, since Clutch layout may change.
+    addresses = [
+        Address(*values) for values in fields["addresses"] if any(values)
+    ]
+
+    record = CompanyRecord(
+        name=(
+            fields["og_title"]
+            or fields["headline"]
+            or fields["og_site_name"]
+            or "Unknown Company"
+        ),
+        profile_url=fields["og_url"] or url,
+        logo=fields["og_image"],
+        tag_line=fields["tagline"],
+        description=fields["description"] or fields["og_description"],
+        total_review=fields["rating_count"],
+        rating=fields["rating_value"],
+        founded=fields["founded"],
+        addresses=addresses,
+        # Aggregate rating block, if present
+        aggregate_total_review=fields["rating_count"],
+        aggregate_rating=fields["rating_value"],
+        website_url=fields["website_url"],
+    )
+
+    logger.debug("Parsed profile for %s: %s", url, record.name)
+    return record
+
+def _meta_fields(page: Page) -> Dict[str, Any]:
+    return {
+        "og_title": _get_meta(page, "og:title"),
+        "og_description": _get_meta(page, "og:description"),
+        "og_url": _get_meta(page, "og:url"),
+        "og_image": _get_meta(page, "og:image"),
+        "og_site_name": _get_meta(page, "og:site_name"),
     }
 
-    # Basic extraction of tagline / description from known selectors
-    tagline_node = soup.select_one(".provider-heading h2, .summary__tagline, .tagline")
-    if tagline_node:
-        summary["tagLine"] = tagline_node.get_text(strip=True)
+_OG_PROPERTIES = {
+    "og_title": "og:title",
+    "og_description": "og:description",
+    "og_url": "og:url",
+    "og_image": "og:image",
+    "og_site_name": "og:site_name",
+}
+
+def _extract_fields_soup(page: ParsedPage) -> Dict[str, Any]:
+    """Collect the raw profile fields from a BeautifulSoup tree in one pass.
+
+    Each field registers the nodes it needs with an ExtractionEngine, which
+    walks the tree once; the matching rules are those of the original
+    find/select_one lookups (kept as comments), so results are identical.
+    """
+    fields: Dict[str, Any] = dict.fromkeys(_OG_PROPERTIES)
+    fields.update(
+        headline=None,
+        rating_value=None,
+        rating_count=None,
+        tagline=None,
+        description=None,
+        founded=None,
+        addresses=None,
+        website_url=None,
+    )
+    engine = ExtractionEngine()
+
+    def setter(key: str, value: Callable[[Any], Any]) -> Callable[[Any], None]:
+        def store(node: Any) -> None:
+            fields[key] = value(node)
+
+        return store
+
+    def text(node: Any) -> str:
+        return node.get_text(strip=True)
+
+    def content(tag: Any) -> str | None:
+        value = tag.get("content")
+        return value.strip() if value else None
+
+    # <meta property="og:..."> - the first such tag, even if its content is empty
+    for key, prop in _OG_PROPERTIES.items():
+        engine.on_attr(
+            "property",
+            prop,
+            first_match(setter(key, content), accept=lambda tag: tag.name == "meta"),
+        )
+
+    # Name / tagline fallbacks: soup.find("h1")
+    engine.on_tag("h1", first_match(setter("headline", text)))
+
+    # Rating and review count from the first schema.org AggregateRating
+    aggregate_rating: List[Any] = []
+    engine.on_attr(
+        "itemtype",
+        "http://schema.org/AggregateRating",
+        first_match(aggregate_rating.append),
+    )
+    for itemprop, key in (("ratingValue", "rating_value"), ("reviewCount", "rating_count")):
+        engine.on_attr(
+            "itemprop",
+            itemprop,
+            first_match(
+                setter(key, text),
+                accept=lambda tag: bool(aggregate_rating)
+                and is_inside(tag, aggregate_rating[0]),
+            ),
+        )
+
+    # select_one(".provider-heading h2, .summary__tagline, .tagline")
+    tagline = first_match(
+        setter("tagline", text),
+        accept=lambda tag: tag.name != "h2"
+        or any("provider-heading" in (p.get("class") or ()) for p in tag.parents)
+        or bool({"summary__tagline", "tagline"} & set(tag.get("class") or ())),
+    )
+    engine.on_tag("h2", tagline)
+    engine.on_attr("class", "summary__tagline", tagline)
+    engine.on_attr("class", "tagline", tagline)
 
-    long_description_node = soup.select_one(
-        ".summary-description, .provider-description, [data-role='description']"
+    # select_one(".summary-description, .provider-description, [data-role='description']")
+    description = first_match(
+        setter("description", lambda tag: tag.get_text(separator=" ", strip=True))
     )
-    if long_description_node:
-        text = long_description_node.get_text(separator=" ", strip=True)
-        if text:
-            summary["description"] = text
-
-    # Simple extraction of "founded" info if it appears as text
-    founded_candidates = soup.find_all(string=lambda s: s and "Founded" in s)
-    for candidate in founded_candidates:
-        text = candidate.strip()
+    engine.on_attr("class", "summary-description", description)
+    engine.on_attr("class", "provider-description", description)
+    engine.on_attr("data-role", "description", description)
+
+    # find_all(string=lambda s: s and "Founded" in s), comments included
+    engine.on_text("Founded", first_match(setter("founded", lambda s: s.strip())))
+
+    # Every schema.org PostalAddress; each itemprop is its first descendant.
+    address_blocks: List[Tuple[Any, Dict[str, Any]]] = []
+
+    def address_block(tag: Any) -> bool:
+        address_blocks.append((tag, {}))
+        return False
+
+    engine.on_attr("itemtype", "http://schema.org/PostalAddress", address_block)
+
+    def address_part(tag: Any) -> bool:
+        prop = tag["itemprop"]
+        for block, values in address_blocks:
+            if prop not in values and is_inside(tag, block):
+                values[prop] = text(tag)
+        return False
+
+    for prop in _ADDRESS_ITEMPROPS:
+        engine.on_attr("itemprop", prop, address_part)
+
+    # select_one("a[href^='http']:not([href*='clutch.co'])")
+    def external_link(tag: Any) -> bool:
+        href = tag.get("href")
+        return isinstance(href, str) and href.startswith("http") and "clutch.co" not in href
+
+    engine.on_tag(
+        "a", first_match(setter("website_url", lambda tag: tag.get("href")), external_link)
+    )
+
+    engine.run(page.soup)
+    fields["addresses"] = [
+        tuple(values.get(prop) for prop in _ADDRESS_ITEMPROPS)
+        for _, values in address_blocks
+    ]
+    return fields
+
+# XPath equivalents of the CSS selectors used by the BeautifulSoup path.
+_TAGLINE_XPATH = (
+    f"(//*[{has_class('provider-heading')}]//h2"
+    f" | //*[{has_class('summary__tagline')}]"
+    f" | //*[{has_class('tagline')}])[1]"
+)
+_DESCRIPTION_XPATH = (
+    f"(//*[{has_class('summary-description')}]"
+    f" | //*[{has_class('provider-description')}]"
+    " | //*[@data-role='description'])[1]"
+)
+# bs4's find_all(string=...) also visits comments, so include them here.
+_FOUNDED_XPATH = "//text()[contains(., 'Founded')] | //comment()[contains(., 'Founded')]"
+_WEBSITE_XPATH = "(//a[starts-with(@href, 'http') and not(contains(@href, 'clutch.co'))])[1]"
+
+def _extract_fields_lxml(page: LxmlPage) -> Dict[str, Any]:
+    """Collect the raw profile fields from an lxml tree using XPath."""
+    fields = _meta_fields(page)
+
+    h1 = page.xpath_first("(//h1)[1]")
+    fields["headline"] = lxml_text(h1) if h1 is not None else None
+
+    fields["rating_value"] = None
+    fields["rating_count"] = None
+    aggregate_rating = page.first_itemtype("http://schema.org/AggregateRating")
+    if aggregate_rating is not None:
+        rating_value_tag = page.xpath_first(
+            ".//*[@itemprop='ratingValue']", aggregate_rating
+        )
+        rating_count_tag = page.xpath_first(
+            ".//*[@itemprop='reviewCount']", aggregate_rating
+        )
+        if rating_value_tag is not None:
+            fields["rating_value"] = lxml_text(rating_value_tag)
+        if rating_count_tag is not None:
+            fields["rating_count"] = lxml_text(rating_count_tag)
+
+    tagline_node = page.xpath_first(_TAGLINE_XPATH)
+    fields["tagline"] = lxml_text(tagline_node) if tagline_node is not None else None
+
+    description_node = page.xpath_first(_DESCRIPTION_XPATH)
+    fields["description"] = (
+        lxml_text(description_node, " ") if description_node is not None else None
+    )
+
+    fields["founded"] = None
+    for candidate in page.root.xpath(_FOUNDED_XPATH):
+        text = (candidate if isinstance(candidate, str) else candidate.text or "").strip()
         if "Founded" in text:
-            summary["founded"] = text
+            fields["founded"] = text
             break
 
-    # Addresses: we keep this generic, since Clutch layout may change.
-    addresses: List[Dict[str, Any]] = []
-    address_blocks = soup.select("[itemtype='http://schema.org/PostalAddress']")
-    for block in address_blocks:
-        def safe_get(itemprop: str) -> str | None:
-            el = block.find(attrs={"itemprop": itemprop})
-            return el.get_text(strip=True) if el else None
-
-        address = {
-            "title": None,
-            "streetAddress": safe_get("streetAddress"),
-            "locality": safe_get("addressLocality"),
-            "region": safe_get("addressRegion"),
-            "country": safe_get("addressCountry"),
-            "postalCode": safe_get("postalCode"),
-            "locationEmployees": None,
-            "telephone": None,
-        }
-        if any(address.values()):
-            addresses.append(address)
-
-    # Extract top-level website URL if provided
-    website_url = None
-    website_link = soup.select_one("a[href^='http']:not([href*='clutch.co'])")
-    if website_link:
-        website_url = website_link.get("href")
-
-    # Aggregate rating block, if present
-    rating = {
-        "totalReview": summary["totalReview"],
-        "overallRating": summary["rating"],
-    }
-
-    data: Dict[str, Any] = {
-        "summary": summary,
-        "addresses": addresses,
-        "verification": {
-            "businessEntity": {},
-            "paymentLegalFilings": {},
-        },
-        "chartPie": {
-            "service_provided": {"legend_title": "Service Lines", "slices": []},
-            "focus": {"charts": {}},
-            "industries": {"slices": []},
-            "clients": {"slices": []},
-        },
-        "rating": rating,
-        "websiteUrl": website_url,
-        "profileURL": og_url or url,
-        "reviewInsights": {
-            "topMentions": [],
-            "reviewHighlights": [],
-        },
-    }
+    addresses = []
+    for block in page.itemtype_nodes("http://schema.org/PostalAddress"):
+        values = []
+        for prop in _ADDRESS_ITEMPROPS:
+            el = page.xpath_first(f".//*[@itemprop='{prop}']", block)
+            values.append(lxml_text(el) if el is not None else None)
+        addresses.append(tuple(values))
+    fields["addresses"] = addresses
 
-    logger.debug("Parsed profile for %s: %s", url, data["summary"])
-    return data
\ No newline at end of file
+    website_link = page.xpath_first(_WEBSITE_XPATH)
+    fields["website_url"] = website_link.get("href") if website_link is not None else None
+    return fields
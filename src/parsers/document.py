@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, Tag
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - optional dependency
+    lxml = None
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "html.parser"
+BACKENDS = ("html.parser", "lxml")
+
+# bs4's get_text() skips the contents of these tags; the lxml path mirrors it.
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+class ParsedPage:
+    """A Clutch.co page parsed once and shared between parsers.
+
+    Building the tree is the most expensive part of parsing, so callers that
+    run several parsers over the same HTML should build one ``ParsedPage`` and
+    pass it to each of them. Lookups that several parsers repeat (schema.org
+    ``itemtype`` nodes, ``<meta>`` tags) are indexed on first use.
+    """
+
+    backend = "html.parser"
+
+    def __init__(self, html: Union[str, bytes, BeautifulSoup]) -> None:
+        if isinstance(html, BeautifulSoup):
+            self.soup = html
+        else:
+            self.soup = BeautifulSoup(html, "html.parser")
+        self._itemtypes: Optional[Dict[str, List[Tag]]] = None
+        self._meta: Optional[Dict[Tuple[str, str], Tag]] = None
+
+    def itemtype_nodes(self, itemtype: str) -> List[Tag]:
+        """All nodes whose ``itemtype`` attribute equals ``itemtype``, in document order."""
+        if self._itemtypes is None:
+            index: Dict[str, List[Tag]] = {}
+            for node in self.soup.find_all(attrs={"itemtype": True}):
+                index.setdefault(node["itemtype"], []).append(node)
+            self._itemtypes = index
+        return self._itemtypes.get(itemtype, [])
+
+    def first_itemtype(self, itemtype: str) -> Optional[Tag]:
+        nodes = self.itemtype_nodes(itemtype)
+        return nodes[0] if nodes else None
+
+    def meta_tag(self, value: str, attr: str = "property") -> Optional[Tag]:
+        """The first ``<meta>`` tag whose ``attr`` attribute equals ``value``."""
+        if self._meta is None:
+            index: Dict[Tuple[str, str], Tag] = {}
+            for tag in self.soup.find_all("meta"):
+                for name, attr_value in tag.attrs.items():
+                    if isinstance(attr_value, str):
+                        index.setdefault((name, attr_value), tag)
+            self._meta = index
+        return self._meta.get((attr, value))
+
+class LxmlPage:
+    """The same shared-page interface as ParsedPage, backed by an lxml tree.
+
+    Parsers detect this backend and run XPath versions of their extractors,
+    which skip BeautifulSoup's pure-Python tree building entirely.
+    """
+
+    backend = "lxml"
+
+    def __init__(self, html: Union[str, bytes]) -> None:
+        if lxml is None:
+            raise RuntimeError(
+                "The lxml parser backend requires lxml; install it with "
+                "'pip install lxml'."
+            )
+        try:
+            self.root = lxml.html.document_fromstring(html)
+        except (etree.ParserError, ValueError):
+            # Empty documents (and str input with an XML encoding declaration)
+            # are rejected by lxml; fall back to bytes or an empty tree.
+            if isinstance(html, str) and html.strip():
+                self.root = lxml.html.document_fromstring(html.encode("utf-8"))
+            else:
+                self.root = lxml.html.document_fromstring("<html></html>")
+        self._itemtypes: Optional[Dict[str, List[Any]]] = None
+        self._meta: Optional[Dict[Tuple[str, str], Any]] = None
+
+    @classmethod
+    def from_root(cls, root: Any) -> "LxmlPage":
+        """Wrap a tree that was already built (e.g. by an incremental parser)."""
+        page = cls.__new__(cls)
+        page.root = root
+        page._itemtypes = None
+        page._meta = None
+        return page
+
+    def itemtype_nodes(self, itemtype: str) -> List[Any]:
+        """All elements whose ``itemtype`` attribute equals ``itemtype``, in document order."""
+        if self._itemtypes is None:
+            index: Dict[str, List[Any]] = {}
+            for node in self.root.xpath("//*[@itemtype]"):
+                index.setdefault(node.get("itemtype"), []).append(node)
+            self._itemtypes = index
+        return self._itemtypes.get(itemtype, [])
+
+    def first_itemtype(self, itemtype: str) -> Optional[Any]:
+        nodes = self.itemtype_nodes(itemtype)
+        return nodes[0] if nodes else None
+
+    def meta_tag(self, value: str, attr: str = "property") -> Optional[Any]:
+        """The first ``<meta>`` element whose ``attr`` attribute equals ``value``."""
+        if self._meta is None:
+            index: Dict[Tuple[str, str], Any] = {}
+            for tag in self.root.iter("meta"):
+                for name, attr_value in tag.attrib.items():
+                    index.setdefault((name, attr_value), tag)
+            self._meta = index
+        return self._meta.get((attr, value))
+
+    def xpath_first(self, expr: str, node: Any = None) -> Optional[Any]:
+        found = (self.root if node is None else node).xpath(expr)
+        return found[0] if found else None
+
+Page = Union[ParsedPage, LxmlPage]
+
+def as_page(
+    source: Union[str, bytes, BeautifulSoup, ParsedPage, LxmlPage],
+    backend: str = DEFAULT_BACKEND,
+) -> Page:
+    """Return ``source`` as a shared page, parsing raw HTML with ``backend``."""
+    if isinstance(source, (ParsedPage, LxmlPage)):
+        return source
+    if isinstance(source, BeautifulSoup):
+        return ParsedPage(source)
+    return build_page(source, backend)
+
+def build_page(html: Union[str, bytes], backend: str = DEFAULT_BACKEND) -> Page:
+    """Parse ``html`` once with the configured parser backend."""
+    if backend == "lxml":
+        return LxmlPage(html)
+    if backend == "html.parser":
+        return ParsedPage(html)
+    raise ValueError(f"Unknown parser backend {backend!r}; expected one of {BACKENDS}")
+
+def has_class(name: str) -> str:
+    """XPath predicate matching a single class token, like the CSS ``.name``."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def lxml_text(node: Any, separator: str = "") -> str:
+    """Equivalent of bs4's ``Tag.get_text(separator, strip=True)`` for lxml elements."""
+    parts: List[str] = []
+    stack: List[Any] = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        # Comments/processing instructions have a non-string tag.
+        if not isinstance(item.tag, str) or item.tag in _NON_TEXT_TAGS:
+            continue
+        if item.text:
+            parts.append(item.text)
+        for child in reversed(item):
+            if child.tail:
+                stack.append(child.tail)
+            stack.append(child)
+    stripped = (part.strip() for part in parts)
+    return separator.join(part for part in stripped if part)
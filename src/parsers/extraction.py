@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bs4 import NavigableString, Tag
+
+logger = logging.getLogger(__name__)
+
+# A handler receives a matching node and returns True once it needs no more.
+Handler = Callable[[Any], bool]
+
+class ExtractionEngine:
+    """Runs many field extractors over a BeautifulSoup tree in one traversal.
+
+    Extractors register interest in a tag name (``on_tag``), an attribute
+    value (``on_attr``; a value of None means any value, and multi-valued
+    attributes such as ``class`` match per token) or a substring of the
+    document's text nodes (``on_text``). ``run`` walks the tree once in
+    document order and hands each node to the handlers interested in it,
+    dropping a handler as soon as it returns True. The walk stops early
+    when no handler is left.
+    """
+
+    def __init__(self) -> None:
+        self._by_tag: Dict[str, List[Handler]] = {}
+        self._by_attr: Dict[Tuple[str, Optional[str]], List[Handler]] = {}
+        self._by_text: List[Tuple[str, Handler]] = []
+        self._attr_names: Dict[str, int] = {}
+        self._remaining = 0
+
+    def on_tag(self, name: str, handler: Handler) -> None:
+        self._by_tag.setdefault(name, []).append(handler)
+        self._remaining += 1
+
+    def on_attr(self, attr: str, value: Optional[str], handler: Handler) -> None:
+        self._by_attr.setdefault((attr, value), []).append(handler)
+        self._attr_names[attr] = self._attr_names.get(attr, 0) + 1
+        self._remaining += 1
+
+    def on_text(self, needle: str, handler: Handler) -> None:
+        self._by_text.append((needle, handler))
+        self._remaining += 1
+
+    def _dispatch(self, handlers: List[Handler], node: Any) -> None:
+        done = [handler for handler in handlers if handler(node)]
+        for handler in done:
+            handlers.remove(handler)
+            self._remaining -= 1
+
+    def run(self, root: Tag) -> None:
+        by_tag = self._by_tag
+        by_attr = self._by_attr
+        attr_names = self._attr_names
+        for node in root.descendants:
+            if not self._remaining:
+                break
+            if isinstance(node, Tag):
+                handlers = by_tag.get(node.name)
+                if handlers:
+                    self._dispatch(handlers, node)
+                for attr, value in node.attrs.items():
+                    if attr not in attr_names:
+                        continue
+                    handlers = by_attr.get((attr, None))
+                    if handlers:
+                        self._dispatch(handlers, node)
+                    for token in (value,) if isinstance(value, str) else value:
+                        handlers = by_attr.get((attr, token))
+                        if handlers:
+                            self._dispatch(handlers, node)
+            elif self._by_text and isinstance(node, NavigableString):
+                for needle, handler in list(self._by_text):
+                    if needle in node and handler(node):
+                        self._by_text.remove((needle, handler))
+                        self._remaining -= 1
+
+def first_match(
+    store: Callable[[Any], None],
+    accept: Optional[Callable[[Any], bool]] = None,
+) -> Handler:
+    """A handler for "the first node matching any of several interests".
+
+    Register the returned handler for each interest; the first node that
+    passes ``accept`` is passed to ``store`` and the others are ignored.
+    """
+    found = False
+
+    def handler(node: Any) -> bool:
+        nonlocal found
+        if found:
+            return True
+        if accept is not None and not accept(node):
+            return False
+        found = True
+        store(node)
+        return True
+
+    return handler
+
+def is_inside(node: Any, scope: Any) -> bool:
+    """Whether ``scope`` is an ancestor of ``node`` (by identity)."""
+    return any(parent is scope for parent in node.parents)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import List
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Links to company profiles, e.g. href="/profile/acme" or an absolute URL.
+_PROFILE_LINK_RE = re.compile(r"""href=["']([^"']*/profile/[^"'?#/]+)/?[?#"']""")
+
+def parse_profile_links(html: str, url: str) -> List[str]:
+    """Absolute URLs of the company profiles linked from a listing page.
+
+    Category and directory listings link each company several times (logo,
+    name, "view profile"); duplicates within the page are dropped, in order.
+    """
+    seen = set()
+    links = []
+    for href in _PROFILE_LINK_RE.findall(html):
+        parts = urlsplit(urljoin(url, href.replace("&amp;", "&")))
+        if parts.scheme not in ("http", "https"):
+            continue
+        link = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+        if link not in seen:
+            seen.add(link)
+            links.append(link)
+    logger.debug("Found %d profile links on %s", len(links), url)
+    return links
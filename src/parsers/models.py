@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import enum
+import hashlib
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Scraped records are held by the thousands (reorder buffers, review pages
+# waiting to be merged, parse-worker results), so the in-memory model uses
+# slotted dataclasses instead of nested dicts. The JSON structure described
+# in docs/clutch_data_model.md is produced by ``to_dict`` at export time.
+
+class _Unset(enum.Enum):
+    UNSET = "unset"
+
+# Marks reviewer attributes the page did not provide; they are left out of
+# the exported ``reviewer`` object rather than written as null.
+UNSET = _Unset.UNSET
+
+def intern_text(value: Optional[str]) -> Optional[str]:
+    """Intern short, frequently repeated values (dates, places, bands)."""
+    return sys.intern(value) if value else value
+
+@dataclass(slots=True)
+class Address:
+    street_address: Optional[str] = None
+    locality: Optional[str] = None
+    region: Optional[str] = None
+    country: Optional[str] = None
+    postal_code: Optional[str] = None
+    title: Optional[str] = None
+    location_employees: Optional[str] = None
+    telephone: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        self.locality = intern_text(self.locality)
+        self.region = intern_text(self.region)
+        self.country = intern_text(self.country)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "streetAddress": self.street_address,
+            "locality": self.locality,
+            "region": self.region,
+            "country": self.country,
+            "postalCode": self.postal_code,
+            "locationEmployees": self.location_employees,
+            "telephone": self.telephone,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Address":
+        return cls(
+            street_address=data.get("streetAddress"),
+            locality=data.get("locality"),
+            region=data.get("region"),
+            country=data.get("country"),
+            postal_code=data.get("postalCode"),
+            title=data.get("title"),
+            location_employees=data.get("locationEmployees"),
+            telephone=data.get("telephone"),
+        )
+
+# Reviewer attribute -> exported key.
+_REVIEWER_KEYS = (
+    ("name", "name"),
+    ("title", "title"),
+    ("industry", "industry"),
+    ("company_size", "companySize"),
+    ("location", "location"),
+    ("type", "type"),
+    ("verification", "verification"),
+)
+
+@dataclass(slots=True)
+class Reviewer:
+    name: Any = UNSET
+    title: Any = UNSET
+    industry: Any = UNSET
+    company_size: Any = UNSET
+    location: Any = UNSET
+    type: Any = UNSET
+    verification: Any = UNSET
+
+    def __post_init__(self) -> None:
+        for attr, _ in _REVIEWER_KEYS:
+            value = getattr(self, attr)
+            if isinstance(value, str):
+                setattr(self, attr, sys.intern(value))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            key: getattr(self, attr)
+            for attr, key in _REVIEWER_KEYS
+            if getattr(self, attr) is not UNSET
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Reviewer":
+        return cls(**{attr: data[key] for attr, key in _REVIEWER_KEYS if key in data})
+
+@dataclass(slots=True, frozen=True)
+class Project:
+    name: Optional[str] = None
+    categories: Tuple[str, ...] = ()
+    budget: Optional[str] = None
+    length: Optional[str] = None
+    description: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "categories": list(self.categories),
+            "budget": self.budget,
+            "length": self.length,
+            "description": self.description,
+        }
+
+    def __reduce__(self) -> Any:
+        # Unpickle the shared empty project as the same instance.
+        if self == NO_PROJECT:
+            return "NO_PROJECT"
+        return (Project, (self.name, self.categories, self.budget, self.length, self.description))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Project":
+        project = cls(
+            name=data.get("name"),
+            categories=tuple(data.get("categories") or ()),
+            budget=data.get("budget"),
+            length=data.get("length"),
+            description=data.get("description"),
+        )
+        return NO_PROJECT if project == NO_PROJECT else project
+
+# Clutch's review markup carries no project details yet, so every review
+# shares this one instance.
+NO_PROJECT = Project()
+
+@dataclass(slots=True)
+class Review:
+    name: Optional[str] = None
+    date_published: Optional[str] = None
+    rating: Optional[float] = None
+    # The review text is exported as both ``review.review`` and
+    # ``review.comments`` but stored once.
+    text: Optional[str] = None
+    reviewer: Reviewer = field(default_factory=Reviewer)
+    project: Project = NO_PROJECT
+    quality: Optional[float] = None
+    schedule: Optional[float] = None
+    cost: Optional[float] = None
+    willing_to_refer: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        self.date_published = intern_text(self.date_published)
+
+    def key(self) -> tuple:
+        """Identity used to drop duplicates seen on several review pages."""
+        name = self.reviewer.name
+        return (
+            self.name,
+            self.date_published,
+            None if name is UNSET else name,
+            self.rating,
+            self.text,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "datePublished": self.date_published,
+            "project": self.project.to_dict(),
+            "review": {
+                "rating": self.rating,
+                "quality": self.quality,
+                "schedule": self.schedule,
+                "cost": self.cost,
+                "willingToRefer": self.willing_to_refer,
+                "review": self.text,
+                "comments": self.text,
+            },
+            "reviewer": self.reviewer.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Review":
+        body = data.get("review") or {}
+        return cls(
+            name=data.get("name"),
+            date_published=data.get("datePublished"),
+            rating=body.get("rating"),
+            text=body.get("comments", body.get("review")),
+            reviewer=Reviewer.from_dict(data.get("reviewer") or {}),
+            project=Project.from_dict(data.get("project") or {}),
+            quality=body.get("quality"),
+            schedule=body.get("schedule"),
+            cost=body.get("cost"),
+            willing_to_refer=body.get("willingToRefer"),
+        )
+
+def _empty_verification() -> Dict[str, Any]:
+    return {"businessEntity": {}, "paymentLegalFilings": {}}
+
+def _empty_chart_pie() -> Dict[str, Any]:
+    return {
+        "service_provided": {"legend_title": "Service Lines", "slices": []},
+        "focus": {"charts": {}},
+        "industries": {"slices": []},
+        "clients": {"slices": []},
+    }
+
+def _empty_review_insights() -> Dict[str, Any]:
+    return {"topMentions": [], "reviewHighlights": []}
+
+def _unless_empty(value: Optional[Dict[str, Any]], empty: Any) -> Optional[Dict[str, Any]]:
+    return None if not value or value == empty() else value
+
+@dataclass(slots=True)
+class CompanyRecord:
+    """One company profile; ``to_dict`` gives the exported JSON object.
+
+    The ``summary`` fields are flattened onto the record. ``aggregate_*``
+    hold the top-level ``rating`` block, which normalization recomputes
+    from the reviews. ``reviews`` is None until reviews are attached, and
+    the object is then exported without a ``reviews`` key. The chart,
+    verification and insight blocks are None while empty.
+    """
+
+    name: str
+    profile_url: str
+    logo: Optional[str] = None
+    tag_line: Optional[str] = None
+    description: Optional[str] = None
+    total_review: Optional[str] = None
+    rating: Optional[str] = None
+    verification_status: Optional[str] = None
+    min_project_size: Optional[str] = None
+    average_hourly_rate: Optional[str] = None
+    employees: Optional[str] = None
+    founded: Optional[str] = None
+    video_url: Optional[str] = None
+    languages: Tuple[str, ...] = ()
+    timezones: Tuple[str, ...] = ()
+    addresses: List[Address] = field(default_factory=list)
+    aggregate_total_review: Optional[str] = None
+    aggregate_rating: Optional[str] = None
+    website_url: Optional[str] = None
+    reviews: Optional[List[Review]] = None
+    verification: Optional[Dict[str, Any]] = None
+    chart_pie: Optional[Dict[str, Any]] = None
+    review_insights: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self) -> None:
+        self.employees = intern_text(self.employees)
+        self.min_project_size = intern_text(self.min_project_size)
+        self.average_hourly_rate = intern_text(self.average_hourly_rate)
+        self.languages = tuple(intern_text(v) for v in self.languages)
+        self.timezones = tuple(intern_text(v) for v in self.timezones)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "logo": self.logo,
+            "tagLine": self.tag_line,
+            "description": self.description,
+            "totalReview": self.total_review,
+            "rating": self.rating,
+            "verificationStatus": self.verification_status,
+            "minProjectSize": self.min_project_size,
+            "averageHourlyRate": self.average_hourly_rate,
+            "employees": self.employees,
+            "founded": self.founded,
+            "video_url": self.video_url,
+            "languages": list(self.languages),
+            "timezones": list(self.timezones),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "summary": self.summary(),
+            "addresses": [address.to_dict() for address in self.addresses],
+            "verification": self.verification or _empty_verification(),
+            "chartPie": self.chart_pie or _empty_chart_pie(),
+            "rating": {
+                "totalReview": self.aggregate_total_review,
+                "overallRating": self.aggregate_rating,
+            },
+            "websiteUrl": self.website_url,
+            "profileURL": self.profile_url,
+            "reviewInsights": self.review_insights or _empty_review_insights(),
+        }
+        if self.reviews is not None:
+            data["reviews"] = [review.to_dict() for review in self.reviews]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompanyRecord":
+        summary = data.get("summary") or {}
+        rating = data.get("rating") or {}
+        reviews = data.get("reviews")
+        return cls(
+            name=summary.get("name"),
+            profile_url=data.get("profileURL"),
+            logo=summary.get("logo"),
+            tag_line=summary.get("tagLine"),
+            description=summary.get("description"),
+            total_review=summary.get("totalReview"),
+            rating=summary.get("rating"),
+            verification_status=summary.get("verificationStatus"),
+            min_project_size=summary.get("minProjectSize"),
+            average_hourly_rate=summary.get("averageHourlyRate"),
+            employees=summary.get("employees"),
+            founded=summary.get("founded"),
+            video_url=summary.get("video_url"),
+            languages=tuple(summary.get("languages") or ()),
+            timezones=tuple(summary.get("timezones") or ()),
+            addresses=[Address.from_dict(a) for a in data.get("addresses") or ()],
+            aggregate_total_review=rating.get("totalReview"),
+            aggregate_rating=rating.get("overallRating"),
+            website_url=data.get("websiteUrl"),
+            reviews=None if reviews is None else [Review.from_dict(r) for r in reviews],
+            verification=_unless_empty(data.get("verification"), _empty_verification),
+            chart_pie=_unless_empty(data.get("chartPie"), _empty_chart_pie),
+            review_insights=_unless_empty(data.get("reviewInsights"), _empty_review_insights),
+        )
+
+def as_dict(record: Union[CompanyRecord, Dict[str, Any]]) -> Dict[str, Any]:
+    """The exported form of a record; dicts (e.g. cached records) pass through."""
+    return record.to_dict() if isinstance(record, CompanyRecord) else record
+
+def record_digest(value: Any) -> bytes:
+    """A 16-byte digest of an exported record (or any part of one), key order aside."""
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+def parse_number(value: Any) -> Optional[float]:
+    """The number in a field such as ``"4.9"``, ``"4,9"`` or ``"1,024 reviews"``.
+
+    Commas before groups of three digits separate thousands; a single comma
+    before one or two digits is a decimal comma. With both commas and dots
+    the last of the two is the decimal separator. Anything else (``"1,2345"``)
+    is ambiguous and gives None.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    match = _NUMBER_RE.search(str(value))
+    if match is None:
+        return None
+    text = match.group()
+    if "," in text and "." in text:
+        thousands = "," if text.rfind(".") > text.rfind(",") else "."
+        text = text.replace(thousands, "").replace(",", ".")
+    elif "," in text:
+        head, *groups = text.split(",")
+        if all(len(group) == 3 for group in groups):
+            text = head + "".join(groups)
+        elif len(groups) == 1 and len(groups[0]) <= 2:
+            text = f"{head}.{groups[0]}"
+        else:
+            return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def parse_integer(value: Any) -> Optional[int]:
+    number = parse_number(value)
+    return None if number is None else int(number)
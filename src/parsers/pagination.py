@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import html as html_lib
+import re
+from typing import Iterable, List, Set, Union
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from parsers.document import LxmlPage
+
+# Pagination links, e.g. href="/profile/acme?page=3#reviews". Matched on the
+# raw HTML so the fetch stage can follow them without building a tree.
+_PAGE_LINK_RE = re.compile(r"""href=["']([^"']*?[?&](?:amp;)?page=\d+[^"']*)""")
+# The page number of an already parsed (unescaped) href value.
+_PAGE_HREF_RE = re.compile(r"[?&]page=(\d+)")
+
+def _same_page(href: str, url: str) -> bool:
+    target = urlsplit(urljoin(url, href))
+    base = urlsplit(url)
+    return (target.netloc, target.path.rstrip("/")) == (base.netloc, base.path.rstrip("/"))
+
+def _page_numbers(hrefs: Iterable[str], url: str) -> Set[int]:
+    numbers = set()
+    for href in hrefs:
+        match = _PAGE_HREF_RE.search(href)
+        if match and _same_page(href, url):
+            numbers.add(int(match.group(1)))
+    return numbers
+
+def linked_page_numbers(html: Union[str, LxmlPage], url: str) -> Set[int]:
+    """Every ``page=N`` number that a link in ``html`` to another page of ``url`` has.
+
+    Links to other paths (e.g. ``/directory/web-developers?page=57`` in a
+    profile's navigation) are not ``url``'s pagination and are ignored.
+    ``html`` may also be a page parsed while streaming, whose text is gone.
+    """
+    if isinstance(html, LxmlPage):
+        return _page_numbers(html.root.xpath("//@href"), url)
+    return _page_numbers(
+        (html_lib.unescape(href) for href in _PAGE_LINK_RE.findall(html)), url
+    )
+
+def current_page_number(url: str) -> int:
+    """The ``page`` query parameter of ``url``; unpaginated URLs are page 0."""
+    page = dict(parse_qsl(urlsplit(url).query)).get("page", "0")
+    return int(page) if page.isdigit() else 0
+
+def page_url(url: str, number: int) -> str:
+    """``url`` with its ``page`` query parameter set to ``number``."""
+    parts = urlsplit(url)
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "page"
+    ]
+    query.append(("page", str(number)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+def other_page_urls(html: Union[str, LxmlPage], url: str, limit: int) -> List[str]:
+    """URLs of the pages of ``url``'s pagination other than ``url`` itself.
+
+    Pages run from 1 to the highest page linked from ``html``; at most
+    ``limit`` URLs are returned.
+    """
+    numbers = linked_page_numbers(html, url)
+    if not numbers or limit <= 0:
+        return []
+    current = current_page_number(url)
+    return [
+        page_url(url, number)
+        for number in range(1, max(numbers) + 1)
+        if number != current
+    ][:limit]
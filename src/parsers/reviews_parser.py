@@ -1,23 +1,50 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Union
 
 from bs4 import BeautifulSoup
 
+from parsers.document import (
+    DEFAULT_BACKEND,
+    LxmlPage,
+    Page,
+    as_page,
+    has_class,
+    lxml_text,
+)
+from parsers.models import Review, Reviewer
+from parsers.pagination import linked_page_numbers, other_page_urls
+
 logger = logging.getLogger(__name__)
 
-def parse_reviews(html: str) -> List[Dict[str, Any]]:
+def parse_reviews(
+    html: Union[str, BeautifulSoup, Page],
+    backend: str = DEFAULT_BACKEND,
+) -> List[Dict[str, Any]]:
     """Parse reviews from a Clutch.co company profile HTML page.
 
     We primarily look for schema.org Review microdata, but this parser is
-    defensive and falls back to common CSS patterns when needed.
+    defensive and falls back to common CSS patterns when needed. ``html`` may
+    also be a page shared with the profile parser; raw HTML is parsed with
+    ``backend`` ("html.parser" or "lxml").
     """
-    soup = BeautifulSoup(html, "html.parser")
-    reviews: List[Dict[str, Any]] = []
+    return [review.to_dict() for review in extract_reviews(html, backend)]
+
+def extract_reviews(
+    html: Union[str, BeautifulSoup, Page],
+    backend: str = DEFAULT_BACKEND,
+) -> List[Review]:
+    """``parse_reviews`` returning in-memory Review objects."""
+    page = as_page(html, backend)
+    if page.backend == "lxml":
+        return _parse_reviews_lxml(page)
+
+    soup = page.soup
+    reviews: List[Review] = []
 
     # Prefer schema.org Review microdata
-    review_nodes = soup.find_all(attrs={"itemtype": "http://schema.org/Review"})
+    review_nodes = page.itemtype_nodes("http://schema.org/Review")
     for node in review_nodes:
         review = _parse_schema_org_review(node)
         if review:
@@ -33,7 +60,51 @@ def parse_reviews(html: str) -> List[Dict[str, Any]]:
     logger.debug("Parsed %d reviews from page", len(reviews))
     return reviews
 
-def _parse_schema_org_review(node) -> Dict[str, Any] | None:
+def review_page_urls(html: Union[str, LxmlPage], url: str, max_pages: int) -> List[str]:
+    """URLs of the other review pages linked from profile page ``url``.
+
+    The page count is the highest ``page=N`` link in ``html`` to ``url``'s
+    own path; ``max_pages`` caps the total number of review pages, including
+    ``url`` itself, so at most ``max_pages - 1`` URLs are returned.
+    """
+    if max_pages <= 1:
+        return []
+    urls = other_page_urls(html, url, limit=max(linked_page_numbers(html, url), default=0))
+    if len(urls) > max_pages - 1:
+        logger.info(
+            "Review pages for %s capped at %d of %d", url, max_pages, len(urls) + 1
+        )
+    return urls[: max_pages - 1]
+
+def review_key(review: Union[Review, Dict[str, Any]]) -> tuple:
+    """Identity of a review, used to drop duplicates seen on several pages."""
+    if isinstance(review, Review):
+        return review.key()
+    body = review.get("review") or {}
+    return (
+        review.get("name"),
+        review.get("datePublished"),
+        (review.get("reviewer") or {}).get("name"),
+        body.get("rating"),
+        body.get("review"),
+    )
+
+def _review_record(
+    name: str | None,
+    date_published: str | None,
+    rating_value: str | None,
+    text: str | None,
+    reviewer: Reviewer,
+) -> Review:
+    return Review(
+        name=name,
+        date_published=date_published,
+        rating=float(rating_value) if rating_value else None,
+        text=text,
+        reviewer=reviewer,
+    )
+
+def _parse_schema_org_review(node) -> Review | None:
     """Parse a single schema.org Review node into our normalized structure."""
     try:
         def text_of(itemprop: str) -> str | None:
@@ -52,36 +123,18 @@ def _parse_schema_org_review(node) -> Dict[str, Any] | None:
         body = text_of("reviewBody")
 
         reviewer_block = node.find(attrs={"itemprop": "author"})
-        reviewer = {}
-        if reviewer_block:
-            reviewer["name"] = reviewer_block.get_text(strip=True)
-
-        return {
-            "name": name,
-            "datePublished": date_published,
-            "project": {
-                "name": None,
-                "categories": [],
-                "budget": None,
-                "length": None,
-                "description": None,
-            },
-            "review": {
-                "rating": float(rating_value) if rating_value else None,
-                "quality": None,
-                "schedule": None,
-                "cost": None,
-                "willingToRefer": None,
-                "review": body,
-                "comments": body,
-            },
-            "reviewer": reviewer,
-        }
+        reviewer = (
+            Reviewer(name=reviewer_block.get_text(strip=True))
+            if reviewer_block
+            else Reviewer()
+        )
+
+        return _review_record(name, date_published, rating_value, body, reviewer)
     except Exception as exc:  # noqa: BLE001
         logger.warning("Failed to parse schema.org review: %s", exc)
         return None
 
-def _parse_review_block(block) -> Dict[str, Any] | None:
+def _parse_review_block(block) -> Review | None:
     """Fallback parser for non-schema review cards."""
     try:
         title = block.select_one(".review-title, h3, h2")
@@ -104,29 +157,107 @@ def _parse_review_block(block) -> Dict[str, Any] | None:
             reviewer_name_el.get_text(strip=True) if reviewer_name_el else None
         )
 
-        return {
-            "name": title.get_text(strip=True) if title else None,
-            "datePublished": meta_date.get_text(strip=True) if meta_date else None,
-            "project": {
-                "name": None,
-                "categories": [],
-                "budget": None,
-                "length": None,
-                "description": None,
-            },
-            "review": {
-                "rating": float(rating_value) if rating_value else None,
-                "quality": None,
-                "schedule": None,
-                "cost": None,
-                "willingToRefer": None,
-                "review": text,
-                "comments": text,
-            },
-            "reviewer": {
-                "name": reviewer_name,
-            },
-        }
+        return _review_record(
+            title.get_text(strip=True) if title else None,
+            meta_date.get_text(strip=True) if meta_date else None,
+            rating_value,
+            text,
+            Reviewer(name=reviewer_name),
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to parse review block: %s", exc)
+        return None
+
+# XPath equivalents of the CSS selectors used by the BeautifulSoup path.
+_REVIEW_BLOCK_XPATH = (
+    f"//*[{has_class('review-card')}]"
+    f" | //*[{has_class('review-card__inner')}]"
+    f" | //*[{has_class('review')}]"
+)
+_BLOCK_TITLE_XPATH = f"(.//*[{has_class('review-title')}] | .//h3 | .//h2)[1]"
+_BLOCK_DATE_XPATH = f"(.//*[{has_class('review-date')}] | .//time)[1]"
+_BLOCK_RATING_XPATH = (
+    f"(.//*[{has_class('rating')}] | .//*[{has_class('stars')}]"
+    " | .//*[@data-rating])[1]"
+)
+_BLOCK_TEXT_XPATH = f"(.//*[{has_class('review-text')}] | .//*[{has_class('content')}] | .//p)[1]"
+_BLOCK_REVIEWER_XPATH = (
+    f"(.//*[{has_class('reviewer-name')}] | .//*[{has_class('author')}]"
+    f" | .//*[{has_class('client')}] | .//*[{has_class('reviewer')}])[1]"
+)
+
+def _parse_reviews_lxml(page: LxmlPage) -> List[Review]:
+    """XPath version of extract_reviews for the lxml backend."""
+    reviews: List[Review] = []
+    for node in page.itemtype_nodes("http://schema.org/Review"):
+        review = _parse_schema_org_review_lxml(page, node)
+        if review:
+            reviews.append(review)
+
+    if not reviews:
+        for block in page.root.xpath(_REVIEW_BLOCK_XPATH):
+            review = _parse_review_block_lxml(page, block)
+            if review:
+                reviews.append(review)
+
+    logger.debug("Parsed %d reviews from page", len(reviews))
+    return reviews
+
+def _parse_schema_org_review_lxml(page: LxmlPage, node) -> Review | None:
+    try:
+        def text_of(itemprop: str, scope=node) -> str | None:
+            el = page.xpath_first(f".//*[@itemprop='{itemprop}']", scope)
+            return lxml_text(el) if el is not None else None
+
+        name = text_of("name") or text_of("headline")
+        date_published = text_of("datePublished")
+
+        rating_value = None
+        review_rating = page.xpath_first(".//*[@itemprop='reviewRating']", node)
+        if review_rating is not None:
+            rating_value = text_of("ratingValue", review_rating)
+
+        body = text_of("reviewBody")
+
+        reviewer_block = page.xpath_first(".//*[@itemprop='author']", node)
+        reviewer = (
+            Reviewer(name=lxml_text(reviewer_block))
+            if reviewer_block is not None
+            else Reviewer()
+        )
+
+        return _review_record(name, date_published, rating_value, body, reviewer)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to parse schema.org review: %s", exc)
+        return None
+
+def _parse_review_block_lxml(page: LxmlPage, block) -> Review | None:
+    try:
+        def first(expr: str):
+            return page.xpath_first(expr, block)
+
+        title = first(_BLOCK_TITLE_XPATH)
+        meta_date = first(_BLOCK_DATE_XPATH)
+        rating_el = first(_BLOCK_RATING_XPATH)
+
+        rating_value = None
+        if rating_el is not None and rating_el.get("data-rating") is not None:
+            rating_value = rating_el.get("data-rating")
+        elif rating_el is not None:
+            rating_value = lxml_text(rating_el)
+
+        text_node = first(_BLOCK_TEXT_XPATH)
+        reviewer_name_el = first(_BLOCK_REVIEWER_XPATH)
+
+        return _review_record(
+            lxml_text(title) if title is not None else None,
+            lxml_text(meta_date) if meta_date is not None else None,
+            rating_value,
+            lxml_text(text_node) if text_node is not None else None,
+            Reviewer(
+                name=lxml_text(reviewer_name_el) if reviewer_name_el is not None else None
+            ),
+        )
     except Exception as exc:  # noqa: BLE001
         logger.warning("Failed to parse review block: %s", exc)
-        return None
\ No newline at end of file
+        return None
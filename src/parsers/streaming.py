@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from parsers.document import LxmlPage, lxml
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class StreamedPage:
+    """A profile page parsed while it downloaded.
+
+    ``size`` is the number of body bytes received. ``truncated`` is set when
+    a stop marker ended the download early; the tree then holds everything
+    before the marker. ``body`` keeps the raw bytes only when asked to (for
+    the HTTP cache).
+    """
+
+    page: LxmlPage
+    size: int
+    truncated: bool = False
+    body: Optional[bytes] = None
+
+class PageStream:
+    """Feeds a response body to lxml's incremental HTML parser chunk by chunk.
+
+    The tree is built while bytes arrive, so parsing overlaps the transfer
+    and no decoded copy of the page is ever held. ``feed`` returns True once
+    one of ``stop_markers`` (byte strings such as ``b"<footer"``) shows up:
+    the content from the marker on is not needed, and the caller can stop
+    reading. ``encoding`` should be the response's declared charset; the
+    tree is the same as parsing the decoded text in one go.
+    """
+
+    def __init__(
+        self,
+        encoding: Optional[str] = None,
+        stop_markers: Iterable[bytes] = (),
+        keep_body: bool = False,
+    ) -> None:
+        if lxml is None:
+            raise RuntimeError(
+                "Streamed parsing requires lxml; install it with 'pip install lxml'."
+            )
+        self._parser = lxml.html.HTMLParser(encoding=encoding or "utf-8")
+        self._markers = [marker for marker in stop_markers if marker]
+        # The end of each chunk is held back until the next one arrives, so a
+        # marker split across two chunks is never partly fed to the parser.
+        self._hold = max((len(marker) for marker in self._markers), default=1) - 1
+        self._pending = b""
+        self._body: Optional[bytearray] = bytearray() if keep_body else None
+        self.size = 0
+        self.truncated = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Parse ``chunk``; True means a stop marker was reached."""
+        if self.truncated:
+            return True
+        self.size += len(chunk)
+        if self._body is not None:
+            self._body += chunk
+        data = self._pending + chunk
+        cut = min(
+            (i for i in (data.find(marker) for marker in self._markers) if i >= 0),
+            default=-1,
+        )
+        if cut >= 0:
+            self._parser.feed(data[:cut])
+            self._pending = b""
+            self.truncated = True
+            return True
+        keep = min(self._hold, len(data))
+        if len(data) > keep:
+            self._parser.feed(data[: len(data) - keep])
+        self._pending = data[len(data) - keep :]
+        return False
+
+    def close(self) -> StreamedPage:
+        if self._pending:
+            self._parser.feed(self._pending)
+            self._pending = b""
+        root = self._parser.close()
+        if root is None:
+            root = lxml.html.document_fromstring("<html></html>")
+        body = bytes(self._body) if self._body is not None else None
+        return StreamedPage(LxmlPage.from_root(root), self.size, self.truncated, body)
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import functools
+import gzip
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from utils.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+PROFILE = "profile"
+REVIEW_PAGE = "review-page"
+
+def index_path_for(archive_path: Union[str, Path]) -> Path:
+    """The offset index that lives next to ``archive_path``."""
+    path = Path(archive_path)
+    return path.with_name(path.name + ".idx")
+
+def archive_path_for(archive_dir: Union[str, Path]) -> Path:
+    """A new archive file in ``archive_dir``, named after the current time."""
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return Path(archive_dir) / f"pages-{stamp}.warc.gz"
+
+class ArchiveEntry(NamedTuple):
+    url: str
+    kind: str
+    offset: int
+    length: int
+
+class PageArchive:
+    """Append-only archive of the raw pages fetched during one run.
+
+    The layout follows WARC: every page is a ``resource`` record (headers
+    plus the HTML) compressed as its own gzip member, so the file is a valid
+    ``.warc.gz`` and any record can be decompressed on its own. Each record's
+    offset and length also go to a JSON Lines index next to the archive
+    (``index_path_for``) for random access. ``kind`` tells profile pages
+    from extra review pages. Safe to share between fetch threads.
+    """
+
+    def __init__(self, path: Union[str, Path], compresslevel: int = 6) -> None:
+        self.path = Path(path)
+        self.compresslevel = compresslevel
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: IO[bytes] = self.path.open("ab")
+        self._index: IO[str] = index_path_for(self.path).open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, url: str, html: str, kind: str = PROFILE) -> None:
+        body = html.encode("utf-8")
+        headers = (
+            "WARC/1.1\r\n"
+            "WARC-Type: resource\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"X-Clutch-Page: {kind}\r\n"
+            "Content-Type: text/html; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode("utf-8")
+        member = gzip.compress(headers + body + b"\r\n\r\n", self.compresslevel)
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(member)
+            self._file.flush()
+            entry = {"url": url, "kind": kind, "offset": offset, "length": len(member)}
+            self._index.write(json.dumps(entry) + "\n")
+            self._index.flush()
+            self.count += 1
+
+    def recording(self, fetch: Callable[[str], Any], kind: str = PROFILE) -> Callable[[str], Any]:
+        """Wrap ``fetch`` (blocking or async) so every page it returns is archived.
+
+        Documents that are not HTML text (e.g. streamed pages) are not archived.
+        """
+        def keep(url: str, html: Any) -> Any:
+            if isinstance(html, str) and html:
+                self.add(url, html, kind)
+            return html
+
+        if inspect.iscoroutinefunction(fetch):
+            @functools.wraps(fetch)
+            async def fetch_async(url: str) -> Any:
+                return keep(url, await fetch(url))
+
+            return fetch_async
+
+        @functools.wraps(fetch)
+        def fetch_sync(url: str) -> Any:
+            return keep(url, fetch(url))
+
+        return fetch_sync
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                self._index.close()
+                logger.info("Archived %d pages to %s", self.count, self.path)
+
+    def __enter__(self) -> "PageArchive":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+def _parse_record(data: bytes) -> tuple:
+    head, _, rest = data.partition(b"\r\n\r\n")
+    headers: Dict[str, str] = {}
+    for line in head.decode("utf-8").split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", len(rest)))
+    return headers, rest[:length].decode("utf-8")
+
+def _scan(path: Path, chunk_size: int = 256 * 1024) -> Iterator[ArchiveEntry]:
+    """Rebuild the index of an archive by walking its gzip members."""
+    with path.open("rb") as f:
+        offset = 0
+        while True:
+            f.seek(offset)
+            decompressor = zlib.decompressobj(wbits=31)
+            record = b""
+            consumed = 0
+            try:
+                while not decompressor.eof:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    consumed += len(chunk)
+                    record += decompressor.decompress(chunk)
+            except zlib.error:
+                logger.warning("Archive %s is damaged after byte %d", path, offset)
+                return
+            if not decompressor.eof:
+                if consumed:
+                    logger.warning(
+                        "Archive %s ends with a partial record at byte %d", path, offset
+                    )
+                return
+            length = consumed - len(decompressor.unused_data)
+            headers, _ = _parse_record(record)
+            yield ArchiveEntry(
+                headers.get("warc-target-uri", ""),
+                headers.get("x-clutch-page", PROFILE),
+                offset,
+                length,
+            )
+            offset += length
+
+class ArchiveReader:
+    """Random access to the pages of one or more archives, without network.
+
+    ``get(url)`` returns the archived HTML of ``url`` (matched by normalized
+    URL; later archives win), so it can stand in for a client's
+    ``fetch_profile``. ``profile_urls()`` lists the archived profile pages in
+    the order they were fetched; ``review_pages`` counts the archived extra
+    review pages. Archives without a usable index are scanned. Safe to
+    share between threads.
+    """
+
+    def __init__(self, paths: Iterable[Union[str, Path]]) -> None:
+        self._files: List[IO[bytes]] = []
+        self._locks: List[threading.Lock] = []
+        self._entries: Dict[str, tuple] = {}
+        self._profiles: Dict[str, str] = {}
+        self.review_pages = 0
+        for path in paths:
+            self._open(Path(path))
+
+    def _open(self, path: Path) -> None:
+        number = len(self._files)
+        self._files.append(path.open("rb"))
+        self._locks.append(threading.Lock())
+        for entry in self._load_index(path):
+            key = normalize_url(entry.url)
+            self._entries[key] = (number, entry.offset, entry.length)
+            if entry.kind == PROFILE:
+                self._profiles.pop(key, None)
+                self._profiles[key] = entry.url
+            else:
+                self.review_pages += 1
+
+    @staticmethod
+    def _load_index(path: Path) -> List[ArchiveEntry]:
+        index = index_path_for(path)
+        if index.exists():
+            entries = []
+            with index.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(ArchiveEntry(**json.loads(line)))
+                    except (ValueError, TypeError):
+                        # A line cut short when a run died; the record may
+                        # still be complete, so fall back to scanning.
+                        break
+                else:
+                    return entries
+        logger.info("Indexing archive %s", path)
+        return list(_scan(path))
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def profile_urls(self) -> List[str]:
+        return list(self._profiles.values())
+
+    def get(self, url: str) -> Optional[str]:
+        location = self._entries.get(normalize_url(url))
+        if location is None:
+            return None
+        number, offset, length = location
+        with self._locks[number]:
+            f = self._files[number]
+            f.seek(offset)
+            member = f.read(length)
+        return _parse_record(gzip.decompress(member))[1]
+
+    def close(self) -> None:
+        for f in self._files:
+            f.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from typing import IO, Any, Dict, List, Union
+
+from parsers.models import CompanyRecord, as_dict, record_digest
+from utils.urls import profile_key
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS companies (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    fingerprint BLOB NOT NULL,
+    last_seen INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS companies_last_seen ON companies (last_seen);
+CREATE TABLE IF NOT EXISTS reviews (
+    company TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint BLOB NOT NULL,
+    PRIMARY KEY (company, key)
+) WITHOUT ROWID;
+"""
+
+def changes_path_for(output_path: Union[str, Path]) -> Path:
+    """The change feed that lives next to ``output_path``."""
+    path = Path(output_path)
+    return path.with_name(path.name + ".changes.jsonl")
+
+def review_key(review: Dict[str, Any]) -> str:
+    """Stable identity of an exported review: a hash of name, date and reviewer.
+
+    Unlike the fingerprint it does not change when the review's text or
+    scores are edited, so an edit is reported as a change, not a removal
+    plus an addition.
+    """
+    reviewer = review.get("reviewer") or {}
+    identity = "\x1f".join(
+        str(part or "")
+        for part in (review.get("name"), review.get("datePublished"), reviewer.get("name"))
+    )
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=8).hexdigest()
+
+class ChangeFeed:
+    """Emits only what changed since the previous run, as JSON Lines events.
+
+    A SQLite state store keeps a 16-byte fingerprint per company (its record
+    without reviews) and per review (keyed by ``review_key``). ``observe``
+    compares a freshly scraped record with the stored state and writes an
+    event for each difference::
+
+        {"event": "added", "entity": "company", "profileURL": ..., "data": {...}}
+        {"event": "changed", "entity": "review", "profileURL": ..., "reviewKey": ..., "data": {...}}
+
+    A new company's ``added`` event carries the full record, reviews
+    included; ``changed`` company events carry the record without reviews.
+    ``finish`` reports companies not seen during the run (nor passed to
+    ``seen``, e.g. because their fetch failed) as ``removed``, so it should
+    only be called after a run over the whole catalogue.
+
+    ``resume=True`` continues an unfinished run instead of starting a new
+    one, appending to the events file. State is committed by ``flush``
+    after the events are written, so a crash can repeat events but not
+    lose them.
+    """
+
+    def __init__(
+        self,
+        state_path: Union[str, Path],
+        events_path: Union[str, Path],
+        resume: bool = False,
+    ) -> None:
+        self.state_path = Path(state_path)
+        self.events_path = Path(events_path)
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.events_path.parent.mkdir(parents=True, exist_ok=True)
+        self.counts: Counter = Counter()
+        self._conn = sqlite3.connect(str(self.state_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.run = self._begin(resume)
+        opener = gzip.open if self.events_path.suffix == ".gz" else open
+        self._events: IO[bytes] = opener(self.events_path, "ab" if resume else "wb")
+
+    def _begin(self, resume: bool) -> int:
+        row = self._conn.execute(
+            "SELECT run, finished_at FROM runs ORDER BY run DESC LIMIT 1"
+        ).fetchone()
+        if resume and row is not None and row[1] is None:
+            logger.info("Resuming change feed run %d", row[0])
+            return row[0]
+        run = row[0] + 1 if row is not None else 1
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (run, started_at) VALUES (?, ?)", (run, time.time())
+            )
+        return run
+
+    def _emit(self, event: str, entity: str, url: str, **fields: Any) -> None:
+        self.counts[f"{entity}_{event}"] += 1
+        line = dict(event=event, entity=entity, profileURL=url, run=self.run, **fields)
+        self._events.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def seen(self, url: str) -> None:
+        """Keep a company whose page could not be scraped this run."""
+        self._conn.execute(
+            "UPDATE companies SET last_seen = ? WHERE key = ?", (self.run, profile_key(url))
+        )
+
+    def observe(self, record: Union[CompanyRecord, Dict[str, Any]]) -> None:
+        data = as_dict(record)
+        url = data.get("profileURL")
+        if not url:
+            return
+        key = profile_key(url)
+        company = {k: v for k, v in data.items() if k != "reviews"}
+        fingerprint = record_digest(company)
+
+        reviews: Dict[str, Dict[str, Any]] = {}
+        for review in data.get("reviews") or ():
+            rkey = review_key(review)
+            duplicate = 1
+            while rkey in reviews:
+                # Same name, date and reviewer twice on one profile.
+                duplicate += 1
+                rkey = f"{review_key(review)}-{duplicate}"
+            reviews[rkey] = review
+
+        row = self._conn.execute(
+            "SELECT fingerprint FROM companies WHERE key = ?", (key,)
+        ).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO companies (key, url, fingerprint, last_seen) "
+            "VALUES (?, ?, ?, ?)",
+            (key, url, fingerprint, self.run),
+        )
+        if row is None:
+            self._emit("added", "company", url, data=data)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO reviews (company, key, fingerprint) VALUES (?, ?, ?)",
+                [(key, rkey, record_digest(review)) for rkey, review in reviews.items()],
+            )
+            return
+        if row[0] != fingerprint:
+            self._emit("changed", "company", url, data=company)
+        else:
+            self.counts["company_unchanged"] += 1
+        if "reviews" not in data:
+            return
+
+        stored = dict(
+            self._conn.execute(
+                "SELECT key, fingerprint FROM reviews WHERE company = ?", (key,)
+            ).fetchall()
+        )
+        upserts: List[tuple] = []
+        for rkey, review in reviews.items():
+            review_fingerprint = record_digest(review)
+            previous = stored.pop(rkey, None)
+            if previous == review_fingerprint:
+                continue
+            event = "added" if previous is None else "changed"
+            self._emit(event, "review", url, reviewKey=rkey, data=review)
+            upserts.append((key, rkey, review_fingerprint))
+        for rkey in stored:
+            self._emit("removed", "review", url, reviewKey=rkey)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO reviews (company, key, fingerprint) VALUES (?, ?, ?)",
+            upserts,
+        )
+        self._conn.executemany(
+            "DELETE FROM reviews WHERE company = ? AND key = ?",
+            [(key, rkey) for rkey in stored],
+        )
+
+    def flush(self) -> None:
+        """Write out pending events, then commit the state they describe."""
+        self._events.flush()
+        self._conn.commit()
+
+    def finish(self, report_removed: bool = True) -> None:
+        """Report companies missing from this run as removed and close the run.
+
+        With ``report_removed=False`` (a partial run) missing companies are
+        kept, to be reported by the next full run if they are still gone.
+        """
+        gone = []
+        if report_removed:
+            gone = self._conn.execute(
+                "SELECT key, url FROM companies WHERE last_seen < ?", (self.run,)
+            ).fetchall()
+        for key, url in gone:
+            self._emit("removed", "company", url)
+        self._conn.executemany("DELETE FROM reviews WHERE company = ?", [(k,) for k, _ in gone])
+        self._conn.executemany("DELETE FROM companies WHERE key = ?", [(k,) for k, _ in gone])
+        self._conn.execute(
+            "UPDATE runs SET finished_at = ? WHERE run = ?", (time.time(), self.run)
+        )
+        self.flush()
+
+    def log_stats(self) -> None:
+        counts = ", ".join(f"{name} {count}" for name, count in sorted(self.counts.items()))
+        logger.info("Change feed run %d: %s", self.run, counts or "no changes")
+
+    def close(self) -> None:
+        self.flush()
+        self._events.close()
+        self._conn.close()
+
+    def __enter__(self) -> "ChangeFeed":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+def journal_path_for(output_path: Union[str, Path]) -> Path:
+    """The progress journal that lives next to ``output_path``."""
+    path = Path(output_path)
+    return path.with_name(path.name + ".progress.jsonl")
+
+@dataclass
+class JournalState:
+    """What a previous run recorded: per-URL outcomes and the last safe offset."""
+
+    completed: set = field(default_factory=set)
+    failures: Dict[str, int] = field(default_factory=dict)
+    offset: int = 0
+
+    def should_process(self, url: str, max_attempts: int) -> bool:
+        if url in self.completed:
+            return False
+        return self.failures.get(url, 0) < max_attempts
+
+    def pending(self, urls: Iterable[str], max_attempts: int) -> Iterator[str]:
+        """Yield the URLs from ``urls`` that still need to be scraped."""
+        skipped = 0
+        for url in urls:
+            if self.should_process(url, max_attempts):
+                yield url
+            else:
+                skipped += 1
+        logger.info("Resume skipped %d completed or exhausted URLs", skipped)
+
+class ProgressJournal:
+    """Append-only JSON Lines log of each URL's outcome and output offset.
+
+    Entries are buffered and written in batches (every ``batch_size`` entries
+    or ``flush_interval`` seconds, whichever comes first) so the journal does
+    not become a bottleneck at high concurrency. Successful entries carry the
+    output offset just after their record; a resumed run truncates the output
+    to the last journaled offset, so a record that reached the output but not
+    the journal is simply scraped again. ``before_flush`` is called before
+    each batch is written, so an exporter that buffers records (SQLite) can
+    make them durable before the journal marks their URLs done.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        before_flush: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.before_flush = before_flush
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self._buffer: List[str] = []
+        self._file: Optional[IO[str]] = None
+        self._last_flush = time.monotonic()
+
+    def load(self) -> JournalState:
+        """Read the outcomes recorded so far; a torn last line is ignored."""
+        state = JournalState()
+        if not self.path.exists():
+            return state
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Ignoring truncated journal entry in %s", self.path)
+                    continue
+                url = entry["url"]
+                if entry["status"] == "ok":
+                    state.completed.add(url)
+                    state.offset = max(state.offset, int(entry["offset"]))
+                else:
+                    state.failures[url] = state.failures.get(url, 0) + 1
+        logger.info(
+            "Journal %s: %d completed, %d failed URLs",
+            self.path,
+            len(state.completed),
+            len(state.failures),
+        )
+        return state
+
+    def open(self, append: bool) -> "ProgressJournal":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a" if append else "w", encoding="utf-8")
+        return self
+
+    def record(self, url: str, ok: bool, offset: Optional[int] = None) -> None:
+        entry = {"url": url, "status": "ok" if ok else "failed", "ts": round(time.time(), 3)}
+        if ok:
+            entry["offset"] = offset
+        self._buffer.append(json.dumps(entry, ensure_ascii=False))
+        if (
+            len(self._buffer) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer and self._file is not None:
+            if self.before_flush is not None:
+                self.before_flush()
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ProgressJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
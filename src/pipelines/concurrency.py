@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pipelines.review_pages import page_size
+from utils.metrics import run_metrics
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input; each consumer forwards it downstream.
+_DONE = object()
+
+# How long blocking queue operations wait before re-checking the stop flag.
+_POLL_INTERVAL = 0.1
+
+@dataclass
+class ScrapeResult:
+    """Outcome of one input URL as it leaves the pipeline.
+
+    ``fetch_seconds`` / ``parse_seconds`` are the time the URL spent in each
+    stage (0 when skipped) and ``html_size`` the length of its page.
+    """
+
+    index: int
+    url: str
+    record: Optional[Dict[str, Any]]
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    html_size: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.record is not None
+
+def _put(q: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q: "queue.Queue[Any]", stop: threading.Event) -> Any:
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return _DONE
+
+def _parse_batch(
+    parse: Callable[[str, str], Optional[Dict[str, Any]]],
+    batch: List[Tuple[int, str, str]],
+) -> Tuple[List[Tuple[int, str, Optional[Dict[str, Any]], Optional[str], float]], Dict[str, Any]]:
+    """Parse a chunk of pages inside a pool worker process.
+
+    Errors are returned as strings rather than raised so one bad page does not
+    fail the rest of its chunk. The worker's metrics for the chunk are
+    returned alongside for the parent to merge.
+    """
+    # Drop anything inherited from the parent when the worker was forked.
+    run_metrics.drain()
+    results = []
+    for index, url, html in batch:
+        started = time.perf_counter()
+        try:
+            record, error = parse(html, url), None
+        except Exception as exc:  # noqa: BLE001
+            record, error = None, f"{type(exc).__name__}: {exc}"
+        results.append((index, url, record, error, time.perf_counter() - started))
+    return results, run_metrics.drain()
+
+def _parse_one(
+    parse: Callable[[str, str], Optional[Dict[str, Any]]],
+    index: int,
+    url: str,
+    html: Optional[str],
+) -> ScrapeResult:
+    record = None
+    started = time.perf_counter()
+    if not html:
+        logger.warning("Empty HTML for URL: %s", url)
+    else:
+        try:
+            record = parse(html, url)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Failed to process %s: %s", url, exc)
+    return ScrapeResult(
+        index,
+        url,
+        record,
+        parse_seconds=time.perf_counter() - started,
+        html_size=page_size(html) if html else 0,
+    )
+
+def _store_record(record_cache: Any, url: str, html: str, record: Any) -> None:
+    # The record is good either way; a cache that cannot take it only costs a
+    # re-parse next run.
+    try:
+        record_cache.store(url, html, record)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not cache the record for %s: %s", url, exc)
+
+def _log_parse_throughput(pages: int, elapsed: float, workers: int) -> None:
+    if not pages or elapsed <= 0:
+        return
+    rate = pages / elapsed
+    logger.info(
+        "Parse stage: %d pages in %.2fs with %d worker(s): %.1f pages/sec "
+        "(%.1f pages/sec per worker)",
+        pages,
+        elapsed,
+        workers,
+        rate,
+        rate / workers,
+    )
+
+def run_pipeline(
+    urls: Iterable[str],
+    fetch: Callable[[str], Optional[str]],
+    parse: Callable[[str, str], Optional[Dict[str, Any]]],
+    *,
+    fetch_workers: int = 4,
+    max_in_flight: Optional[int] = None,
+    ordered: bool = False,
+    fetch_cleanup: Optional[Callable[[], Any]] = None,
+    parse_workers: int = 0,
+    parse_batch_size: int = 8,
+    record_cache: Optional[Any] = None,
+) -> Iterator[ScrapeResult]:
+    """Run URLs through concurrent fetch workers and a parse stage.
+
+    ``fetch_workers`` threads call ``fetch(url)`` (typically
+    ``ClutchClient.fetch_profile``, whose session is shared) and hand HTML to a
+    single parse thread running ``parse(html, url)``. Stages are connected by
+    bounded queues and at most ``max_in_flight`` URLs are between input and
+    output at any time, so memory stays flat regardless of input size.
+
+    When ``fetch`` is a coroutine function (``AsyncClutchClient.fetch_profile``)
+    the fetch stage is a single event loop running ``fetch_workers`` concurrent
+    tasks instead of threads. ``fetch_cleanup`` runs once fetching is done,
+    inside that loop (awaited) for async fetchers.
+
+    With ``parse_workers`` > 0 parsing moves to a process pool so it can use
+    more than one core: pages are sent in chunks of up to ``parse_batch_size``
+    to amortize pickling, and pages from a chunk whose worker crashed are
+    re-parsed in-process. ``parse`` must then be picklable.
+
+    ``record_cache`` (e.g. a FingerprintStore) is consulted in the main
+    process before a page is parsed: ``lookup(url, html)`` may return a
+    previously normalized record to reuse, and freshly parsed records are
+    handed to ``store(url, html, record)``.
+
+    Results are yielded to the caller (the export stage) as they complete, or
+    in input order when ``ordered`` is true. Failed URLs are logged and yielded
+    with ``record=None``. If a stage itself fails (e.g. ``record_cache``
+    raises), the other stages stop and the generator raises its error.
+    """
+    fetch_workers = max(1, int(fetch_workers))
+    parse_workers = max(0, int(parse_workers))
+    parse_batch_size = max(1, int(parse_batch_size))
+    if max_in_flight is None:
+        max_in_flight = max(fetch_workers * 4, parse_workers * parse_batch_size * 3)
+    max_in_flight = max(1, int(max_in_flight))
+
+    is_async = inspect.iscoroutinefunction(fetch)
+    # Number of end markers each queue sees: one per fetch thread, or a single
+    # one when the whole fetch stage is one event loop.
+    fetch_consumers = 1 if is_async else fetch_workers
+
+    stop = threading.Event()
+    slots = threading.Semaphore(max_in_flight)
+    url_queue: "queue.Queue[Any]" = queue.Queue(maxsize=fetch_workers * 2)
+    # The in-flight cap bounds this queue, so producers never block on it.
+    html_queue: "queue.Queue[Any]" = queue.Queue(
+        maxsize=max_in_flight + fetch_consumers
+    )
+    out_queue: "queue.Queue[Any]" = queue.Queue()
+    fetch_seconds: Dict[int, float] = {}
+    errors: list = []
+
+    def stage(body: Callable[[], None], last: bool = False) -> Callable[[], None]:
+        # A failed stage stops the others and ends the output, and the
+        # generator re-raises its error; the parse stage (``last``) always
+        # ends the output, however it exits.
+        def run() -> None:
+            failed = False
+            try:
+                body()
+            except BaseException as exc:  # noqa: BLE001
+                failed = True
+                logger.error(
+                    "Pipeline stage %s failed: %s",
+                    threading.current_thread().name,
+                    exc,
+                    exc_info=True,
+                )
+                errors.append(exc)
+                stop.set()
+            finally:
+                if failed or last:
+                    out_queue.put(_DONE)
+
+        return run
+
+    def feeder() -> None:
+        try:
+            for index, url in enumerate(urls):
+                while not slots.acquire(timeout=_POLL_INTERVAL):
+                    if stop.is_set():
+                        return
+                if not _put(url_queue, (index, url), stop):
+                    return
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+        finally:
+            for _ in range(fetch_consumers):
+                _put(url_queue, _DONE, stop)
+
+    def fetch_worker() -> None:
+        while True:
+            item = _get(url_queue, stop)
+            if item is _DONE:
+                _put(html_queue, _DONE, stop)
+                return
+            index, url = item
+            logger.info("Processing %s", url)
+            started = time.perf_counter()
+            try:
+                html = fetch(url)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Failed to process %s: %s", url, exc)
+                html = None
+            fetch_seconds[index] = time.perf_counter() - started
+            run_metrics.observe("fetch", fetch_seconds[index])
+            if not _put(html_queue, (index, url, html), stop):
+                return
+
+    def async_fetch_stage() -> None:
+        asyncio.run(_async_fetch_loop())
+
+    async def _async_fetch_loop() -> None:
+        loop = asyncio.get_running_loop()
+        work: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=fetch_workers)
+
+        async def dispatcher() -> None:
+            while True:
+                item = await loop.run_in_executor(None, _get, url_queue, stop)
+                if item is _DONE:
+                    break
+                await work.put(item)
+            for _ in range(fetch_workers):
+                await work.put(_DONE)
+
+        async def worker() -> None:
+            while True:
+                item = await work.get()
+                if item is _DONE:
+                    return
+                index, url = item
+                logger.info("Processing %s", url)
+                started = time.perf_counter()
+                try:
+                    html = await fetch(url)
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("Failed to process %s: %s", url, exc)
+                    html = None
+                fetch_seconds[index] = time.perf_counter() - started
+                run_metrics.observe("fetch", fetch_seconds[index])
+                html_queue.put_nowait((index, url, html))
+
+        try:
+            await asyncio.gather(
+                dispatcher(), *(worker() for _ in range(fetch_workers))
+            )
+        finally:
+            if fetch_cleanup is not None:
+                await fetch_cleanup()
+            html_queue.put_nowait(_DONE)
+
+    def parse_worker() -> None:
+        remaining = fetch_consumers
+        parsed = 0
+        busy = 0.0
+        while remaining:
+            item = _get(html_queue, stop)
+            if item is _DONE:
+                if stop.is_set():
+                    return
+                remaining -= 1
+                continue
+            index, url, html = item
+            cached = record_cache.lookup(url, html) if record_cache and html else None
+            if cached is not None:
+                out_queue.put(ScrapeResult(index, url, cached, html_size=page_size(html)))
+                continue
+            result = _parse_one(parse, index, url, html)
+            busy += result.parse_seconds
+            parsed += result.ok
+            if record_cache is not None and result.ok:
+                _store_record(record_cache, url, html, result.record)
+            out_queue.put(result)
+        _log_parse_throughput(parsed, busy, 1)
+
+    def pool_parse_worker() -> None:
+        executor = ProcessPoolExecutor(max_workers=parse_workers)
+        generation = 0
+        in_flight: Dict[Future, Tuple[int, List[Tuple[int, str, str]]]] = {}
+        batch: List[Tuple[int, str, str]] = []
+        remaining = fetch_consumers
+        parsed = 0
+        started: Optional[float] = None
+
+        def collect(block: bool) -> None:
+            nonlocal executor, generation, parsed
+            if not in_flight:
+                return
+            done, _ = wait(
+                list(in_flight),
+                timeout=None if block else 0,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                chunk_generation, chunk = in_flight.pop(future)
+                try:
+                    results, worker_metrics = future.result()
+                    run_metrics.merge(worker_metrics)
+                except Exception as exc:  # noqa: BLE001
+                    # A crashed worker, or a chunk or result that would not
+                    # pickle: parse the chunk here instead.
+                    logger.warning(
+                        "Parse chunk failed (%s: %s); retrying %d URL(s) in-process",
+                        type(exc).__name__,
+                        exc,
+                        len(chunk),
+                    )
+                    if isinstance(exc, BrokenProcessPool) and chunk_generation == generation:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = ProcessPoolExecutor(max_workers=parse_workers)
+                        generation += 1
+                    results = [
+                        (result.index, result.url, result.record, None, result.parse_seconds)
+                        for result in (
+                            _parse_one(parse, index, url, html) for index, url, html in chunk
+                        )
+                    ]
+                pages = {index: html for index, _, html in chunk}
+                for index, url, record, error, seconds in results:
+                    if error:
+                        logger.error("Failed to process %s: %s", url, error)
+                    if record is not None:
+                        parsed += 1
+                        if record_cache is not None:
+                            _store_record(record_cache, url, pages[index], record)
+                    out_queue.put(
+                        ScrapeResult(
+                            index,
+                            url,
+                            record,
+                            parse_seconds=seconds,
+                            html_size=page_size(pages[index]),
+                        )
+                    )
+
+        def flush() -> None:
+            nonlocal batch, started
+            if not batch:
+                return
+            if started is None:
+                started = time.perf_counter()
+            # Keep every worker busy with one chunk queued behind it, no more.
+            while len(in_flight) >= parse_workers * 2:
+                collect(block=True)
+            try:
+                future = executor.submit(_parse_batch, parse, batch)
+            except BrokenProcessPool:
+                # Draining retries the lost chunks and replaces the executor.
+                while in_flight:
+                    collect(block=True)
+                future = executor.submit(_parse_batch, parse, batch)
+            in_flight[future] = (generation, batch)
+            batch = []
+
+        try:
+            while remaining:
+                try:
+                    item = html_queue.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    # Idle input: ship a partial chunk rather than wait for more.
+                    flush()
+                    collect(block=False)
+                    if stop.is_set():
+                        return
+                    continue
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                index, url, html = item
+                if not html:
+                    out_queue.put(_parse_one(parse, index, url, html))
+                    continue
+                cached = record_cache.lookup(url, html) if record_cache else None
+                if cached is not None:
+                    out_queue.put(ScrapeResult(index, url, cached, html_size=page_size(html)))
+                    continue
+                batch.append(item)
+                if len(batch) >= parse_batch_size or html_queue.empty():
+                    flush()
+                collect(block=False)
+            flush()
+            while in_flight:
+                collect(block=True)
+            if started is not None:
+                _log_parse_throughput(
+                    parsed, time.perf_counter() - started, parse_workers
+                )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    threads = [
+        threading.Thread(target=stage(feeder), name="pipeline-feeder", daemon=True)
+    ]
+    if is_async:
+        threads.append(
+            threading.Thread(
+                target=stage(async_fetch_stage),
+                name="pipeline-fetch-async",
+                daemon=True,
+            )
+        )
+    else:
+        threads.extend(
+            threading.Thread(
+                target=stage(fetch_worker), name=f"pipeline-fetch-{i}", daemon=True
+            )
+            for i in range(fetch_workers)
+        )
+    threads.append(
+        threading.Thread(
+            target=stage(
+                pool_parse_worker if parse_workers > 0 else parse_worker, last=True
+            ),
+            name="pipeline-parse",
+            daemon=True,
+        )
+    )
+    for thread in threads:
+        thread.start()
+
+    pending: Dict[int, ScrapeResult] = {}
+    next_index = 0
+    try:
+        while True:
+            result = out_queue.get()
+            if result is _DONE:
+                break
+            result.fetch_seconds = fetch_seconds.pop(result.index, 0.0)
+            if not ordered:
+                slots.release()
+                yield result
+                continue
+
+            pending[result.index] = result
+            while next_index in pending:
+                slots.release()
+                yield pending.pop(next_index)
+                next_index += 1
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1.0)
+        if fetch_cleanup is not None and not is_async:
+            fetch_cleanup()
+
+    if errors:
+        raise errors[0]
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from parsers.listing_parser import parse_profile_links
+from parsers.pagination import other_page_urls
+from utils.bloom import BloomFilter
+from utils.urls import normalize_url, profile_key
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+# How long blocking queue operations wait before re-checking the stop flag.
+_POLL_INTERVAL = 0.1
+
+def crawl_profile_urls(
+    start_urls: Iterable[str],
+    fetch: Callable[[str], Optional[str]],
+    *,
+    workers: int = 4,
+    max_pages: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    expected_profiles: int = 1_000_000,
+    buffer_size: int = 1000,
+) -> Iterator[str]:
+    """Crawl Clutch category/listing pages and yield profile URLs as found.
+
+    ``workers`` threads fetch listing pages with ``fetch`` (e.g.
+    ``ClutchClient.fetch_profile``). Every page of a listing's pagination is
+    queued as soon as its first page is seen, so the pages are walked
+    concurrently; ``max_depth`` limits how many pagination hops away from a
+    start URL the crawl goes and ``max_pages`` caps the listing pages fetched.
+
+    The generator is meant to be the input of ``run_pipeline`` so scraping
+    starts while discovery is still running. At most ``buffer_size``
+    discovered URLs wait for the scraper; beyond that the crawl pauses.
+    Profiles are de-duplicated with a BloomFilter sized for
+    ``expected_profiles``, so memory stays bounded on any directory size.
+
+    A listing page that fails to fetch is logged and skipped. Any other error
+    in a worker stops the crawl and is raised from the generator once the
+    profiles already found have been yielded.
+    """
+    workers = max(1, int(workers))
+    stop = threading.Event()
+    work: "queue.Queue[Any]" = queue.Queue()
+    found: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(buffer_size)))
+    profiles_seen = BloomFilter(expected_profiles)
+    # Listing pages are few compared to profiles; an exact set is fine.
+    pages_seen = set()
+    lock = threading.Lock()
+    stats = {"pages": 0, "profiles": 0}
+    errors: list = []
+
+    def enqueue(url: str, depth: int) -> None:
+        if max_depth is not None and depth > max_depth:
+            return
+        key = normalize_url(url)
+        with lock:
+            if key in pages_seen:
+                return
+            if max_pages is not None and len(pages_seen) >= max_pages:
+                return
+            pages_seen.add(key)
+        work.put((url, depth))
+
+    def emit(url: str) -> bool:
+        while not stop.is_set():
+            try:
+                found.put(url, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker() -> None:
+        while True:
+            item = work.get()
+            if item is _DONE:
+                return
+            try:
+                if stop.is_set():
+                    continue
+                url, depth = item
+                try:
+                    html = fetch(url)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("Failed to fetch listing page %s: %s", url, exc)
+                    html = None
+                if not html:
+                    logger.warning("Empty listing page: %s", url)
+                    continue
+                with lock:
+                    stats["pages"] += 1
+                for page in other_page_urls(html, url, limit=max_pages or 10**6):
+                    enqueue(page, depth + 1)
+                for profile in parse_profile_links(html, url):
+                    if profiles_seen.add(profile_key(profile)):
+                        with lock:
+                            stats["profiles"] += 1
+                        if not emit(profile):
+                            break
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Crawler worker failed on %s: %s", item[0], exc, exc_info=True)
+                errors.append(exc)
+                stop.set()
+            finally:
+                work.task_done()
+
+    def coordinator() -> None:
+        work.join()
+        for _ in range(workers):
+            work.put(_DONE)
+        while not stop.is_set():
+            try:
+                found.put(_DONE, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    for url in start_urls:
+        enqueue(url, 0)
+    threads = [
+        threading.Thread(target=worker, name=f"crawler-{i}", daemon=True)
+        for i in range(workers)
+    ]
+    threads.append(threading.Thread(target=coordinator, name="crawler-done", daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            try:
+                url = found.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                # A failed worker stops the crawl before the end marker is sent.
+                if errors:
+                    break
+                continue
+            if url is _DONE:
+                break
+            yield url
+    finally:
+        stop.set()
+        logger.info(
+            "Crawl fetched %d listing pages and found %d unique profiles",
+            stats["pages"],
+            stats["profiles"],
+        )
+
+    if errors:
+        raise errors[0]
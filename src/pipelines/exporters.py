@@ -1,23 +1,164 @@
 from __future__ import annotations
 
+import gzip
 import json
 import logging
 from pathlib import Path
-from typing import Any, Iterable, Union
+from typing import IO, Any, Iterable, Optional, Union
+
+from parsers.models import CompanyRecord, as_dict
+from pipelines.sqlite_export import SQLITE_SUFFIXES, SqliteExporter
 
 logger = logging.getLogger(__name__)
 
+FORMATS = ("json", "jsonl", "sqlite")
+
+def _open_output(path: Path) -> IO[bytes]:
+    if not path.parent.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".gz":
+        return gzip.open(path, "wb")
+    return path.open("wb")
+
+class StreamingExporter:
+    """Base class for exporters that write each record as soon as it arrives.
+
+    The output file is created on the first ``write`` so a run that produces
+    no records leaves nothing behind. Paths ending in ``.gz`` are
+    gzip-compressed. Use as a context manager or call ``close()``.
+    Records may be CompanyRecords or already exported dicts.
+
+    ``resume_offset`` reopens an existing (uncompressed) output, drops
+    anything after that byte offset - e.g. a record half-written when a
+    previous run died - and appends after it. ``offset`` is the position
+    just after the last record written.
+    """
+
+    def __init__(
+        self,
+        output_path: Union[str, Path],
+        resume_offset: Optional[int] = None,
+    ) -> None:
+        self.path = Path(output_path)
+        self.count = 0
+        self._file: Optional[IO[bytes]] = None
+        self._records_in_file = 0
+        self._resume_offset = resume_offset
+        if resume_offset and self.path.suffix == ".gz":
+            raise ValueError(f"Cannot resume into compressed output {self.path}")
+
+    @property
+    def offset(self) -> int:
+        return self._file.tell() if self._file is not None else 0
+
+    def write(self, record: Union[CompanyRecord, dict]) -> None:
+        if self._file is None:
+            self._open()
+        self._write_record(as_dict(record))
+        self.count += 1
+        self._records_in_file += 1
+        self._file.flush()
+
+    def flush(self) -> None:
+        """Records are flushed as they are written; nothing is held back."""
+
+    def close(self) -> None:
+        if self._file is None and self._resume_offset and self.path.exists():
+            # Nothing new was written, but the resumed file still needs its
+            # partial tail dropped and (for arrays) its closing bracket.
+            self._open()
+        if self._file is None:
+            return
+        self._finish()
+        self._file.close()
+        self._file = None
+        logger.info("Wrote %d records to %s", self.count, self.path)
+
+    def _open(self) -> None:
+        if self._resume_offset and self.path.exists():
+            self._file = self.path.open("r+b")
+            self._file.truncate(self._resume_offset)
+            self._file.seek(self._resume_offset)
+            # Resumed files already hold at least one record.
+            self._records_in_file = 1
+            logger.info("Appending to %s after byte %d", self.path, self._resume_offset)
+            return
+        self._file = _open_output(self.path)
+        self._start()
+
+    def _start(self) -> None:
+        pass
+
+    def _write_record(self, record: dict) -> None:
+        raise NotImplementedError
+
+    def _finish(self) -> None:
+        pass
+
+    def __enter__(self) -> "StreamingExporter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class JsonLinesExporter(StreamingExporter):
+    """One compact JSON object per line (JSON Lines)."""
+
+    def _write_record(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._file.write(line.encode("utf-8"))
+
+class JsonArrayExporter(StreamingExporter):
+    """A JSON array written incrementally, byte-identical to ``export_to_json``."""
+
+    def _start(self) -> None:
+        self._file.write(b"[")
+
+    def _write_record(self, record: dict) -> None:
+        body = json.dumps(record, indent=2, ensure_ascii=False)
+        separator = ",\n  " if self._records_in_file else "\n  "
+        self._file.write((separator + body.replace("\n", "\n  ")).encode("utf-8"))
+
+    def _finish(self) -> None:
+        self._file.write(b"\n]" if self._records_in_file else b"]")
+
+def open_exporter(
+    output_path: Union[str, Path],
+    fmt: Optional[str] = None,
+    resume_offset: Optional[int] = None,
+    sqlite_batch_size: int = 500,
+) -> Union[StreamingExporter, SqliteExporter]:
+    """Create an exporter for ``fmt``, inferring it from the path if unset."""
+    path = Path(output_path)
+    if fmt is None:
+        suffixes = path.suffixes[-2:] if path.suffix == ".gz" else path.suffixes[-1:]
+        if path.suffix in SQLITE_SUFFIXES:
+            fmt = "sqlite"
+        else:
+            fmt = "jsonl" if ".jsonl" in suffixes else "json"
+    if fmt == "sqlite":
+        if path.suffix == ".gz":
+            raise ValueError(f"SQLite output cannot be compressed: {path}")
+        return SqliteExporter(path, batch_size=sqlite_batch_size)
+    if fmt == "jsonl":
+        return JsonLinesExporter(path, resume_offset)
+    if fmt == "json":
+        return JsonArrayExporter(path, resume_offset)
+    raise ValueError(f"Unknown output format {fmt!r}; expected one of {FORMATS}")
+
 def export_to_json(
-    records: Iterable[dict],
+    records: Iterable[Union[CompanyRecord, dict]],
     output_path: Union[str, Path],
 ) -> None:
     """Export a sequence of normalized records into a JSON file."""
     path = Path(output_path)
-    if not path.parent.exists():
-        path.parent.mkdir(parents=True, exist_ok=True)
-
-    data = list(records)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    exporter = JsonArrayExporter(path)
+    with exporter:
+        for record in records:
+            exporter.write(record)
 
-    logger.info("Wrote %d records to %s", len(data), path)
\ No newline at end of file
+    if exporter.count == 0:
+        # Keep writing an (empty) array for callers that expect a file.
+        with _open_output(path) as f:
+            f.write(b"[]")
+        logger.info("Wrote %d records to %s", 0, path)
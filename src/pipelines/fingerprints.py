@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Union
+
+from parsers.models import CompanyRecord, as_dict
+from pipelines.review_pages import HarvestedProfile
+from utils.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Markup that changes on every request without the profile itself changing.
+DEFAULT_STRIP_PATTERNS = (
+    # CSRF tokens in <meta> and hidden form inputs
+    r"<meta[^>]+name=[\"']csrf[-_][^>]*>",
+    r"<input[^>]+name=[\"'](?:_?csrf(?:_?token)?|authenticity_token|_token)[\"'][^>]*>",
+    # CSP nonces on inline scripts/styles
+    r"\snonce=[\"'][^\"']*[\"']",
+    # ISO-8601 timestamps and Unix epoch seconds/milliseconds
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?",
+    r"\b1\d{9}(?:\d{3})?\b",
+    # Cache-busting query strings on static assets
+    r"([?&])(?:v|ver|cb|_)=[\w.-]+",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    record TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+class Canonicalizer:
+    """Strips volatile tokens from HTML before it is fingerprinted."""
+
+    def __init__(self, patterns: Optional[Iterable[str]] = None) -> None:
+        self.patterns: List[Pattern[str]] = [
+            re.compile(p) for p in (DEFAULT_STRIP_PATTERNS if patterns is None else patterns)
+        ]
+
+    def __call__(self, html: str) -> str:
+        for pattern in self.patterns:
+            html = pattern.sub("", html)
+        return html
+
+class FingerprintStore:
+    """Remembers each profile's content fingerprint and its normalized record.
+
+    ``lookup`` returns the stored record when a freshly fetched page
+    fingerprints the same as last time, so parsing and normalization can be
+    skipped; ``store`` saves a newly parsed record. ``salt`` is mixed into
+    every fingerprint - change it (e.g. after a parser fix) to invalidate all
+    stored records at once. ``hits`` / ``misses`` count lookups. Records are
+    stored, and returned by ``lookup``, in their exported dict form.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        canonicalizer: Optional[Canonicalizer] = None,
+        salt: str = "",
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.canonicalize = canonicalizer or Canonicalizer()
+        self.salt = salt
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Fingerprints computed by a missed lookup, reused by the following store.
+        self._pending: Dict[str, str] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def fingerprint(self, html: Union[str, HarvestedProfile]) -> str:
+        digest = hashlib.sha256(self.salt.encode("utf-8"))
+        if isinstance(html, HarvestedProfile):
+            # Reviews from the other review pages are part of the record too.
+            reviews = [review.to_dict() for review in html.reviews]
+            digest.update(json.dumps(reviews, sort_keys=True).encode("utf-8"))
+            html = html.html
+        digest.update(self.canonicalize(html).encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, url: str, html: Union[str, HarvestedProfile]) -> Optional[Dict[str, Any]]:
+        key = normalize_url(url)
+        fingerprint = self.fingerprint(html)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, record FROM fingerprints WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and row[0] == fingerprint:
+                self.hits += 1
+                return json.loads(row[1])
+            self.misses += 1
+            self._pending[key] = fingerprint
+        return None
+
+    def store(
+        self,
+        url: str,
+        html: Union[str, HarvestedProfile],
+        record: Union[CompanyRecord, Dict[str, Any]],
+    ) -> None:
+        key = normalize_url(url)
+        with self._lock:
+            fingerprint = self._pending.pop(key, None)
+        if fingerprint is None:
+            fingerprint = self.fingerprint(html)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (key, fingerprint, record, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    fingerprint,
+                    json.dumps(as_dict(record), ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def log_stats(self) -> None:
+        total = self.hits + self.misses
+        if total:
+            logger.info(
+                "Fingerprint store: %d hits, %d misses (%.1f%% of pages not re-parsed)",
+                self.hits,
+                self.misses,
+                100.0 * self.hits / total,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
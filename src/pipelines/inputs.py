@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import logging
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Union
+
+from utils.bloom import BloomFilter
+from utils.urls import profile_key
+
+logger = logging.getLogger(__name__)
+
+# Object keys whose array holds the input URLs, in order of preference.
+_URL_LIST_KEYS = ("profile_urls", "urls")
+# Keys of a JSON Lines object that hold its URL.
+_URL_FIELDS = ("url", "profile_url", "profileURL")
+
+_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\r\n"
+
+def _open_input(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+def _first_char(path: Path) -> str:
+    """The first non-whitespace character of ``path`` ("" if there is none)."""
+    with _open_input(path) as f:
+        return _JsonStream(f).peek()
+
+def input_format(path: Union[str, Path]) -> str:
+    """"json", "jsonl" or "text", from the suffix of ``path`` (ignoring ``.gz``).
+
+    Without a recognised suffix, a file starting with ``[`` or ``{`` is JSON
+    and anything else is text.
+    """
+    path = Path(path)
+    suffix = path.with_suffix("").suffix if path.suffix == ".gz" else path.suffix
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix == ".json":
+        return "json"
+    if suffix in (".txt", ".text"):
+        return "text"
+    return "json" if _first_char(path) in ("[", "{") else "text"
+
+class _JsonStream:
+    """Just enough of an incremental JSON reader to walk one array lazily."""
+
+    def __init__(self, f: IO[str]) -> None:
+        self._f = f
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character ("" at end of input)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Malformed JSON input: expected one of {chars!r}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        decoder = json.JSONDecoder()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A value ending exactly at the buffer edge (e.g. a number) may
+            # continue in the next chunk.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array(self) -> Iterator:
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+def _object_keys(stream: _JsonStream) -> Iterator[str]:
+    """Yield the keys of the object at the current position; the caller reads each value."""
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        yield key
+        if stream.expect(",}") == "}":
+            return
+
+def _iter_json(path: Path) -> Iterator[str]:
+    with _open_input(path) as f:
+        stream = _JsonStream(f)
+        if stream.peek() == "[":
+            yield from stream.array()
+            return
+        found = set()
+        for key in _object_keys(stream):
+            if key == _URL_LIST_KEYS[0] and stream.peek() == "[":
+                yield from stream.array()
+                return
+            if key in _URL_LIST_KEYS and stream.peek() == "[":
+                found.add(key)
+                for _ in stream.array():
+                    pass
+            else:
+                stream.value()  # skip any other member
+    # A less preferred list came first; read it again now that it is known
+    # to be the best one.
+    for wanted in _URL_LIST_KEYS:
+        if wanted in found:
+            with _open_input(path) as f:
+                stream = _JsonStream(f)
+                for key in _object_keys(stream):
+                    if key == wanted:
+                        yield from stream.array()
+                        return
+                    stream.value()
+    raise ValueError(
+        "Unsupported input format. Expected a list of URLs or an object with "
+        '"profile_urls"/"urls" key.'
+    )
+
+def _iter_jsonl(f: IO[str]) -> Iterator[str]:
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("Skipping malformed input line %d", line_no)
+            continue
+        if isinstance(item, dict):
+            item = next((item[k] for k in _URL_FIELDS if item.get(k)), None)
+        if item:
+            yield item
+
+def _iter_text(f: IO[str]) -> Iterator[str]:
+    for line in f:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+def iter_input_urls(path: Union[str, Path]) -> Iterator[str]:
+    """Yield the URLs of an input file lazily, one at a time.
+
+    Accepts a JSON list (or an object with a "profile_urls"/"urls" list),
+    JSON Lines of strings or objects with a "url" field, or plain text with
+    one URL per line; any of them optionally gzip-compressed (``.gz``). The
+    file is read in chunks, so huge inputs start flowing immediately.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Input URLs file not found: {path}")
+    return _read_urls(path)
+
+def _read_urls(path: Path) -> Iterator[str]:
+    fmt = input_format(path)
+    if fmt == "json":
+        for url in _iter_json(path):
+            yield str(url)
+        return
+    reader = _iter_jsonl if fmt == "jsonl" else _iter_text
+    with _open_input(path) as f:
+        for url in reader(f):
+            yield str(url)
+
+def iter_records(path: Union[str, Path]) -> Iterator[dict]:
+    """Yield the records of a JSON array or JSON Lines output file lazily."""
+    path = Path(path)
+    array = _first_char(path) == "["
+    with _open_input(path) as f:
+        if array:
+            yield from _JsonStream(f).array()
+            return
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping malformed line %d of %s", line_no, path)
+
+def dedupe_urls(
+    urls: Iterable[str],
+    expected: int = 5_000_000,
+    error_rate: float = 1e-6,
+) -> Iterator[str]:
+    """Yield each profile once, as its canonical ``profile_key`` URL.
+
+    Seen keys are tracked in a BloomFilter sized for ``expected`` URLs, so
+    memory stays fixed however long the input is; a false positive (roughly
+    ``error_rate`` per URL) skips a URL that was not actually a duplicate.
+    """
+    seen = BloomFilter(expected, error_rate)
+    duplicates = 0
+    for url in urls:
+        key = profile_key(url)
+        if seen.add(key):
+            yield key
+        else:
+            duplicates += 1
+    if duplicates:
+        logger.info("Skipped %d duplicate input URLs", duplicates)
@@ -1,19 +1,36 @@
 from __future__ import annotations
 
+import dataclasses
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Union, overload
+
+from parsers.models import CompanyRecord, Review
 
 logger = logging.getLogger(__name__)
 
+@overload
+def normalize_company_data(
+    profile_data: CompanyRecord, reviews: List[Review]
+) -> CompanyRecord: ...
+
+@overload
+def normalize_company_data(
+    profile_data: Dict[str, Any], reviews: List[Dict[str, Any]]
+) -> Dict[str, Any]: ...
+
 def normalize_company_data(
-    profile_data: Dict[str, Any],
-    reviews: List[Dict[str, Any]],
-) -> Dict[str, Any]:
+    profile_data: Union[CompanyRecord, Dict[str, Any]],
+    reviews: List[Any],
+) -> Union[CompanyRecord, Dict[str, Any]]:
     """Attach reviews and compute a few derived fields on top of profile data.
 
     The goal is not to perfectly replicate Clutch's internal schema but to
-    produce a predictable, analytics-friendly JSON structure.
+    produce a predictable, analytics-friendly JSON structure. A CompanyRecord
+    with Review objects gives a CompanyRecord; dicts give a dict.
     """
+    if isinstance(profile_data, CompanyRecord):
+        return _normalize_record(profile_data, reviews)
+
     result = dict(profile_data)  # shallow copy
 
     # Attach reviews
@@ -37,4 +54,20 @@ def normalize_company_data(
         result.get("profileURL"),
         len(reviews),
     )
-    return result
\ No newline at end of file
+    return result
+
+def _normalize_record(record: CompanyRecord, reviews: List[Review]) -> CompanyRecord:
+    result = dataclasses.replace(record, reviews=reviews)
+
+    numeric_ratings = [r.rating for r in reviews if isinstance(r.rating, (int, float))]
+    if numeric_ratings:
+        avg_rating = round(sum(numeric_ratings) / len(numeric_ratings), 2)
+        result.aggregate_rating = str(avg_rating)
+        result.aggregate_total_review = str(len(numeric_ratings))
+
+    logger.debug(
+        "Normalized company data for %s with %d reviews",
+        result.profile_url,
+        len(reviews),
+    )
+    return result
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional, Union
+
+from parsers.document import DEFAULT_BACKEND
+from parsers.document import LxmlPage
+from parsers.models import Review
+from parsers.reviews_parser import extract_reviews, review_key, review_page_urls
+from parsers.streaming import StreamedPage
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class HarvestedProfile:
+    """A profile page plus the reviews parsed from its other review pages."""
+
+    html: Union[str, StreamedPage]
+    reviews: List[Review] = field(default_factory=list)
+    pages: int = 1
+
+def page_html(
+    document: Union[str, StreamedPage, HarvestedProfile]
+) -> Union[str, StreamedPage]:
+    """The profile page HTML (or streamed page) of a fetched document."""
+    return document.html if isinstance(document, HarvestedProfile) else document
+
+def page_source(document: Union[str, StreamedPage]) -> Union[str, LxmlPage]:
+    """What the parsers accept for a fetched page: its HTML or parsed tree."""
+    return document.page if isinstance(document, StreamedPage) else document
+
+def page_size(document: Union[str, StreamedPage, HarvestedProfile]) -> int:
+    """Size of a fetched profile page: characters of HTML, or bytes streamed."""
+    html = page_html(document)
+    return html.size if isinstance(html, StreamedPage) else len(html)
+
+def merge_reviews(*review_lists: Iterable[Review]) -> List[Review]:
+    """Concatenate review lists, keeping the first copy of each review."""
+    seen = set()
+    merged = []
+    for reviews in review_lists:
+        for review in reviews:
+            key = review_key(review)
+            if key not in seen:
+                seen.add(key)
+                merged.append(review)
+    return merged
+
+class ReviewHarvester:
+    """Wraps a profile fetcher so it also collects every review page.
+
+    After fetching a profile, the pagination links decide how many review
+    pages there are (capped at ``max_pages`` in total); the remaining pages
+    are fetched concurrently - up to ``page_workers`` at a time for a
+    blocking ``fetch`` - and each page's reviews are parsed as soon as it
+    arrives. Profiles without further pages come back as plain HTML, others
+    as a HarvestedProfile for ``process_html`` to merge. A review page that
+    fails to download is logged and skipped. ``page_fetch`` fetches the
+    extra review pages when they should not go through ``fetch``.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        max_pages: int = 20,
+        page_workers: int = 4,
+        backend: str = DEFAULT_BACKEND,
+        page_fetch: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        self._fetch = fetch
+        self._fetch_page = page_fetch or fetch
+        self.max_pages = int(max_pages)
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, int(page_workers)), thread_name_prefix="review-pages"
+        )
+
+    def _parse_page(
+        self, url: str, html: Optional[Union[str, StreamedPage]]
+    ) -> List[Review]:
+        if not html:
+            logger.warning("Failed to fetch review page %s", url)
+            return []
+        try:
+            return extract_reviews(page_source(html), backend=self.backend)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to parse review page %s: %s", url, exc)
+            return []
+
+    def _harvested(
+        self, url: str, html: Union[str, StreamedPage], pages: List[List[Review]]
+    ) -> HarvestedProfile:
+        reviews = merge_reviews(*pages)
+        logger.debug(
+            "Collected %d reviews from %d extra review pages of %s",
+            len(reviews),
+            len(pages),
+            url,
+        )
+        return HarvestedProfile(html, reviews, pages=len(pages) + 1)
+
+    def fetch(self, url: str) -> Optional[Union[str, HarvestedProfile]]:
+        html = self._fetch(url)
+        if not html:
+            return html
+        page_urls = review_page_urls(page_source(html), url, self.max_pages)
+        if not page_urls:
+            return html
+
+        def fetch_page(page_url: str) -> Optional[str]:
+            try:
+                return self._fetch_page(page_url)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to fetch review page %s: %s", page_url, exc)
+                return None
+
+        futures = {self._executor.submit(fetch_page, u): i for i, u in enumerate(page_urls)}
+        pages: List[List[Review]] = [[] for _ in page_urls]
+        for future in as_completed(futures):
+            i = futures[future]
+            pages[i] = self._parse_page(page_urls[i], future.result())
+        return self._harvested(url, html, pages)
+
+    async def fetch_async(self, url: str) -> Optional[Union[str, HarvestedProfile]]:
+        html = await self._fetch(url)
+        if not html:
+            return html
+        page_urls = review_page_urls(page_source(html), url, self.max_pages)
+        if not page_urls:
+            return html
+
+        loop = asyncio.get_running_loop()
+
+        async def fetch_page(i: int) -> None:
+            try:
+                page = await self._fetch_page(page_urls[i])
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to fetch review page %s: %s", page_urls[i], exc)
+                page = None
+            # Parse off the event loop so other downloads keep going.
+            pages[i] = await loop.run_in_executor(
+                self._executor, self._parse_page, page_urls[i], page
+            )
+
+        pages: List[List[Review]] = [[] for _ in page_urls]
+        await asyncio.gather(*(fetch_page(i) for i in range(len(page_urls))))
+        return self._harvested(url, html, pages)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
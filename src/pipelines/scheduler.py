@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from parsers.models import CompanyRecord, as_dict, parse_integer, record_digest
+from utils.metrics import run_metrics
+from utils.urls import profile_key
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    key TEXT PRIMARY KEY,
+    fingerprint BLOB,
+    last_fetched REAL,
+    last_changed REAL,
+    intervals INTEGER NOT NULL DEFAULT 0,
+    changes INTEGER NOT NULL DEFAULT 0,
+    observed_s REAL NOT NULL DEFAULT 0,
+    review_count INTEGER,
+    review_rate REAL NOT NULL DEFAULT 0,
+    error_streak INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_DAY = 86400.0
+# Profiles looked up per query while planning.
+_LOOKUP_BATCH = 500
+# Weight of the latest interval in the smoothed review growth rate.
+_REVIEW_RATE_ALPHA = 0.3
+
+def _total_reviews(data: Dict[str, Any]) -> int:
+    """The profile's review count as Clutch states it, else the reviews harvested."""
+    for section in ("summary", "rating"):
+        total = parse_integer((data.get(section) or {}).get("totalReview"))
+        if total is not None:
+            return total
+    return len(data.get("reviews") or ())
+
+def change_rate(intervals: int, changes: int, observed_s: float) -> Optional[float]:
+    """Estimated changes per second from ``changes`` seen over ``intervals`` revisits.
+
+    A revisit only tells whether a profile changed at least once since the
+    previous fetch, so ``changes / observed_s`` undercounts busy profiles;
+    this is the bias-reduced estimator for Poisson changes observed at
+    intervals, ``-log((n - X + 0.5) / (n + 0.5)) / mean interval``. None
+    before the first revisit.
+    """
+    if intervals <= 0 or observed_s <= 0:
+        return None
+    changes = min(changes, intervals)
+    return -math.log((intervals - changes + 0.5) / (intervals + 0.5)) * intervals / observed_s
+
+class RefreshScheduler:
+    """Per-profile fetch history, and refresh plans that spend a fetch budget well.
+
+    ``record`` is called with every result: it notes when a profile was
+    fetched, whether its record changed since the previous fetch (by
+    fingerprint), how fast its review count grows and how many fetches in a
+    row failed. ``plan`` ranks input URLs by the probability that their
+    profile changed since it was last fetched, from a Poisson model with the
+    profile's estimated change rate (or its review growth rate, if higher),
+    and returns the ``budget`` most likely changed ones. The rate never
+    drops below one change per observed time plus ``default_change_days``,
+    so new profiles start at that rate and stable ones are still revisited,
+    ever less often. Profiles never fetched come first; each consecutive
+    failure halves a profile's priority.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        default_change_days: float = 30.0,
+        min_age_hours: float = 0.0,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.default_rate = 1.0 / (max(default_change_days, 1e-3) * _DAY)
+        self.min_age_s = max(0.0, min_age_hours) * 3600.0
+        self.changed = 0
+        self.unchanged = 0
+        self.failed = 0
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def priority(self, row: Optional[tuple], now: float) -> float:
+        """Probability that the profile changed since its last fetch, backed off by failures."""
+        if row is None:
+            return 2.0  # never fetched
+        last_fetched, intervals, changes, observed_s, review_rate, error_streak = row
+        backoff = 0.5 ** min(error_streak, 30)
+        if last_fetched is None:
+            return 2.0 * backoff
+        age = max(0.0, now - last_fetched)
+        if age < self.min_age_s:
+            return 0.0
+        rate = max(
+            change_rate(intervals, changes, observed_s) or 0.0,
+            1.0 / (observed_s + 1.0 / self.default_rate),
+            review_rate,
+        )
+        return -math.expm1(-rate * age) * backoff
+
+    def _lookup(self, keys: List[str]) -> Dict[str, tuple]:
+        placeholders = ", ".join("?" for _ in keys)
+        rows = self._conn.execute(
+            "SELECT key, last_fetched, intervals, changes, observed_s, review_rate, "
+            f"error_streak FROM history WHERE key IN ({placeholders})",
+            keys,
+        )
+        return {row[0]: row[1:] for row in rows}
+
+    def plan(self, urls: Iterable[str], budget: int, now: Optional[float] = None) -> List[str]:
+        """The ``budget`` URLs of ``urls`` most likely to have changed, likeliest first.
+
+        Memory holds the ``budget`` best candidates, not the whole input.
+        Profiles fetched less than ``min_age_hours`` ago are never planned.
+        """
+        now = time.time() if now is None else now
+        best: List[Tuple[float, float, int, str]] = []
+        seen = 0
+        batch: List[str] = []
+
+        def rank(batch: List[str]) -> None:
+            rows = self._lookup([profile_key(url) for url in batch])
+            for i, url in enumerate(batch):
+                row = rows.get(profile_key(url))
+                score = self.priority(row, now)
+                if score <= 0.0:
+                    continue
+                # Ties (e.g. new profiles) go to the longest unfetched, then input order.
+                age = math.inf if row is None or row[0] is None else now - row[0]
+                entry = (score, age, -(seen + i), url)
+                if len(best) < budget:
+                    heapq.heappush(best, entry)
+                elif best and entry > best[0]:
+                    heapq.heapreplace(best, entry)
+
+        for url in urls:
+            batch.append(url)
+            if len(batch) >= _LOOKUP_BATCH:
+                rank(batch)
+                seen += len(batch)
+                batch = []
+        if batch:
+            rank(batch)
+            seen += len(batch)
+        planned = [entry[3] for entry in sorted(best, reverse=True)]
+        run_metrics.inc("refresh_skipped", seen - len(planned))
+        logger.info(
+            "Refresh plan: %d of %d profiles (budget %d)", len(planned), seen, budget
+        )
+        return planned
+
+    def record(
+        self,
+        url: str,
+        record: Optional[Union[CompanyRecord, Dict[str, Any]]],
+        now: Optional[float] = None,
+    ) -> None:
+        """Note the outcome of fetching ``url``: its record, or None if it failed."""
+        now = time.time() if now is None else now
+        key = profile_key(url)
+        if record is None:
+            self.failed += 1
+            self._conn.execute(
+                "INSERT INTO history (key, error_streak) VALUES (?, 1) "
+                "ON CONFLICT (key) DO UPDATE SET error_streak = error_streak + 1",
+                (key,),
+            )
+            return
+
+        data = as_dict(record)
+        fingerprint = record_digest(data)
+        reviews = _total_reviews(data)
+        row = self._conn.execute(
+            "SELECT fingerprint, last_fetched, review_count, review_rate FROM history "
+            "WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None or row[1] is None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO history (key, fingerprint, last_fetched, "
+                "last_changed, review_count) VALUES (?, ?, ?, ?, ?)",
+                (key, fingerprint, now, now, reviews),
+            )
+            return
+
+        previous, last_fetched, review_count, review_rate = row
+        interval = max(0.0, now - last_fetched)
+        changed = fingerprint != previous
+        if changed:
+            self.changed += 1
+        else:
+            self.unchanged += 1
+        if interval > 0 and review_count is not None:
+            growth = max(0, reviews - review_count) / interval
+            review_rate += _REVIEW_RATE_ALPHA * (growth - review_rate)
+        self._conn.execute(
+            "UPDATE history SET fingerprint = ?, last_fetched = ?, "
+            "last_changed = CASE WHEN ? THEN ? ELSE last_changed END, "
+            "intervals = intervals + 1, changes = changes + ?, observed_s = observed_s + ?, "
+            "review_count = ?, review_rate = ?, error_streak = 0 WHERE key = ?",
+            (
+                fingerprint,
+                now,
+                changed,
+                now,
+                int(changed),
+                interval,
+                reviews,
+                review_rate,
+                key,
+            ),
+        )
+
+    def flush(self) -> None:
+        self._conn.commit()
+
+    def log_stats(self) -> None:
+        revisited = self.changed + self.unchanged
+        if revisited:
+            logger.info(
+                "Refresh history: %d of %d revisited profiles changed (%.1f%%), %d failed",
+                self.changed,
+                revisited,
+                100.0 * self.changed / revisited,
+                self.failed,
+            )
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> "RefreshScheduler":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
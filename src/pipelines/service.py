@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from parsers.models import as_dict
+from pipelines.concurrency import ScrapeResult, run_pipeline
+from utils.metrics import run_metrics
+from utils.urls import profile_key
+
+logger = logging.getLogger(__name__)
+
+# Request bodies larger than this per allowed URL are refused unread.
+_MAX_URL_BYTES = 4096
+
+class ServiceBusy(Exception):
+    """Raised when the job queue is full; the client should retry later."""
+
+class Job:
+    """An admitted batch of URLs: iterate it for results as they complete.
+
+    ``close`` cancels what is left of the job, or gives up its place in the
+    queue if it never started.
+    """
+
+    def __init__(self, service: "ScrapeService", urls: List[str], ordered: bool) -> None:
+        self.urls = urls
+        self.ordered = ordered
+        self._service = service
+        self._results: Optional[Iterator[ScrapeResult]] = None
+        self._closed = False
+
+    def __iter__(self) -> Iterator[ScrapeResult]:
+        if self._results is None:
+            self._results = self._service._run(self)
+        return self._results
+
+    def close(self) -> None:
+        if self._results is not None:
+            self._results.close()
+        elif not self._closed:
+            self._service._leave()
+        self._closed = True
+
+class ScrapeService:
+    """Runs URL batches ("jobs") through one long-lived fetcher.
+
+    ``fetch`` and ``parse`` are built once, so the HTTP session, its pooled
+    connections and the caches stay warm between jobs. Up to ``job_workers``
+    jobs run at a time, each through its own ``run_pipeline`` with
+    ``fetch_workers`` fetch threads; at most ``max_queued_jobs`` more wait
+    for a turn, and further jobs are refused with ServiceBusy. Results are
+    yielded as they complete; a caller that reads them slowly holds its
+    pipeline back rather than letting results pile up.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        parse: Callable[[Any, str], Any],
+        *,
+        fetch_workers: int = 4,
+        job_workers: int = 2,
+        max_queued_jobs: int = 8,
+        max_job_urls: int = 1000,
+        record_cache: Optional[Any] = None,
+    ) -> None:
+        self.fetch = fetch
+        self.parse = parse
+        self.fetch_workers = max(1, int(fetch_workers))
+        self.job_workers = max(1, int(job_workers))
+        self.max_queued_jobs = max(0, int(max_queued_jobs))
+        self.max_job_urls = max(1, int(max_job_urls))
+        self.record_cache = record_cache
+        self._slots = threading.Semaphore(self.job_workers)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._completed = 0
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "completed": self._completed,
+                "job_workers": self.job_workers,
+                "max_queued_jobs": self.max_queued_jobs,
+            }
+
+    def submit(self, urls: List[str], ordered: bool = False) -> Job:
+        """Admit a job for ``urls`` (de-duplicated by profile).
+
+        Raises ServiceBusy when the queue is full and ValueError for an
+        empty or oversized batch.
+        """
+        urls = list(dict.fromkeys(profile_key(url) for url in urls))
+        if not urls:
+            raise ValueError("A job needs at least one URL")
+        if len(urls) > self.max_job_urls:
+            raise ValueError(f"A job may have at most {self.max_job_urls} URLs, got {len(urls)}")
+        with self._lock:
+            if self._admitted >= self.job_workers + self.max_queued_jobs:
+                raise ServiceBusy(f"{self._admitted - self._running} jobs already waiting")
+            self._admitted += 1
+        return Job(self, urls, ordered)
+
+    def _leave(self) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def _run(self, job: Job) -> Iterator[ScrapeResult]:
+        self._slots.acquire()
+        with self._lock:
+            self._running += 1
+        run_metrics.inc("service_jobs")
+        results = run_pipeline(
+            job.urls,
+            self.fetch,
+            self.parse,
+            fetch_workers=min(self.fetch_workers, len(job.urls)),
+            ordered=job.ordered,
+            record_cache=self.record_cache,
+        )
+        try:
+            yield from results
+        finally:
+            results.close()
+            self._slots.release()
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._admitted -= 1
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """``"unix:/path/to.sock"`` or ``"[host:]port"`` as (family, address)."""
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self) -> Tuple[socket.socket, Any]:
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address.
+        return request, ("local", 0)
+
+def _handler(service: ScrapeService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(
+            self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+        ) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path.rstrip("/") != "/health":
+                self.send_error(404)
+                return
+            self._send_json(200, dict(service.status(), status="ok"))
+
+        def do_POST(self) -> None:  # noqa: N802
+            if self.path.rstrip("/") != "/jobs":
+                self.send_error(404)
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > service.max_job_urls * _MAX_URL_BYTES:
+                    raise ValueError("Request body too large")
+                body = json.loads(self.rfile.read(length) or b"null")
+                if isinstance(body, list):
+                    body = {"urls": body}
+                if not isinstance(body, dict) or not isinstance(body.get("urls"), list):
+                    raise ValueError('Expected a JSON list of URLs or {"urls": [...]}')
+                job = service.submit(
+                    [str(url) for url in body["urls"]], ordered=bool(body.get("ordered"))
+                )
+            except ServiceBusy as exc:
+                self._send_json(429, {"error": str(exc)}, {"Retry-After": "1"})
+                return
+            except ValueError as exc:
+                self._send_json(400, {"error": str(exc)})
+                return
+            self._stream(job)
+
+        def _stream(self, job: Job) -> None:
+            # One JSON object per line as each URL completes, then a summary;
+            # the response ends when the connection closes (HTTP/1.0).
+            started = time.perf_counter()
+            records = failed = 0
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for result in job:
+                    if result.record is None:
+                        failed += 1
+                        line = {"url": result.url, "error": "fetch or parse failed"}
+                    else:
+                        records += 1
+                        line = {"url": result.url, "record": as_dict(result.record)}
+                    data = json.dumps(line, ensure_ascii=False) + "\n"
+                    self.wfile.write(data.encode("utf-8"))
+                    self.wfile.flush()
+                summary = {
+                    "records": records,
+                    "failed": failed,
+                    "elapsed_s": round(time.perf_counter() - started, 3),
+                }
+                self.wfile.write((json.dumps({"summary": summary}) + "\n").encode("utf-8"))
+            except (BrokenPipeError, ConnectionResetError):
+                logger.info("Client went away; cancelling the rest of its job")
+            finally:
+                job.close()
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return Handler
+
+def make_server(service: ScrapeService, address: str) -> Any:
+    """An HTTP server for ``service`` bound to ``address`` (TCP or ``unix:`` path)."""
+    family, bind = parse_address(address)
+    if family == "unix":
+        if os.path.exists(bind):
+            os.unlink(bind)
+        return _UnixHTTPServer(bind, _handler(service))
+    server = ThreadingHTTPServer(bind, _handler(service))
+    server.daemon_threads = True
+    return server
+
+def serve(service: ScrapeService, address: str) -> None:
+    """Serve ``service`` on ``address`` until interrupted."""
+    server = make_server(service, address)
+    if threading.current_thread() is threading.main_thread():
+        # Stop cleanly (closing sessions and stores) on SIGTERM as on Ctrl-C.
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+    logger.info("Serving scrape jobs on %s (POST /jobs, GET /health)", address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        family, bind = parse_address(address)
+        if family == "unix" and os.path.exists(bind):
+            os.unlink(bind)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import logging
+import tempfile
+from contextlib import ExitStack, closing
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from pipelines.exporters import open_exporter
+from pipelines.inputs import iter_records
+from utils.urls import profile_key
+
+logger = logging.getLogger(__name__)
+
+# Most runs open at once while merging; more are merged in passes.
+_MERGE_FAN_IN = 64
+
+class Shard(NamedTuple):
+    """Shard ``index`` (1-based) of ``count``, as given by ``--shard K/N``."""
+
+    index: int
+    count: int
+
+    def owns(self, url: str) -> bool:
+        return shard_of(url, self.count) == self.index
+
+def parse_shard(spec: str) -> Shard:
+    """Parse ``"K/N"``; raises ValueError unless 1 <= K <= N."""
+    index, sep, count = spec.partition("/")
+    try:
+        shard = Shard(int(index), int(count))
+    except ValueError:
+        shard = None
+    if not sep or shard is None or not 1 <= shard.index <= shard.count:
+        raise ValueError(f"Invalid shard {spec!r}; expected K/N with 1 <= K <= N")
+    return shard
+
+def shard_of(url: str, count: int) -> int:
+    """The shard (1..count) that owns ``url``.
+
+    A hash of the canonical ``profile_key`` rather than Python's ``hash``,
+    so every node, run and Python version agrees and a company always lands
+    on the same node (keeping its HTTP cache and fingerprints warm).
+    """
+    digest = hashlib.blake2b(profile_key(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+def shard_urls(urls: Iterable[str], shard: Shard) -> Iterator[str]:
+    """Yield the URLs of ``urls`` that belong to ``shard``."""
+    skipped = 0
+    for url in urls:
+        if shard.owns(url):
+            yield url
+        else:
+            skipped += 1
+    logger.info("Shard %d/%d: skipped %d URLs owned by other shards", *shard, skipped)
+
+def _write_run(entries: Iterable[Any], directory: Path, number: int) -> Path:
+    path = directory / f"run-{number:05d}.jsonl"
+    with path.open("w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return path
+
+def _read_run(f: IO[str]) -> Iterator[list]:
+    for line in f:
+        yield json.loads(line)
+
+def _merge_runs(runs: List[Path]) -> Iterator[list]:
+    """The entries of sorted ``runs`` in order, only the latest of each profile."""
+    with ExitStack() as stack:
+        files = [stack.enter_context(run.open("r", encoding="utf-8")) for run in runs]
+        last: Optional[list] = None
+        for entry in heapq.merge(*map(_read_run, files), key=lambda e: e[:2]):
+            if last is not None and last[0] != entry[0]:
+                yield last
+            last = entry
+        if last is not None:
+            yield last
+
+def merge_outputs(
+    inputs: Iterable[Union[str, Path]],
+    output_path: Union[str, Path],
+    fmt: Optional[str] = None,
+    run_size: int = 10_000,
+    tmp_dir: Optional[Union[str, Path]] = None,
+    fan_in: int = _MERGE_FAN_IN,
+) -> int:
+    """Merge shard outputs into one, keeping one record per profile.
+
+    An external merge sort: records are read one at a time and written to
+    temporary runs of at most ``run_size`` records sorted by profile key,
+    then the runs are merged with a heap, so memory holds one run while
+    splitting and one record per run while merging, however big the shards
+    are. At most ``fan_in`` runs are open at a time: with more, groups of
+    ``fan_in`` are first merged into longer runs, pass by pass. Of several records for the same ``profileURL`` the one from the
+    last input (and latest within it) wins. Records come out ordered by
+    profile key. Returns the number of records written.
+    """
+    run_size = max(1, int(run_size))
+    fan_in = max(2, int(fan_in))
+    exporter = open_exporter(output_path, fmt)
+    with tempfile.TemporaryDirectory(prefix="clutch-merge-", dir=tmp_dir) as tmp:
+        runs: List[Path] = []
+        entries: List[tuple] = []
+        read = 0
+        for path in inputs:
+            for record in iter_records(path):
+                url = record.get("profileURL")
+                if not url:
+                    logger.warning("Skipping a record without profileURL in %s", path)
+                    continue
+                entries.append((profile_key(url), read, record))
+                read += 1
+                if len(entries) >= run_size:
+                    entries.sort(key=lambda entry: entry[:2])
+                    runs.append(_write_run(entries, Path(tmp), len(runs)))
+                    entries = []
+            logger.info("Read %s (%d records so far)", path, read)
+        if entries:
+            entries.sort(key=lambda entry: entry[:2])
+            runs.append(_write_run(entries, Path(tmp), len(runs)))
+        del entries
+
+        written = len(runs)
+        while len(runs) > fan_in:
+            logger.info("Merging %d runs in groups of %d", len(runs), fan_in)
+            merged: List[Path] = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                with closing(_merge_runs(group)) as entries_in_order:
+                    merged.append(_write_run(entries_in_order, Path(tmp), written))
+                written += 1
+                for run in group:
+                    run.unlink()
+            runs = merged
+
+        with exporter, closing(_merge_runs(runs)) as entries_in_order:
+            for entry in entries_in_order:
+                exporter.write(entry[2])
+    logger.info(
+        "Merged %d records into %d unique profiles in %s",
+        read,
+        exporter.count,
+        output_path,
+    )
+    return exporter.count
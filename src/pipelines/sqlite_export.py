@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from parsers.models import CompanyRecord, as_dict, parse_integer, parse_number
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# The charts of ``chartPie`` whose slices go to the ``chart_slices`` table.
+SLICE_CHARTS = ("service_provided", "industries", "clients")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    profile_url TEXT PRIMARY KEY,
+    name TEXT,
+    tag_line TEXT,
+    description TEXT,
+    logo TEXT,
+    website_url TEXT,
+    video_url TEXT,
+    rating REAL,
+    total_reviews INTEGER,
+    verification_status TEXT,
+    min_project_size TEXT,
+    average_hourly_rate TEXT,
+    employees TEXT,
+    founded TEXT,
+    languages TEXT,
+    timezones TEXT,
+    details TEXT,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS addresses (
+    profile_url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT,
+    street_address TEXT,
+    locality TEXT,
+    region TEXT,
+    country TEXT,
+    postal_code TEXT,
+    location_employees TEXT,
+    telephone TEXT,
+    PRIMARY KEY (profile_url, position)
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    profile_url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    date_published TEXT,
+    review_date TEXT,
+    rating REAL,
+    quality REAL,
+    schedule REAL,
+    cost REAL,
+    willing_to_refer REAL,
+    review TEXT,
+    reviewer_name TEXT,
+    reviewer_title TEXT,
+    reviewer_industry TEXT,
+    reviewer_company_size TEXT,
+    reviewer_location TEXT,
+    project_name TEXT,
+    project_budget TEXT,
+    project_length TEXT,
+    PRIMARY KEY (profile_url, position)
+);
+CREATE TABLE IF NOT EXISTS chart_slices (
+    profile_url TEXT NOT NULL,
+    chart TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    percent REAL,
+    url TEXT,
+    PRIMARY KEY (profile_url, chart, position)
+);
+CREATE INDEX IF NOT EXISTS companies_rating ON companies (rating);
+CREATE INDEX IF NOT EXISTS companies_name ON companies (name);
+CREATE INDEX IF NOT EXISTS addresses_country ON addresses (country, locality);
+CREATE INDEX IF NOT EXISTS reviews_date ON reviews (review_date);
+CREATE INDEX IF NOT EXISTS reviews_rating ON reviews (rating);
+CREATE INDEX IF NOT EXISTS chart_slices_name ON chart_slices (chart, name, percent);
+"""
+
+_COMPANY_COLUMNS = (
+    "profile_url",
+    "name",
+    "tag_line",
+    "description",
+    "logo",
+    "website_url",
+    "video_url",
+    "rating",
+    "total_reviews",
+    "verification_status",
+    "min_project_size",
+    "average_hourly_rate",
+    "employees",
+    "founded",
+    "languages",
+    "timezones",
+    "details",
+    "first_seen",
+    "updated_at",
+)
+
+# Re-scraped companies keep their first_seen; everything else is replaced.
+_UPSERT_COMPANY = (
+    f"INSERT INTO companies ({', '.join(_COMPANY_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _COMPANY_COLUMNS)}) "
+    "ON CONFLICT (profile_url) DO UPDATE SET "
+    + ", ".join(
+        f"{column} = excluded.{column}"
+        for column in _COMPANY_COLUMNS
+        if column not in ("profile_url", "first_seen")
+    )
+)
+
+_CHILD_TABLES = ("addresses", "reviews", "chart_slices")
+
+_DATE_FORMATS = ("%Y-%m-%d", "%b %d, %Y", "%B %d, %Y", "%b %Y", "%B %Y")
+
+def _iso_date(value: Optional[str]) -> Optional[str]:
+    """A review date as ``YYYY-MM-DD`` (sortable and indexable), if recognised."""
+    if not value:
+        return None
+    text = value.strip().replace(".", "")
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).date().isoformat()
+    except ValueError:
+        return None
+
+def _json(value: Any) -> Optional[str]:
+    return json.dumps(value, ensure_ascii=False) if value else None
+
+class SqliteExporter:
+    """Writes records into indexed SQLite tables instead of a JSON file.
+
+    Each company is one row of ``companies`` keyed by ``profileURL``, with
+    its addresses, reviews and chart slices (service lines, industries,
+    clients) in child tables. Records are upserted in transactions of
+    ``batch_size``: a company scraped again replaces its previous rows, so
+    repeated runs into the same database update it in place. The database
+    uses write-ahead logging, so readers can query it during a run.
+
+    Same interface as the streaming exporters; ``flush`` commits the
+    pending batch. Upserts are idempotent, so a resumed run needs no
+    ``resume_offset`` and ``offset`` is the number of records written.
+    """
+
+    def __init__(self, output_path: Union[str, Path], batch_size: int = 500) -> None:
+        self.path = Path(output_path)
+        self.batch_size = max(1, int(batch_size))
+        self.count = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def offset(self) -> int:
+        return self.count
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def write(self, record: Union[CompanyRecord, dict]) -> None:
+        data = as_dict(record)
+        # A later copy of a company in the same batch replaces the earlier one.
+        self._pending.pop(data.get("profileURL"), None)
+        self._pending[data.get("profileURL")] = data
+        self.count += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        if self._conn is None:
+            self._conn = self._connect()
+        records = list(self._pending.values())
+        self._pending = {}
+        now = time.time()
+        companies: List[tuple] = []
+        addresses: List[tuple] = []
+        reviews: List[tuple] = []
+        slices: List[tuple] = []
+        for data in records:
+            url = data.get("profileURL")
+            summary = data.get("summary") or {}
+            rating = data.get("rating") or {}
+            chart_pie = data.get("chartPie") or {}
+            details = {
+                "verification": data.get("verification"),
+                "focus": chart_pie.get("focus"),
+                "reviewInsights": data.get("reviewInsights"),
+            }
+            companies.append(
+                (
+                    url,
+                    summary.get("name"),
+                    summary.get("tagLine"),
+                    summary.get("description"),
+                    summary.get("logo"),
+                    data.get("websiteUrl"),
+                    summary.get("video_url"),
+                    parse_number(rating.get("overallRating") or summary.get("rating")),
+                    parse_integer(rating.get("totalReview") or summary.get("totalReview")),
+                    summary.get("verificationStatus"),
+                    summary.get("minProjectSize"),
+                    summary.get("averageHourlyRate"),
+                    summary.get("employees"),
+                    summary.get("founded"),
+                    _json(summary.get("languages")),
+                    _json(summary.get("timezones")),
+                    _json({k: v for k, v in details.items() if v}),
+                    now,
+                    now,
+                )
+            )
+            for i, address in enumerate(data.get("addresses") or ()):
+                addresses.append(
+                    (
+                        url,
+                        i,
+                        address.get("title"),
+                        address.get("streetAddress"),
+                        address.get("locality"),
+                        address.get("region"),
+                        address.get("country"),
+                        address.get("postalCode"),
+                        address.get("locationEmployees"),
+                        address.get("telephone"),
+                    )
+                )
+            for i, review in enumerate(data.get("reviews") or ()):
+                body = review.get("review") or {}
+                reviewer = review.get("reviewer") or {}
+                project = review.get("project") or {}
+                reviews.append(
+                    (
+                        url,
+                        i,
+                        review.get("name"),
+                        review.get("datePublished"),
+                        _iso_date(review.get("datePublished")),
+                        parse_number(body.get("rating")),
+                        parse_number(body.get("quality")),
+                        parse_number(body.get("schedule")),
+                        parse_number(body.get("cost")),
+                        parse_number(body.get("willingToRefer")),
+                        body.get("review") or body.get("comments"),
+                        reviewer.get("name"),
+                        reviewer.get("title"),
+                        reviewer.get("industry"),
+                        reviewer.get("companySize"),
+                        reviewer.get("location"),
+                        project.get("name"),
+                        project.get("budget"),
+                        project.get("length"),
+                    )
+                )
+            for chart in SLICE_CHARTS:
+                for i, piece in enumerate((chart_pie.get(chart) or {}).get("slices") or ()):
+                    slices.append(
+                        (
+                            url,
+                            chart,
+                            i,
+                            piece.get("name"),
+                            parse_number(piece.get("percent")),
+                            piece.get("url"),
+                        )
+                    )
+
+        keys = [(data.get("profileURL"),) for data in records]
+        with self._conn:
+            self._conn.executemany(_UPSERT_COMPANY, companies)
+            for table in _CHILD_TABLES:
+                self._conn.executemany(f"DELETE FROM {table} WHERE profile_url = ?", keys)
+            self._conn.executemany(
+                "INSERT INTO addresses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", addresses
+            )
+            self._conn.executemany(
+                f"INSERT INTO reviews VALUES ({', '.join(['?'] * 19)})", reviews
+            )
+            self._conn.executemany(
+                "INSERT INTO chart_slices VALUES (?, ?, ?, ?, ?, ?)", slices
+            )
+        logger.debug("Upserted %d companies into %s", len(records), self.path)
+
+    def close(self) -> None:
+        self.flush()
+        if self._conn is None:
+            return
+        self._conn.execute("PRAGMA optimize")
+        self._conn.close()
+        self._conn = None
+        logger.info("Wrote %d records to %s", self.count, self.path)
+
+    def __enter__(self) -> "SqliteExporter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+
+class BloomFilter:
+    """Fixed-memory set membership test for strings.
+
+    Sized up front for ``capacity`` items at a false-positive rate of
+    ``error_rate``: memory stays constant however many items are added (about
+    3.6 MB for a million items at 1e-6), at the cost of occasionally
+    reporting an unseen item as seen. Safe to share between threads.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-6) -> None:
+        capacity = max(1, int(capacity))
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Add ``item``; returns False if it was (probably) already present."""
+        positions = self._positions(item)
+        with self._lock:
+            new = False
+            for p in positions:
+                mask = 1 << (p & 7)
+                if not self._bits[p >> 3] & mask:
+                    self._bits[p >> 3] |= mask
+                    new = True
+            if new:
+                self.count += 1
+            return new
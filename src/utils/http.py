@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Optional
 
 import requests
 
+from utils.retry import (
+    THROTTLE_STATUSES,
+    AimdRateController,
+    RetryPolicy,
+    parse_retry_after,
+)
+
 logger = logging.getLogger(__name__)
 
 def http_get(
@@ -13,14 +21,27 @@ def http_get(
     session: Optional[requests.Session] = None,
     timeout: float = 15.0,
     max_retries: int = 3,
+    retry_policy: Optional[RetryPolicy] = None,
+    rate_controller: Optional[AimdRateController] = None,
 ) -> Optional[str]:
-    """Thin wrapper around requests.get with retries and logging."""
+    """Thin wrapper around requests.get with retries and logging.
+
+    Retries back off according to ``retry_policy`` (honouring Retry-After and
+    giving up early on non-retryable statuses such as 404); a shared
+    ``rate_controller`` paces requests and slows down when throttled.
+    """
     sess = session or requests.Session()
+    policy = retry_policy or RetryPolicy()
     for attempt in range(1, max_retries + 1):
+        if rate_controller is not None:
+            rate_controller.acquire()
+        retry_after = None
         try:
             resp = sess.get(url, timeout=timeout)
             if resp.status_code == 200:
                 logger.debug("Fetched %s (len=%d)", url, len(resp.text))
+                if rate_controller is not None:
+                    rate_controller.on_success()
                 return resp.text
 
             logger.warning(
@@ -30,6 +51,16 @@ def http_get(
                 url,
                 resp.status_code,
             )
+            if not policy.is_retryable(resp.status_code):
+                logger.error(
+                    "Not retrying %s: status %d is not retryable", url, resp.status_code
+                )
+                return None
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if rate_controller is not None and resp.status_code in THROTTLE_STATUSES:
+                rate_controller.on_throttle()
+                if retry_after:
+                    rate_controller.pause(retry_after)
         except requests.RequestException as exc:
             logger.warning(
                 "Attempt %d/%d for %s failed: %s",
@@ -38,5 +69,9 @@ def http_get(
                 url,
                 exc,
             )
+            if rate_controller is not None and isinstance(exc, requests.Timeout):
+                rate_controller.on_throttle()
+        if attempt < max_retries:
+            time.sleep(policy.backoff(attempt, retry_after))
     logger.error("Failed to fetch %s after %d attempts", url, max_retries)
-    return None
\ No newline at end of file
+    return None
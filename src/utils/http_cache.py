@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from utils.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+# Reads whose LRU timestamps are buffered before they are written in one batch.
+_ACCESS_BATCH = 256
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.time()) - self.fetched_at
+
+def cache_key(url: str) -> str:
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+
+class HttpCache:
+    """Persistent response cache stored in ``<directory>/responses.sqlite3``.
+
+    Entries are keyed by normalized URL and keep the compressed body together
+    with its ``ETag`` / ``Last-Modified`` validators. Entries younger than
+    ``ttl`` seconds are served without a request; older ones are revalidated
+    with a conditional GET. When the stored bodies exceed ``max_bytes`` the
+    least recently used entries are evicted. Reads only note their access
+    time in memory; the times are written in batches (and before evicting),
+    so a cache hit costs one SELECT and no commit.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        ttl: float = 24 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = float(ttl)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.directory / "responses.sqlite3"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self._total_bytes = int(row[0])
+        self._accessed: Dict[str, float] = {}
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        key = cache_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, body, etag, last_modified, fetched_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= _ACCESS_BATCH:
+                self._write_accesses()
+                self._conn.commit()
+        stored_url, body, etag, last_modified, fetched_at = row
+        return CachedResponse(
+            stored_url,
+            zlib.decompress(body).decode("utf-8"),
+            etag,
+            last_modified,
+            fetched_at,
+        )
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return entry.age() < self.ttl
+
+    def put(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        key = cache_key(url)
+        blob = zlib.compress(body.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, body, etag, last_modified, fetched_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, blob, etag, last_modified, now, now, len(blob)),
+            )
+            self._accessed.pop(key, None)
+            self._total_bytes += len(blob) - (row[0] if row else 0)
+            if self._total_bytes > self.max_bytes:
+                self._write_accesses()
+                self._evict()
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as just revalidated (the server answered 304)."""
+        now = time.time()
+        key = cache_key(url)
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key),
+            )
+            self._conn.commit()
+
+    def _write_accesses(self) -> None:
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()],
+            )
+            self._accessed = {}
+
+    def flush(self) -> None:
+        """Write out the buffered access times."""
+        with self._lock:
+            self._write_accesses()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Evict down to 90% of the budget so we don't evict on every insert.
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            evicted += 1
+        logger.debug("Evicted %d cached responses (%d bytes kept)", evicted, self._total_bytes)
+
+    def close(self) -> None:
+        with self._lock:
+            self._write_accesses()
+            self._conn.commit()
+            self._conn.close()
+
+def conditional_headers(entry: Optional[CachedResponse]) -> dict:
+    """Request headers that let the server answer 304 for ``entry``."""
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
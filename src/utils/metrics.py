@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds: 0.5 ms doubling up to ~65 s.
+BUCKETS = tuple(0.0005 * 2**i for i in range(18))
+
+class Histogram:
+    """Latency histogram with fixed exponential buckets (Prometheus-style)."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+        return self.max
+
+    def merge(self, counts: List[int], count: int, total: float, maximum: float) -> None:
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.count += count
+        self.total += total
+        self.max = max(self.max, maximum)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 6),
+            "mean_s": round(self.total / self.count, 6) if self.count else 0.0,
+            "p50_s": round(self.quantile(0.5), 6),
+            "p90_s": round(self.quantile(0.9), 6),
+            "p99_s": round(self.quantile(0.99), 6),
+            "max_s": round(self.max, 6),
+        }
+
+class Metrics:
+    """Process-wide stage latencies and counters for one scrape run.
+
+    Recording is a lock, a bisect and a few additions, so it can sit on the
+    hot path. Parse worker processes ``drain`` their own registry after each
+    chunk and the parent ``merge``s the snapshot, so the run summary covers
+    every process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms: Dict[str, Histogram] = {}
+            self.counters: Dict[str, float] = {}
+            self.started = time.time()
+            self._started_monotonic = time.monotonic()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def drain(self) -> Dict[str, Any]:
+        """Return everything recorded so far and start again from zero."""
+        with self._lock:
+            snapshot = {
+                "histograms": {
+                    name: (h.counts, h.count, h.total, h.max)
+                    for name, h in self.histograms.items()
+                },
+                "counters": self.counters,
+            }
+            self.histograms = {}
+            self.counters = {}
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        with self._lock:
+            for name, values in snapshot["histograms"].items():
+                self.histograms.setdefault(name, Histogram()).merge(*values)
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self, **extra: Any) -> Dict[str, Any]:
+        """JSON-ready run report; ``extra`` fields (e.g. record counts) are included."""
+        with self._lock:
+            elapsed = time.monotonic() - self._started_monotonic
+            counters = dict(sorted(self.counters.items()))
+            stages = {name: h.summary() for name, h in sorted(self.histograms.items())}
+        records = extra.get("records", 0)
+        status_codes = {
+            name.split(":", 1)[1]: value
+            for name, value in counters.items()
+            if name.startswith("http_status:")
+        }
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+            "elapsed_s": round(elapsed, 3),
+            **extra,
+            "pages_per_sec": round(records / elapsed, 3) if elapsed else 0.0,
+            "bytes_downloaded": counters.get("bytes_downloaded", 0),
+            "http_requests": counters.get("http_requests", 0),
+            "retries": counters.get("retries", 0),
+            "status_codes": status_codes,
+            "stages": stages,
+            "counters": {k: v for k, v in counters.items() if not k.startswith("http_status:")},
+        }
+
+    def prometheus_text(self) -> str:
+        """The current metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+            elapsed = time.monotonic() - self._started_monotonic
+        lines.append("# TYPE clutch_stage_seconds histogram")
+        for stage, h in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS, h.counts):
+                cumulative += count
+                lines.append(
+                    f'clutch_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}'
+                )
+            lines.append(f'clutch_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'clutch_stage_seconds_sum{{stage="{stage}"}} {h.total:.6f}')
+            lines.append(f'clutch_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        lines.append("# TYPE clutch_http_responses_total counter")
+        for name, value in sorted(counters.items()):
+            if name.startswith("http_status:"):
+                code = name.split(":", 1)[1]
+                lines.append(f'clutch_http_responses_total{{code="{code}"}} {value:g}')
+        for name, value in sorted(counters.items()):
+            if not name.startswith("http_status:"):
+                lines.append(f"# TYPE clutch_{name}_total counter")
+                lines.append(f"clutch_{name}_total {value:g}")
+        lines.append("# TYPE clutch_run_seconds gauge")
+        lines.append(f"clutch_run_seconds {elapsed:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_summary(self, path: Union[str, Path], **extra: Any) -> Dict[str, Any]:
+        summary = self.summary(**extra)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        logger.info("Wrote run metrics to %s", path)
+        return summary
+
+    def write_prometheus(self, path: Union[str, Path]) -> None:
+        """Atomically replace ``path`` with the current metrics (node_exporter textfile)."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.prometheus_text(), encoding="utf-8")
+        tmp.replace(path)
+
+# The registry every stage records into.
+run_metrics = Metrics()
+
+def summary_path_for(output_path: Union[str, Path]) -> Path:
+    """The run summary that lives next to ``output_path``."""
+    path = Path(output_path)
+    return path.with_name(path.name + ".metrics.json")
+
+class MetricsPublisher:
+    """Publishes ``metrics`` for long runs while they are in progress.
+
+    ``textfile`` is rewritten every ``interval`` seconds for a node_exporter
+    textfile collector; ``port`` serves ``/metrics`` over HTTP for Prometheus
+    to scrape directly, on ``host`` (loopback unless set otherwise). Either
+    may be None.
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        textfile: Optional[Union[str, Path]] = None,
+        port: Optional[int] = None,
+        interval: float = 15.0,
+        host: str = "127.0.0.1",
+    ) -> None:
+        self.metrics = metrics
+        self.textfile = Path(textfile) if textfile else None
+        self.interval = interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        if port is not None:
+            self._server = ThreadingHTTPServer((host, port), self._handler())
+            self._server.daemon_threads = True
+
+    def _handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def _write_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.metrics.write_prometheus(self.textfile)
+
+    def start(self) -> "MetricsPublisher":
+        if self.textfile is not None:
+            self._threads.append(
+                threading.Thread(target=self._write_loop, name="metrics-textfile", daemon=True)
+            )
+        if self._server is not None:
+            self._threads.append(
+                threading.Thread(
+                    target=self._server.serve_forever, name="metrics-http", daemon=True
+                )
+            )
+            logger.info("Serving metrics on port %d", self._server.server_address[1])
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self.textfile is not None:
+            self.metrics.write_prometheus(self.textfile)
+
+    def __enter__(self) -> "MetricsPublisher":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
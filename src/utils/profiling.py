@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import cProfile
+import heapq
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "sample")
+
+# Leaf frames of threads that are blocked, not working; the sampler skips them.
+_IDLE_FRAMES = frozenset({("threading.py", "wait"), ("selectors.py", "select")})
+
+# From 3.12 cProfile sits on sys.monitoring: one profiler sees every thread,
+# and enabling a second one (e.g. per thread) raises ValueError.
+_ONE_PROFILER_FOR_ALL_THREADS = sys.version_info >= (3, 12)
+
+def profile_path_for(output_path: Union[str, Path]) -> Path:
+    """The profiling report that lives next to ``output_path``."""
+    path = Path(output_path)
+    return path.with_name(path.name + ".profile.txt")
+
+class SlowUrls:
+    """Keeps the ``limit`` URLs that took longest to fetch and parse."""
+
+    def __init__(self, limit: int = 20) -> None:
+        self.limit = limit
+        self._heap: List[Tuple[float, int, Tuple[Any, ...]]] = []
+        self._seq = 0
+
+    def add(
+        self,
+        url: str,
+        fetch_seconds: float,
+        parse_seconds: float,
+        html_size: int,
+        reviews: Optional[int],
+    ) -> None:
+        total = fetch_seconds + parse_seconds
+        entry = (total, self._seq, (url, fetch_seconds, parse_seconds, html_size, reviews))
+        self._seq += 1
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif total > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def report(self) -> str:
+        lines = [
+            f"{'total s':>9} {'fetch s':>9} {'parse s':>9} {'html chars':>11} {'reviews':>8}  url"
+        ]
+        for total, _, (url, fetch_s, parse_s, size, reviews) in sorted(self._heap, reverse=True):
+            lines.append(
+                f"{total:9.3f} {fetch_s:9.3f} {parse_s:9.3f} {size:11d} "
+                f"{'-' if reviews is None else reviews:>8}  {url}"
+            )
+        return "\n".join(lines)
+
+class _StackSampler:
+    """Low-overhead sampling profiler covering every thread.
+
+    Every ``interval`` seconds the current stack of each busy thread is
+    recorded; a function's share of samples approximates its share of the
+    time threads spent working. Threads blocked on a lock or socket select
+    are left out.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples = 0
+        self.own: Counter = Counter()
+        self.cumulative: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                leaf_code = frame.f_code
+                if (Path(leaf_code.co_filename).name, leaf_code.co_name) in _IDLE_FRAMES:
+                    continue
+                self.samples += 1
+                seen = set()
+                leaf = True
+                while frame is not None:
+                    code = frame.f_code
+                    key = f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+                    if leaf:
+                        self.own[key] += 1
+                        leaf = False
+                    if key not in seen:
+                        seen.add(key)
+                        self.cumulative[key] += 1
+                    frame = frame.f_back
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def report(self, top: int) -> str:
+        lines = [f"{self.samples} busy samples every {self.interval * 1000:.0f} ms across all threads"]
+        for title, counter in (("cumulative", self.cumulative), ("own (leaf)", self.own)):
+            lines.append(f"\nTop functions by {title} samples:")
+            for key, count in counter.most_common(top):
+                lines.append(f"{count:8d} {100.0 * count / max(1, self.samples):6.1f}%  {key}")
+        return "\n".join(lines)
+
+class Profiler:
+    """Profiles a scrape run and writes a plain-text hot-spot report.
+
+    ``mode`` "cpu" runs cProfile over every thread (deterministic, higher
+    overhead; raw stats are also saved as ``<report>.pstats`` for snakeviz
+    and friends), "sample" uses a stack sampler, and None profiles no CPU.
+    ``memory`` adds tracemalloc's top allocation sites and peak usage.
+    Pages parsed in ``--parse-workers`` processes are not covered.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = "cpu",
+        memory: bool = False,
+        top: int = 30,
+        slow_urls: int = 20,
+    ) -> None:
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}; expected one of {PROFILE_MODES}")
+        self.mode = mode
+        self.memory = memory
+        self.top = top
+        self.slow_urls = SlowUrls(slow_urls)
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._thread_start: Optional[Any] = None
+        self._threads_running = 0
+        self._sampler: Optional[_StackSampler] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._peak = 0
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def _profile_threads(self) -> None:
+        # Before 3.12 a cProfile instance only sees the thread that enabled
+        # it, so each thread started while profiling runs under its own,
+        # which the thread itself disables when it finishes. Profiles of
+        # threads still running at ``stop`` are left out of the report.
+        original_start = self._thread_start = threading.Thread.start
+        profiler = self
+
+        def start(thread: threading.Thread, *args: Any, **kwargs: Any) -> None:
+            run = thread.run
+
+            def profiled_run() -> None:
+                profile = cProfile.Profile()
+                with profiler._lock:
+                    profiler._threads_running += 1
+                profile.enable()
+                try:
+                    run()
+                finally:
+                    profile.disable()
+                    with profiler._lock:
+                        profiler._threads_running -= 1
+                        profiler._profiles.append(profile)
+
+            thread.run = profiled_run  # type: ignore[method-assign]
+            original_start(thread, *args, **kwargs)
+
+        threading.Thread.start = start  # type: ignore[method-assign]
+
+    def start(self) -> "Profiler":
+        self._started = time.perf_counter()
+        if self.memory:
+            tracemalloc.start(10)
+        if self.mode == "cpu":
+            if not _ONE_PROFILER_FOR_ALL_THREADS:
+                self._profile_threads()
+            profile = cProfile.Profile()
+            self._profiles.append(profile)
+            profile.enable()
+        elif self.mode == "sample":
+            self._sampler = _StackSampler()
+            self._sampler.start()
+        return self
+
+    def stop(self) -> None:
+        self._elapsed = time.perf_counter() - self._started
+        if self.mode == "cpu":
+            # The calling thread's profile (every thread's, from 3.12) comes
+            # first; the others were disabled by their own threads.
+            self._profiles[0].disable()
+            if self._thread_start is not None:
+                threading.Thread.start = self._thread_start  # type: ignore[method-assign]
+                self._thread_start = None
+            with self._lock:
+                if self._threads_running:
+                    logger.info(
+                        "%d profiled threads still running are left out of the CPU report",
+                        self._threads_running,
+                    )
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self.memory:
+            self._snapshot = tracemalloc.take_snapshot()
+            self._peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def _cpu_report(self, path: Path) -> str:
+        stats = None
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.create_stats()
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+        if stats is None:
+            return "(no profile data)"
+        stats.dump_stats(str(path.with_suffix(".pstats")))
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(self.top)
+        out.write("\n")
+        stats.sort_stats("tottime").print_stats(self.top)
+        return out.getvalue()
+
+    def _memory_report(self) -> str:
+        lines = [f"Peak traced memory: {self._peak / 1024 / 1024:.1f} MiB", ""]
+        for stat in self._snapshot.statistics("lineno")[: self.top]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  "
+                f"{frame.filename}:{frame.lineno}"
+            )
+        return "\n".join(lines)
+
+    def write_report(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sections = [f"Profiled run: {self._elapsed:.2f}s wall time"]
+        if self.mode == "cpu":
+            sections.append("== CPU (cProfile, all threads) ==\n" + self._cpu_report(path))
+        elif self._sampler is not None:
+            sections.append("== CPU (sampled) ==\n" + self._sampler.report(self.top))
+        if self._snapshot is not None:
+            sections.append("== Memory (tracemalloc) ==\n" + self._memory_report())
+        sections.append(f"== Slowest {self.slow_urls.limit} URLs ==\n" + self.slow_urls.report())
+        path.write_text("\n\n".join(sections) + "\n", encoding="utf-8")
+        logger.info("Wrote profiling report to %s", path)
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
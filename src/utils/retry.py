@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+# Worth another attempt: timeouts, throttling and transient server errors.
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Signals that the site wants us to slow down.
+THROTTLE_STATUSES = frozenset({429, 503})
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+@dataclass
+class RetryPolicy:
+    """Which failures to retry and how long to wait before the next attempt.
+
+    Delays grow exponentially from ``backoff_base`` up to ``backoff_max``,
+    with up to ``jitter`` of each delay randomized away so workers that
+    failed together do not retry together. A server-provided ``Retry-After``
+    takes precedence (capped at ``retry_after_max``).
+    """
+
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    jitter: float = 0.5
+    retry_after_max: float = 300.0
+    retry_statuses: FrozenSet[int] = field(default=RETRYABLE_STATUSES)
+
+    def is_retryable(self, status: int) -> bool:
+        return status in self.retry_statuses
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.retry_after_max)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return delay * (1.0 - self.jitter * random.random())
+
+class AimdRateController:
+    """Shared request-rate limiter that adapts to how the site responds.
+
+    Every request first calls ``acquire`` (or ``acquire_async``), which
+    spaces requests to the current rate across all workers. Successes raise
+    the rate additively (about ``increase`` requests/sec per second of
+    clean traffic); throttling responses and timeouts cut it by
+    ``decrease_factor``, at most once per ``cooldown`` seconds so a burst of
+    in-flight failures counts once. ``pause`` holds every worker back, e.g.
+    for a ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 4.0,
+        min_rate: float = 0.5,
+        max_rate: float = 20.0,
+        increase: float = 0.5,
+        decrease_factor: float = 0.5,
+        cooldown: float = 2.0,
+    ) -> None:
+        self.rate = float(initial_rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.increase = float(increase)
+        self.decrease_factor = float(decrease_factor)
+        self.cooldown = float(cooldown)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._last_decrease = 0.0
+
+    def _reserve(self) -> float:
+        """Claim the next request slot; returns how long the caller must wait."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+            return slot - now
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            rate = self.rate
+        logger.info("Throttled by server; lowering request rate to %.2f/s", rate)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a visitor came from.
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = frozenset({"gclid", "fbclid"})
+# A Clutch company profile: /profile/<slug>, optionally followed by a sub-page.
+_PROFILE_PATH_RE = re.compile(r"^/profile/([^/]+)")
+
+def normalize_url(url: str) -> str:
+    """Canonical form of ``url`` for use as a cache or de-duplication key.
+
+    Lowercases scheme and host, drops default ports, fragments, tracking
+    parameters and trailing slashes, and sorts the remaining query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (
+        (scheme == "http" and parts.port == 80)
+        or (scheme == "https" and parts.port == 443)
+    ):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in _TRACKING_PARAMS
+        and not key.lower().startswith(_TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def profile_key(url: str) -> str:
+    """Canonical URL of the Clutch profile ``url`` points to.
+
+    Profile URLs lose their query string and any sub-path (``/profile/acme/``,
+    ``/profile/acme?utm=x`` and ``/profile/acme#reviews`` all become
+    ``https://clutch.co/profile/acme``); other URLs are ``normalize_url``-ed.
+    """
+    normalized = normalize_url(url)
+    parts = urlsplit(normalized)
+    match = _PROFILE_PATH_RE.match(parts.path)
+    if match is None:
+        return normalized
+    return urlunsplit((parts.scheme, parts.netloc, match.group(0), "", ""))
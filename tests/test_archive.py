@@ -0,0 +1,71 @@
+import json
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from main import process_html, reparse
+from pipelines.archive import (
+    PROFILE,
+    REVIEW_PAGE,
+    ArchiveReader,
+    PageArchive,
+    index_path_for,
+)
+from pipelines.review_pages import ReviewHarvester
+from test_review_pages import PAGES, URL
+
+def _record_run(path):
+    with PageArchive(path) as archive:
+        harvester = ReviewHarvester(
+            archive.recording(PAGES.get, PROFILE),
+            max_pages=10,
+            page_fetch=archive.recording(PAGES.get, REVIEW_PAGE),
+        )
+        try:
+            return harvester.fetch(URL)
+        finally:
+            harvester.close()
+
+def test_archived_pages_are_read_back_by_url(tmp_path):
+    path = tmp_path / "pages.warc.gz"
+    _record_run(path)
+
+    with ArchiveReader([path]) as reader:
+        assert reader.profile_urls() == [URL]
+        assert reader.review_pages == 2
+        assert reader.get(URL + "/") == PAGES[URL]
+        assert reader.get(URL + "?page=2") == PAGES[URL + "?page=2"]
+        assert reader.get("https://clutch.co/profile/missing") is None
+
+def test_archive_without_a_usable_index_is_scanned(tmp_path):
+    path = tmp_path / "pages.warc.gz"
+    _record_run(path)
+    index = index_path_for(path)
+    lines = index.read_text(encoding="utf-8").splitlines()
+    index.write_text("\n".join(lines[:-1]) + "\n" + lines[-1][:10], encoding="utf-8")
+
+    with ArchiveReader([path]) as reader:
+        assert reader.profile_urls() == [URL]
+        assert reader.get(URL + "?page=1") == PAGES[URL + "?page=1"]
+
+    index.unlink()
+    with path.open("ab") as f:
+        f.write(b"\x1f\x8b\x08")  # a record cut short when the run died
+    with ArchiveReader([path]) as reader:
+        assert reader.get(URL + "?page=2") == PAGES[URL + "?page=2"]
+
+def test_reparse_matches_the_live_run(tmp_path):
+    path = tmp_path / "pages.warc.gz"
+    live = process_html(_record_run(path), URL).to_dict()
+
+    output = tmp_path / "out.jsonl"
+    # Review pages are merged only when asked for, as in a live run.
+    reparse([path], output, None, None, parse_workers=0, max_review_pages=10)
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert records == [live]
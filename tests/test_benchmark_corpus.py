@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+# Ensure src/ and benchmarks/ are importable
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT / "src", ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from corpus import profile_page
+from main import process_html
+from parsers.reviews_parser import review_page_urls
+
+def test_synthetic_pages_parse_like_real_profiles():
+    html = profile_page("acme-labs", reviews=7, filler_kib=10, review_pages=3)
+    record = process_html(html, "https://clutch.co/profile/acme-labs").to_dict()
+
+    assert record["summary"]["name"] == "Acme Labs"
+    assert record["summary"]["tagLine"]
+    assert record["summary"]["founded"]
+    assert record["addresses"][0]["postalCode"]
+    assert record["websiteUrl"] == "https://www.acme-labs.example"
+    assert len(record["reviews"]) == 7
+    assert len(html) > 10 * 1024
+    assert len(review_page_urls(html, "https://clutch.co/profile/acme-labs", 10)) == 2
+    assert html == profile_page("acme-labs", reviews=7, filler_kib=10, review_pages=3)
@@ -0,0 +1,81 @@
+import json
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from pipelines.changefeed import ChangeFeed
+
+def _company(i, reviews, rating="4.8"):
+    return {
+        "profileURL": f"https://clutch.co/profile/company-{i}",
+        "summary": {"name": f"Company {i}", "rating": rating},
+        "reviews": [
+            {"name": name, "datePublished": "Jan 5, 2024", "review": {"review": text}}
+            for name, text in reviews
+        ],
+    }
+
+def _run(tmp_path, records, failed=()):
+    events = tmp_path / "changes.jsonl"
+    with ChangeFeed(tmp_path / "state.db", events) as feed:
+        for record in records:
+            feed.observe(record)
+        for url in failed:
+            feed.seen(url)
+        feed.finish()
+    return [json.loads(line) for line in events.read_text(encoding="utf-8").splitlines()]
+
+def _summary(events):
+    return sorted((e["event"], e["entity"], e["profileURL"][-1]) for e in events)
+
+def test_first_run_adds_everything_and_an_unchanged_run_emits_nothing(tmp_path):
+    records = [_company(1, [("A", "good")]), _company(2, [])]
+
+    events = _run(tmp_path, records)
+    assert _summary(events) == [("added", "company", "1"), ("added", "company", "2")]
+    assert events[0]["data"]["reviews"][0]["name"] == "A"
+    assert events[0]["run"] == 1
+
+    assert _run(tmp_path, records) == []
+
+def test_changes_since_the_previous_run(tmp_path):
+    _run(tmp_path, [
+        _company(1, [("A", "good"), ("B", "fine"), ("C", "meh")]),
+        _company(2, []),
+        _company(3, []),
+        _company(4, []),
+    ])
+
+    events = _run(
+        tmp_path,
+        [
+            # A edited, B unchanged, C gone, D new.
+            _company(1, [("A", "great"), ("B", "fine"), ("D", "new")]),
+            _company(2, [], rating="4.9"),
+        ],
+        # Company 3 failed to scrape: kept, not removed. Company 4 is gone.
+        failed=["https://clutch.co/profile/company-3"],
+    )
+
+    assert _summary(events) == [
+        ("added", "review", "1"),
+        ("changed", "company", "2"),
+        ("changed", "review", "1"),
+        ("removed", "company", "4"),
+        ("removed", "review", "1"),
+    ]
+    changed = next(e for e in events if e["entity"] == "review" and e["event"] == "changed")
+    assert changed["data"]["review"]["review"] == "great"
+    assert all(e["run"] == 2 for e in events)
+
+    events = _run(
+        tmp_path,
+        [_company(1, [("A", "great")])],
+        failed=["https://clutch.co/profile/company-2", "https://clutch.co/profile/company-3"],
+    )
+    assert _summary(events) == [("removed", "review", "1")] * 2
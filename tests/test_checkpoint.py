@@ -0,0 +1,58 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from pipelines.checkpoint import ProgressJournal, journal_path_for
+from pipelines.exporters import open_exporter
+
+URLS = [f"https://clutch.co/profile/{i}" for i in range(5)]
+
+@pytest.mark.parametrize("name", ["out.json", "out.jsonl"])
+def test_resume_after_crash_drops_partial_record_and_appends(tmp_path, name):
+    out = tmp_path / name
+    journal = ProgressJournal(journal_path_for(out), batch_size=1).open(append=False)
+    exporter = open_exporter(out)
+    for url in URLS[:2]:
+        exporter.write({"profileURL": url})
+        journal.record(url, ok=True, offset=exporter.offset)
+    journal.record(URLS[2], ok=False)
+    journal.close()
+    # Simulate dying mid-write: bytes past the last journaled offset.
+    exporter.write({"profileURL": URLS[3], "partial": True})
+    exporter._file.write(b',\n  {"torn')
+    exporter._file.close()
+
+    journal = ProgressJournal(journal_path_for(out))
+    state = journal.load()
+    pending = list(state.pending(URLS, max_attempts=3))
+    assert pending == URLS[2:]
+
+    with open_exporter(out, resume_offset=state.offset) as exporter, journal.open(append=True):
+        for url in pending:
+            exporter.write({"profileURL": url})
+            journal.record(url, ok=True, offset=exporter.offset)
+
+    text = out.read_text(encoding="utf-8")
+    records = json.loads(text) if name.endswith(".json") else [
+        json.loads(line) for line in text.splitlines()
+    ]
+    assert [r["profileURL"] for r in records] == URLS
+    assert not list(journal.load().pending(URLS, max_attempts=3))
+
+def test_failed_urls_stop_retrying_after_max_attempts(tmp_path):
+    journal = ProgressJournal(tmp_path / "j.jsonl").open(append=False)
+    for _ in range(2):
+        journal.record(URLS[0], ok=False)
+    journal.close()
+
+    state = journal.load()
+    assert state.should_process(URLS[0], max_attempts=3)
+    assert not state.should_process(URLS[0], max_attempts=2)
@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from pipelines.crawler import crawl_profile_urls
+from utils.bloom import BloomFilter
+
+LISTING = "https://clutch.co/web-developers"
+
+def _listing(page, profiles, last_page=2):
+    links = "".join(
+        f'<a href="/profile/{p}">{p}</a><a href="https://clutch.co/profile/{p}#reviews">reviews</a>'
+        for p in profiles
+    )
+    pager = "".join(f'<a href="/web-developers?page={n}">{n + 1}</a>' for n in range(1, last_page + 1))
+    return f"<html><body>{links}{pager}</body></html>"
+
+SITE = {
+    LISTING: _listing(0, ["acme", "globex"]),
+    LISTING + "?page=1": _listing(1, ["initech", "acme"]),
+    LISTING + "?page=2": _listing(2, ["umbrella"]),
+}
+
+def test_crawl_walks_pagination_and_suppresses_duplicates():
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return SITE.get(url)
+
+    urls = list(crawl_profile_urls([LISTING, LISTING + "/"], fetch, workers=3))
+
+    assert sorted(urls) == [
+        f"https://clutch.co/profile/{p}" for p in ("acme", "globex", "initech", "umbrella")
+    ]
+    assert sorted(fetched) == sorted(SITE)
+
+def test_crawl_respects_page_and_depth_limits():
+    assert len(list(crawl_profile_urls([LISTING], SITE.get, max_depth=0))) == 2
+    assert len(list(crawl_profile_urls([LISTING], SITE.get, max_pages=2, workers=1))) == 3
+
+def test_crawl_raises_a_worker_error_instead_of_hanging():
+    def fetch(url):
+        if url.endswith("page=2"):
+            return b"<html></html>"  # not text: parsing the page fails
+        return SITE.get(url)
+
+    with pytest.raises(TypeError):
+        list(crawl_profile_urls([LISTING], fetch, workers=1))
+
+def test_bloom_filter_tracks_membership_in_fixed_memory():
+    bloom = BloomFilter(capacity=1000, error_rate=1e-4)
+    size = len(bloom._bits)
+
+    assert bloom.add("https://clutch.co/profile/acme")
+    assert not bloom.add("https://clutch.co/profile/acme")
+    for i in range(1000):
+        bloom.add(f"https://clutch.co/profile/{i}")
+    assert "https://clutch.co/profile/999" in bloom
+    assert sum(f"https://clutch.co/other/{i}" in bloom for i in range(1000)) <= 2
+    assert len(bloom._bits) == size
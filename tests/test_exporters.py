@@ -0,0 +1,89 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from pipelines.exporters import export_to_json, open_exporter
+
+RECORDS = [
+    {"profileURL": "https://clutch.co/profile/a", "summary": {"name": "Ä", "languages": []}},
+    {"profileURL": "https://clutch.co/profile/b", "reviews": [{"review": {"rating": 5}}]},
+]
+
+def test_streamed_json_array_matches_json_dump(tmp_path):
+    out = tmp_path / "out.json"
+    with open_exporter(out) as exporter:
+        for record in RECORDS:
+            exporter.write(record)
+
+    expected = json.dumps(RECORDS, indent=2, ensure_ascii=False)
+    assert out.read_text(encoding="utf-8") == expected
+
+def test_jsonl_gzip_flushes_each_record(tmp_path):
+    out = tmp_path / "out.jsonl.gz"
+    exporter = open_exporter(out)
+    exporter.write(RECORDS[0])
+    # Readable before close: every record is flushed as it is written.
+    with gzip.open(out, "rt", encoding="utf-8") as f:
+        assert json.loads(f.readline()) == RECORDS[0]
+    exporter.write(RECORDS[1])
+    exporter.close()
+
+    with gzip.open(out, "rt", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == RECORDS
+
+def test_export_to_json_writes_empty_array(tmp_path):
+    out = tmp_path / "empty.json"
+    export_to_json([], out)
+    assert json.loads(out.read_text(encoding="utf-8")) == []
+
+def test_sqlite_upserts_companies_and_replaces_their_rows(tmp_path):
+    import sqlite3
+
+    out = tmp_path / "clutch.db"
+    first = json.loads((ROOT / "data" / "sample_output.json").read_text(encoding="utf-8"))[0]
+    first["reviews"] = [
+        {"datePublished": "Feb. 24, 2023", "review": {"rating": 4.5}, "reviewer": {"name": "A"}},
+        {"datePublished": "2024-01-05", "review": {"rating": 5}, "reviewer": {}},
+    ]
+    with open_exporter(out, sqlite_batch_size=1) as exporter:
+        for record in [first] + RECORDS:
+            exporter.write(record)
+
+    rescraped = dict(first, reviews=first["reviews"][:1])
+    rescraped["summary"] = dict(first["summary"], rating="4.8")
+    with open_exporter(out) as exporter:
+        exporter.write(rescraped)
+
+    conn = sqlite3.connect(out)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        url = first["profileURL"]
+        assert conn.execute("SELECT COUNT(*) FROM companies").fetchone() == (3,)
+        assert conn.execute(
+            "SELECT name, total_reviews FROM companies WHERE profile_url = ?", (url,)
+        ).fetchone() == ("BairesDev", 59)
+        assert conn.execute(
+            "SELECT review_date, rating, reviewer_name FROM reviews WHERE profile_url = ?",
+            (url,),
+        ).fetchall() == [("2023-02-24", 4.5, "A")]
+        assert conn.execute(
+            "SELECT c.name FROM companies c JOIN addresses a USING (profile_url) "
+            "WHERE a.country = 'US'"
+        ).fetchall() == [("BairesDev",)]
+        assert conn.execute(
+            "SELECT name, percent FROM chart_slices WHERE chart = 'service_provided' "
+            "ORDER BY position"
+        ).fetchall() == [("Custom Software Development", 0.3), ("Web Development", 0.2)]
+        indexes = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        assert {"companies_rating", "addresses_country", "reviews_date"} <= indexes
+    finally:
+        conn.close()
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from pipelines.fingerprints import FingerprintStore
+
+PAGE = """<html><head>
+<meta name="csrf-token" content="{token}">
+<script nonce="{token}" src="/app.js?v={build}"></script>
+</head><body data-rendered="{ts}"><h1>{name}</h1></body></html>"""
+
+def test_volatile_tokens_do_not_change_fingerprint(tmp_path):
+    store = FingerprintStore(tmp_path / "fp.sqlite3")
+    url = "https://clutch.co/profile/acme"
+    first = PAGE.format(token="abc", build="1.2.3", ts="2024-05-01T10:00:00Z", name="Acme")
+    again = PAGE.format(token="xyz", build="1.2.4", ts="2024-05-02T11:30:00Z", name="Acme")
+    changed = PAGE.format(token="xyz", build="1.2.4", ts="2024-05-02T11:30:00Z", name="Acme Inc")
+
+    assert store.lookup(url, first) is None
+    store.store(url, first, {"summary": {"name": "Acme"}})
+
+    assert store.lookup(url + "/", again) == {"summary": {"name": "Acme"}}
+    assert store.lookup(url, changed) is None
+    assert (store.hits, store.misses) == (1, 2)
+
+def test_salt_invalidates_stored_records(tmp_path):
+    url = "https://clutch.co/profile/acme"
+    store = FingerprintStore(tmp_path / "fp.sqlite3", salt="v1")
+    store.store(url, "<html></html>", {"ok": True})
+    store.close()
+
+    assert FingerprintStore(tmp_path / "fp.sqlite3", salt="v2").lookup(url, "<html></html>") is None
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from clutch_client import ClutchClient
+from utils.http_cache import HttpCache
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers or {}
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, timeout=None, headers=None):
+        self.requests.append((url, dict(headers or {})))
+        return self.responses.pop(0)
+
+def test_cache_serves_fresh_entries_and_revalidates_stale_ones(tmp_path):
+    cache = HttpCache(tmp_path, ttl=3600)
+    client = ClutchClient(cache=cache)
+    client.session = FakeSession(
+        [
+            FakeResponse(200, "<html>v1</html>", {"ETag": '"abc"'}),
+            FakeResponse(304),
+        ]
+    )
+
+    assert client.fetch_profile("https://clutch.co/profile/x") == "<html>v1</html>"
+    # Same profile under a different spelling, still within the TTL: no request.
+    assert client.fetch_profile("https://clutch.co/profile/x/?utm_source=y") == "<html>v1</html>"
+    assert len(client.session.requests) == 1
+
+    cache.ttl = 0
+    assert client.fetch_profile("https://clutch.co/profile/x") == "<html>v1</html>"
+    assert client.session.requests[-1][1]["If-None-Match"] == '"abc"'
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = HttpCache(tmp_path, max_bytes=500)
+    body = "".join(chr(0x4E00 + (i * 7919) % 20000) for i in range(80))
+    cache.put("https://clutch.co/profile/a", body + "a")
+    cache.put("https://clutch.co/profile/b", body + "b")
+    cache.get("https://clutch.co/profile/a")
+    cache.put("https://clutch.co/profile/c", body + "c")
+
+    assert cache.get("https://clutch.co/profile/b") is None
+    assert cache.get("https://clutch.co/profile/a") is not None
+    assert cache.get("https://clutch.co/profile/c") is not None
+
+def test_reads_buffer_access_times_until_flushed(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.put("https://clutch.co/profile/a", "a")
+    cache._conn.execute("UPDATE responses SET accessed_at = 0")
+    cache._conn.commit()
+
+    assert cache.get("https://clutch.co/profile/a").body == "a"
+    assert cache._conn.execute("SELECT accessed_at FROM responses").fetchone()[0] == 0
+    cache.close()
+
+    reopened = HttpCache(tmp_path)
+    assert reopened._conn.execute("SELECT accessed_at FROM responses").fetchone()[0] > 0
+    reopened.close()
@@ -0,0 +1,70 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import pipelines.inputs as inputs
+from pipelines.inputs import dedupe_urls, iter_input_urls
+from utils.urls import profile_key
+
+URLS = [
+    "https://clutch.co/profile/x",
+    "https://clutch.co/profile/x/",
+    "https://clutch.co/profile/x?utm=newsletter",
+    "HTTPS://Clutch.co/profile/y#reviews",
+]
+
+def test_profile_key_collapses_variants_of_a_profile():
+    assert {profile_key(u) for u in URLS} == {
+        "https://clutch.co/profile/x",
+        "https://clutch.co/profile/y",
+    }
+    assert profile_key("https://clutch.co/web-developers?page=2") == (
+        "https://clutch.co/web-developers?page=2"
+    )
+
+@pytest.mark.parametrize(
+    "name, content",
+    [
+        ("urls.json", json.dumps({"meta": {"n": [1, 2]}, "profile_urls": URLS})),
+        ("urls.json", json.dumps(URLS, indent=2)),
+        ("urls.json", json.dumps({"urls": ["https://clutch.co/profile/z"], "profile_urls": URLS})),
+        ("urls.json", json.dumps({"urls": URLS, "meta": {}})),
+        ("in1", "\n " + json.dumps(URLS)),
+        ("in2", "\n".join(URLS)),
+        ("urls.jsonl", "\n".join(json.dumps({"url": u}) for u in URLS) + "\n"),
+        ("urls.txt", "# profiles\n" + "\n".join(URLS) + "\n\n"),
+        ("urls.txt.gz", "\n".join(URLS)),
+    ],
+)
+def test_inputs_stream_every_format(tmp_path, monkeypatch, name, content):
+    # Tiny chunks exercise values split across reads.
+    monkeypatch.setattr(inputs, "_CHUNK_SIZE", 7)
+    path = tmp_path / name
+    if name.endswith(".gz"):
+        path.write_bytes(gzip.compress(content.encode("utf-8")))
+    else:
+        path.write_text(content, encoding="utf-8")
+
+    assert list(iter_input_urls(path)) == URLS
+    assert list(dedupe_urls(iter_input_urls(path), expected=100)) == [
+        "https://clutch.co/profile/x",
+        "https://clutch.co/profile/y",
+    ]
+
+def test_unsupported_json_input_is_rejected(tmp_path):
+    path = tmp_path / "urls.json"
+    path.write_text('{"other": []}', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_input_urls(path))
+    with pytest.raises(FileNotFoundError):
+        iter_input_urls(tmp_path / "missing.json")
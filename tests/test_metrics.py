@@ -0,0 +1,50 @@
+import json
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from utils.metrics import Histogram, Metrics, MetricsPublisher
+
+def test_histogram_quantiles_fall_in_the_right_bucket():
+    histogram = Histogram()
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000)
+
+    assert histogram.count == 100
+    assert 0.032 <= histogram.quantile(0.5) <= 0.064
+    assert histogram.quantile(0.99) <= histogram.max == 0.1
+
+def test_worker_snapshots_merge_into_the_run_summary(tmp_path):
+    parent, worker = Metrics(), Metrics()
+    parent.observe("fetch", 0.2)
+    parent.inc("http_status:200", 2)
+    parent.inc("http_status:503")
+    parent.inc("bytes_downloaded", 2048)
+    worker.observe("parse_profile", 0.01)
+    worker.observe("parse_profile", 0.03)
+
+    parent.merge(worker.drain())
+    summary = parent.write_summary(tmp_path / "run.metrics.json", records=2)
+
+    assert worker.histograms == {}
+    assert summary["stages"]["parse_profile"]["count"] == 2
+    assert summary["status_codes"] == {"200": 2, "503": 1}
+    assert summary["bytes_downloaded"] == 2048
+    assert json.loads((tmp_path / "run.metrics.json").read_text()) == summary
+
+    text = parent.prometheus_text()
+    assert 'clutch_stage_seconds_count{stage="parse_profile"} 2' in text
+    assert 'clutch_http_responses_total{code="503"} 1' in text
+    assert "clutch_bytes_downloaded_total 2048" in text
+
+def test_metrics_endpoint_listens_on_loopback_by_default():
+    publisher = MetricsPublisher(Metrics(), port=0)
+    try:
+        assert publisher._server.server_address[0] == "127.0.0.1"
+    finally:
+        publisher._server.server_close()
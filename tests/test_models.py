@@ -0,0 +1,65 @@
+import pickle
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from parsers.company_profile_parser import extract_company_profile, parse_company_profile
+from parsers.models import NO_PROJECT, CompanyRecord, parse_integer, parse_number
+from parsers.reviews_parser import extract_reviews, parse_reviews
+from pipelines.normalization import normalize_company_data
+
+URL = "https://clutch.co/profile/acme"
+
+HTML = """
+<html><head><meta property="og:title" content="Acme"></head><body>
+<div itemscope itemtype="http://schema.org/PostalAddress">
+  <span itemprop="addressLocality">Paris</span><span itemprop="addressCountry">FR</span>
+</div>
+<div itemscope itemtype="http://schema.org/Review">
+  <span itemprop="name">Great</span><span itemprop="datePublished">2024-01-02</span>
+  <div itemprop="reviewRating"><span itemprop="ratingValue">5</span></div>
+  <p itemprop="reviewBody">Solid work.</p><span itemprop="author">Jo</span>
+</div>
+<div itemscope itemtype="http://schema.org/Review">
+  <span itemprop="name">Anonymous</span>
+  <div itemprop="reviewRating"><span itemprop="ratingValue">4</span></div>
+</div>
+</body></html>
+"""
+
+def test_model_exports_the_same_json_as_the_dict_path():
+    as_dicts = normalize_company_data(parse_company_profile(HTML, URL), parse_reviews(HTML))
+    record = normalize_company_data(extract_company_profile(HTML, URL), extract_reviews(HTML))
+
+    assert isinstance(record, CompanyRecord)
+    assert record.to_dict() == as_dicts
+    assert list(record.to_dict()) == list(as_dicts)
+    # A review without an author exports an empty reviewer, not a null name.
+    assert as_dicts["reviews"][1]["reviewer"] == {}
+    assert as_dicts["rating"] == {"totalReview": "2", "overallRating": "4.5"}
+
+def test_model_round_trips_through_dict_and_pickle():
+    record = normalize_company_data(extract_company_profile(HTML, URL), extract_reviews(HTML))
+
+    assert CompanyRecord.from_dict(record.to_dict()) == record
+    restored = pickle.loads(pickle.dumps(record))
+    assert restored == record
+    assert restored.reviews[0].project is NO_PROJECT
+
+def test_parse_number_reads_thousands_and_decimal_commas():
+    assert parse_number("4.9") == 4.9
+    assert parse_number("1,024 reviews") == 1024.0
+    assert parse_number("$1,000,000+") == 1_000_000.0
+    assert parse_number("4,5") == 4.5
+    assert parse_number("Rating: 4,75 / 5") == 4.75
+    assert parse_number("1.234,5") == 1234.5
+    assert parse_number("1,234.5") == 1234.5
+    assert parse_number("1,2345") is None
+    assert parse_number("n/a") is None
+    assert parse_number(3) == 3
+    assert parse_integer("12,000 employees") == 12000
@@ -0,0 +1,102 @@
+import html
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+pytest.importorskip("lxml")
+
+from parsers.company_profile_parser import parse_company_profile
+from parsers.reviews_parser import parse_reviews
+from test_parsers import SAMPLE_HTML
+
+REVIEW_CARDS_HTML = """
+<html><head><title>Cards</title></head>
+<body>
+  <div class="provider-heading"><h2> Build <b>better</b>&nbsp;software </h2></div>
+  <div class="summary-description">
+    First line. <!-- hidden note --> <script>var x = "Founded 1900";</script>
+    <span>Second&amp;line.</span>
+  </div>
+  <p>  Founded 2015  </p>
+  <a href="https://clutch.co/internal">internal</a>
+  <a href="https://vendor.example.com">site</a>
+  <div class="review-card">
+    <h3>Solid partner</h3>
+    <time>Mar 1, 2024</time>
+    <div class="stars" data-rating="4.5">*****</div>
+    <p class="review-text">They <em>delivered</em> on time.</p>
+    <span class="reviewer-name">CTO, Acme</span>
+  </div>
+  <div class="review">
+    <h2>Okay</h2>
+    <span class="rating">3</span>
+    <div class="content">Fine.</div>
+  </div>
+</body></html>
+"""
+
+def _page_from_record(record):
+    """Render a sample_output.json-style record back into profile HTML."""
+    summary = record["summary"]
+    esc = lambda value: html.escape(value or "", quote=True)  # noqa: E731
+    addresses = "".join(
+        f"""
+        <div itemscope itemtype="http://schema.org/PostalAddress">
+          <span itemprop="streetAddress">{esc(a["streetAddress"])}</span>
+          <span itemprop="addressLocality">{esc(a["locality"])}</span>
+          <span itemprop="addressRegion">{esc(a["region"])}</span>
+          <span itemprop="addressCountry">{esc(a["country"])}</span>
+          <span itemprop="postalCode">{esc(a["postalCode"])}</span>
+        </div>"""
+        for a in record["addresses"]
+    )
+    return f"""<!DOCTYPE html>
+<html><head>
+  <meta property="og:title" content="{esc(summary["name"])}">
+  <meta property="og:description" content="{esc(summary["description"])}">
+  <meta property="og:image" content="{esc(summary["logo"])}">
+  <meta property="og:url" content="{esc(record["profileURL"])}">
+</head><body>
+  <h1>{esc(summary["name"])}</h1>
+  <div class="summary__tagline">{esc(summary["tagLine"])}</div>
+  <div itemscope itemtype="http://schema.org/AggregateRating">
+    <span itemprop="ratingValue">{esc(summary["rating"])}</span>
+    <span itemprop="reviewCount">{esc(summary["totalReview"])}</span>
+  </div>
+  <ul><li>{esc(summary["founded"])}</li></ul>
+  {addresses}
+  <a href="{esc(record["websiteUrl"])}">Visit website</a>
+</body></html>"""
+
+def _fixtures():
+    pages = [SAMPLE_HTML, REVIEW_CARDS_HTML, ""]
+    records = json.loads((ROOT / "data" / "sample_output.json").read_text("utf-8"))
+    pages.extend(_page_from_record(record) for record in records)
+    return pages
+
+@pytest.mark.parametrize("page_html", _fixtures())
+def test_lxml_backend_matches_html_parser(page_html):
+    url = "https://clutch.co/profile/fixture"
+
+    expected_profile = parse_company_profile(page_html, url, backend="html.parser")
+    expected_reviews = parse_reviews(page_html, backend="html.parser")
+
+    assert parse_company_profile(page_html, url, backend="lxml") == expected_profile
+    assert parse_reviews(page_html, backend="lxml") == expected_reviews
+
+def test_sample_output_page_round_trips():
+    record = json.loads((ROOT / "data" / "sample_output.json").read_text("utf-8"))[0]
+    data = parse_company_profile(_page_from_record(record), "x", backend="lxml")
+
+    assert data["summary"]["tagLine"] == record["summary"]["tagLine"]
+    assert data["summary"]["founded"] == record["summary"]["founded"]
+    assert data["addresses"][0]["postalCode"] == record["addresses"][0]["postalCode"]
+    assert data["websiteUrl"] == record["websiteUrl"]
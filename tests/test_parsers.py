@@ -10,6 +10,7 @@ if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
 from parsers.company_profile_parser import parse_company_profile
+from parsers.document import ParsedPage
 from parsers.reviews_parser import parse_reviews
 
 SAMPLE_HTML = """
@@ -72,4 +73,46 @@ def test_reviews_parser_schema_org():
     assert r["datePublished"] == "2024-01-01"
     assert r["review"]["rating"] == 5.0
     assert "happy with the collaboration" in (r["review"]["review"] or "")
-    assert r["reviewer"]["name"] == "Jane Doe"
\ No newline at end of file
+    assert r["reviewer"]["name"] == "Jane Doe"
+
+def test_parsers_accept_shared_parsed_page():
+    url = "https://clutch.co/profile/example-company"
+    page = ParsedPage(SAMPLE_HTML)
+
+    assert parse_company_profile(page, url) == parse_company_profile(SAMPLE_HTML, url)
+    assert parse_reviews(page) == parse_reviews(SAMPLE_HTML)
+    assert page.first_itemtype("http://schema.org/Review") is not None
+
+SCOPED_HTML = """
+<html><head>
+<meta property="og:title" content=""><meta property="og:title" content="Ignored">
+</head><body>
+<span itemprop="ratingValue">9</span>
+<div itemtype="http://schema.org/AggregateRating">
+  <b itemprop="reviewCount">12</b><i itemprop="ratingValue">4.8</i>
+</div>
+<h2>Not a tagline</h2>
+<section class="provider-heading"><div><h2>Tag <b>line</b></h2></div></section>
+<!-- Founded 1999 --><p>Founded 2000</p>
+<div itemtype="http://schema.org/PostalAddress">
+  <span itemprop="addressLocality">Outer</span>
+  <div itemtype="http://schema.org/PostalAddress">
+    <span itemprop="addressLocality">Inner</span>
+  </div>
+</div>
+<a href="https://clutch.co/x">internal</a><a href="http://vendor.example">site</a>
+<h1>Head<span>line</span></h1>
+</body></html>
+"""
+
+def test_single_pass_profile_extraction_keeps_lookup_rules():
+    data = parse_company_profile(SCOPED_HTML, "https://clutch.co/profile/scoped")
+    summary = data["summary"]
+
+    # The first og:title tag wins even when its content is empty.
+    assert summary["name"] == "Headline"
+    assert (summary["rating"], summary["totalReview"]) == ("4.8", "12")
+    assert summary["tagLine"] == "Tagline"
+    assert summary["founded"] == "Founded 1999"
+    assert [a["locality"] for a in data["addresses"]] == ["Outer", "Inner"]
+    assert data["websiteUrl"] == "http://vendor.example"
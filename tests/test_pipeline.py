@@ -0,0 +1,148 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from pipelines.concurrency import run_pipeline
+
+def _fetch(url):
+    # Later URLs finish first so completion order differs from input order.
+    time.sleep(0.01 * (5 - int(url.rsplit("/", 1)[-1])))
+    if url.endswith("/3"):
+        return None
+    return f"<html>{url}</html>"
+
+def _parse(html, url):
+    if url.endswith("/4"):
+        raise ValueError("broken page")
+    return {"profileURL": url, "length": len(html)}
+
+def test_pipeline_reports_failures_and_preserves_order():
+    urls = [f"https://clutch.co/profile/{i}" for i in range(5)]
+    results = list(
+        run_pipeline(urls, _fetch, _parse, fetch_workers=4, max_in_flight=3, ordered=True)
+    )
+
+    assert [r.url for r in results] == urls
+    assert [r.ok for r in results] == [True, True, True, False, False]
+    assert results[0].record["profileURL"] == urls[0]
+
+def test_pipeline_unordered_yields_every_url():
+    urls = [f"https://clutch.co/profile/{i}" for i in range(5)]
+    results = list(run_pipeline(urls, _fetch, _parse, fetch_workers=2))
+
+    assert sorted(r.index for r in results) == list(range(5))
+    assert sum(r.ok for r in results) == 3
+
+def test_pipeline_runs_coroutine_fetchers_on_event_loop():
+    import asyncio
+
+    closed = []
+
+    async def fetch(url):
+        await asyncio.sleep(0.01)
+        return None if url.endswith("/3") else f"<html>{url}</html>"
+
+    async def cleanup():
+        closed.append(True)
+
+    urls = [f"https://clutch.co/profile/{i}" for i in range(4)]
+    results = list(
+        run_pipeline(
+            urls, fetch, _parse, fetch_workers=50, ordered=True, fetch_cleanup=cleanup
+        )
+    )
+
+    assert [r.url for r in results] == urls
+    assert [r.ok for r in results] == [True, True, True, False]
+    assert closed == [True]
+
+def _parse_crashing_in_worker(html, url):
+    import multiprocessing
+    import os
+
+    if url.endswith("/2") and multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return _parse(html, url)
+
+def test_pipeline_process_pool_retries_crashed_chunks_in_process():
+    urls = [f"https://clutch.co/profile/{i}" for i in range(6)]
+    results = list(
+        run_pipeline(
+            urls,
+            lambda url: f"<html>{url}</html>",
+            _parse_crashing_in_worker,
+            fetch_workers=2,
+            ordered=True,
+            parse_workers=2,
+            parse_batch_size=2,
+        )
+    )
+
+    assert [r.url for r in results] == urls
+    # /4 raises inside its worker; /2 kills its worker but is re-parsed here.
+    assert [r.ok for r in results] == [True, True, True, True, False, True]
+
+def _parse_unpicklable_in_worker(html, url):
+    import multiprocessing
+    import threading
+
+    record = _parse(html, url)
+    if url.endswith("/1") and multiprocessing.parent_process() is not None:
+        # Cannot be sent back to the parent process.
+        record["lock"] = threading.Lock()
+    return record
+
+class _ReadOnlyCache:
+    def lookup(self, url, html):
+        return None
+
+    def store(self, url, html, record):
+        raise OSError("attempt to write a readonly database")
+
+def test_pipeline_process_pool_retries_failed_chunks_and_survives_cache_errors():
+    urls = [f"https://clutch.co/profile/{i}" for i in range(6)]
+    results = list(
+        run_pipeline(
+            urls,
+            lambda url: f"<html>{url}</html>",
+            _parse_unpicklable_in_worker,
+            fetch_workers=2,
+            ordered=True,
+            parse_workers=2,
+            parse_batch_size=2,
+            record_cache=_ReadOnlyCache(),
+        )
+    )
+
+    assert [r.url for r in results] == urls
+    assert [r.ok for r in results] == [True, True, True, True, False, True]
+    assert "lock" not in results[1].record
+
+class _BrokenCache:
+    def lookup(self, url, html):
+        if url.endswith("/2"):
+            raise OSError("disk I/O error")
+        return None
+
+    def store(self, url, html, record):
+        pass
+
+def test_pipeline_raises_when_a_stage_fails_instead_of_hanging():
+    urls = [f"https://clutch.co/profile/{i}" for i in range(20)]
+    with pytest.raises(OSError, match="disk I/O error"):
+        for _ in run_pipeline(
+            urls,
+            lambda url: f"<html>{url}</html>",
+            _parse,
+            fetch_workers=2,
+            record_cache=_BrokenCache(),
+        ):
+            pass
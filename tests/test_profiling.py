@@ -0,0 +1,70 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from utils.profiling import Profiler
+
+def _busy_in_thread():
+    done = []
+
+    def work():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        done.append(True)
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+    # The thread must really run under the profiler, not die at startup.
+    assert done
+
+def test_cpu_profile_covers_worker_threads_and_slow_urls(tmp_path):
+    profiler = Profiler("cpu", memory=True, top=10, slow_urls=2)
+    with profiler:
+        _busy_in_thread()
+        junk = [bytes(1024) for _ in range(100)]
+    for i, seconds in enumerate((0.5, 2.0, 1.0)):
+        profiler.slow_urls.add(f"https://clutch.co/profile/{i}", seconds, 0.1, 1000, 3)
+
+    report_path = tmp_path / "run.profile.txt"
+    profiler.write_report(report_path)
+    report = report_path.read_text()
+
+    assert "work" in report
+    assert "Peak traced memory" in report
+    assert report.index("profile/1") < report.index("profile/2")
+    assert "profile/0" not in report
+    assert (tmp_path / "run.profile.pstats").exists()
+    assert junk
+
+def test_sampling_profile_reports_busy_threads(tmp_path):
+    with Profiler("sample") as profiler:
+        _busy_in_thread()
+
+    profiler.write_report(tmp_path / "run.profile.txt")
+    assert "(work)" in (tmp_path / "run.profile.txt").read_text()
+
+def test_cpu_profile_leaves_threads_running_past_stop_alone(tmp_path):
+    release = threading.Event()
+    results = []
+    original_start = threading.Thread.start
+    profiler = Profiler("cpu")
+    with profiler:
+        worker = threading.Thread(target=lambda: results.append(release.wait(5)), daemon=True)
+        worker.start()
+        _busy_in_thread()
+    release.set()
+    worker.join(5)
+
+    assert results == [True]
+    assert threading.Thread.start is original_start
+    profiler.write_report(tmp_path / "run.profile.txt")
+    assert "work" in (tmp_path / "run.profile.txt").read_text()
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from clutch_client import ClutchClient
+from test_http_cache import FakeResponse, FakeSession
+from utils.retry import AimdRateController, RetryPolicy, parse_retry_after
+
+def test_backoff_grows_exponentially_and_honours_retry_after():
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=8.0, jitter=0.0)
+
+    assert [policy.backoff(n) for n in range(1, 6)] == [1.0, 2.0, 4.0, 8.0, 8.0]
+    assert policy.backoff(1, retry_after=3.0) == 3.0
+    assert 0.5 <= RetryPolicy(backoff_base=1.0, jitter=0.5).backoff(1) <= 1.0
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+def test_client_gives_up_on_404_but_retries_503():
+    client = ClutchClient(retry_policy=RetryPolicy(backoff_base=0.0, jitter=0.0))
+    client.session = FakeSession([FakeResponse(404)])
+    assert client.fetch_profile("https://clutch.co/profile/gone") is None
+    assert len(client.session.requests) == 1
+
+    controller = AimdRateController(initial_rate=1000.0, cooldown=0.0)
+    client.rate_controller = controller
+    client.session = FakeSession(
+        [FakeResponse(503, headers={"Retry-After": "0"}), FakeResponse(200, "<html/>")]
+    )
+    assert client.fetch_profile("https://clutch.co/profile/busy") == "<html/>"
+    assert len(client.session.requests) == 2
+    assert controller.rate < 1000.0
+
+def test_aimd_decreases_multiplicatively_and_recovers_additively():
+    controller = AimdRateController(initial_rate=10.0, min_rate=1.0, max_rate=12.0, cooldown=60.0)
+    controller.on_throttle()
+    controller.on_throttle()  # within the cooldown: counted once
+    assert controller.rate == 5.0
+
+    for _ in range(1000):
+        controller.on_success()
+    assert controller.rate == 12.0
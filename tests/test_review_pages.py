@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from main import process_html
+from parsers.reviews_parser import review_page_urls
+from pipelines.review_pages import HarvestedProfile, ReviewHarvester
+
+URL = "https://clutch.co/profile/example-company"
+
+def _review(name, rating):
+    return f"""
+  <div itemtype="http://schema.org/Review">
+    <span itemprop="name">{name}</span>
+    <div itemprop="reviewRating"><span itemprop="ratingValue">{rating}</span></div>
+  </div>"""
+
+PAGES = {
+    URL: "<html><body>"
+    + _review("First", 5)
+    + '<a href="/profile/example-company?page=1#reviews">2</a>'
+    + '<a href="/profile/example-company?sort=new&amp;page=2">3</a>'
+    + "</body></html>",
+    URL + "?page=1": "<html><body>" + _review("Second", 3) + _review("First", 5) + "</body></html>",
+    URL + "?page=2": "<html><body>" + _review("Third", 4) + "</body></html>",
+}
+
+def test_review_page_urls_follow_pagination_links_up_to_the_cap():
+    html = PAGES[URL]
+
+    assert review_page_urls(html, URL, max_pages=20) == [URL + "?page=1", URL + "?page=2"]
+    assert review_page_urls(html, URL, max_pages=2) == [URL + "?page=1"]
+    assert review_page_urls(html, URL + "?page=1", max_pages=20) == [URL + "?page=2"]
+    assert review_page_urls("<html></html>", URL, max_pages=20) == []
+
+def test_links_to_other_paginated_pages_are_not_review_pages():
+    html = (
+        '<a href="/directory/web-developers?page=57">Directory</a>'
+        '<a href="https://example.com/profile/example-company?page=9">Elsewhere</a>'
+    )
+
+    assert review_page_urls(html, URL, max_pages=20) == []
+    assert review_page_urls(html + PAGES[URL], URL, max_pages=20) == [
+        URL + "?page=1",
+        URL + "?page=2",
+    ]
+
+def test_harvested_reviews_are_deduplicated_and_counted_in_aggregates():
+    harvester = ReviewHarvester(PAGES.get, max_pages=10)
+    try:
+        document = harvester.fetch(URL)
+    finally:
+        harvester.close()
+
+    assert isinstance(document, HarvestedProfile)
+    assert document.pages == 3
+    record = process_html(document, URL).to_dict()
+    assert [r["name"] for r in record["reviews"]] == ["First", "Second", "Third"]
+    assert record["rating"] == {"overallRating": "4.0", "totalReview": "3"}
+
+def test_harvester_async_matches_sync():
+    import asyncio
+
+    async def fetch(url):
+        await asyncio.sleep(0)
+        return PAGES.get(url)
+
+    harvester = ReviewHarvester(fetch, max_pages=10)
+    try:
+        document = asyncio.run(harvester.fetch_async(URL))
+    finally:
+        harvester.close()
+
+    assert [r.name for r in document.reviews] == ["Second", "First", "Third"]
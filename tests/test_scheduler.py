@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from pipelines.scheduler import RefreshScheduler, change_rate
+
+DAY = 86400.0
+URLS = [f"https://clutch.co/profile/company-{i}" for i in range(6)]
+
+def _record(i, version, reviews=3):
+    return {
+        "profileURL": URLS[i],
+        "summary": {"name": f"Company {i} v{version}", "totalReview": str(reviews)},
+    }
+
+def test_change_rate_estimates_poisson_changes_from_revisits():
+    assert change_rate(0, 0, 0.0) is None
+    assert change_rate(10, 0, 10 * DAY) == 0.0
+    # Changing at every daily revisit means more than one change a day.
+    assert change_rate(10, 10, 10 * DAY) * DAY > 1.0
+    assert 0.5 < change_rate(10, 5, 10 * DAY) * DAY < 1.0
+
+def test_plan_prefers_profiles_likely_to_have_changed(tmp_path):
+    with RefreshScheduler(tmp_path / "schedule.db") as scheduler:
+        # Ten daily fetches: company-0 changes every time, company-1 never,
+        # company-2 gains five reviews a day, company-3 keeps failing.
+        for day in range(10):
+            now = day * DAY
+            scheduler.record(URLS[0], _record(0, day), now)
+            scheduler.record(URLS[1], _record(1, 0), now)
+            scheduler.record(URLS[2], _record(2, 0, reviews=3 + day * 5), now)
+            scheduler.record(URLS[3], _record(3, 0) if day == 0 else None, now)
+        assert (scheduler.changed, scheduler.unchanged, scheduler.failed) == (18, 9, 9)
+
+        plan = scheduler.plan(URLS, budget=4, now=10 * DAY)
+        # company-4 and company-5 were never fetched; the failing one is last.
+        assert plan == [URLS[4], URLS[5], URLS[2], URLS[0]]
+        assert scheduler.plan(URLS, budget=10, now=10 * DAY)[-2:] == [URLS[1], URLS[3]]
+        assert scheduler.plan(URLS, budget=0, now=10 * DAY) == []
+
+    # History survives between runs; recently fetched profiles can be held back
+    # (company-3 last succeeded on day 0).
+    with RefreshScheduler(tmp_path / "schedule.db", min_age_hours=48) as scheduler:
+        assert scheduler.plan(URLS, budget=10, now=10 * DAY) == [URLS[4], URLS[5], URLS[3]]
@@ -0,0 +1,69 @@
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from main import process_html
+from pipelines.service import ScrapeService, ServiceBusy, make_server
+from test_parsers import SAMPLE_HTML
+
+URL = "https://clutch.co/profile/example-company"
+
+def _fetch(url):
+    return SAMPLE_HTML if url == URL else None
+
+def test_jobs_beyond_the_queue_are_refused():
+    service = ScrapeService(_fetch, process_html, job_workers=1, max_queued_jobs=1)
+    running = service.submit([URL])
+    waiting = service.submit([URL + "/?utm_source=x"])
+    with pytest.raises(ServiceBusy):
+        service.submit([URL])
+
+    assert waiting.urls == [URL]
+    waiting.close()  # gives up its place without running
+    results = list(running)
+    assert [r.ok for r in results] == [True]
+    assert service.status()["queued"] == 0
+    service.submit([URL]).close()
+
+    with pytest.raises(ValueError):
+        service.submit([])
+
+def test_http_api_streams_records_then_a_summary():
+    service = ScrapeService(_fetch, process_html, max_job_urls=5)
+    server = make_server(service, "127.0.0.1:0")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        body = json.dumps({"urls": [URL, "https://clutch.co/profile/gone"], "ordered": True})
+        request = urllib.request.Request(base + "/jobs", data=body.encode("utf-8"))
+        with urllib.request.urlopen(request) as response:
+            assert response.headers["Content-Type"] == "application/x-ndjson"
+            lines = [json.loads(line) for line in response]
+
+        assert lines[0]["url"] == URL
+        assert lines[0]["record"]["profileURL"] == URL
+        assert "error" in lines[1]
+        assert lines[2]["summary"]["records"] == 1
+
+        too_many = json.dumps([f"{URL}-{i}" for i in range(6)]).encode("utf-8")
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(urllib.request.Request(base + "/jobs", data=too_many))
+        assert error.value.code == 400
+
+        with urllib.request.urlopen(base + "/health") as response:
+            assert json.loads(response.read())["completed"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
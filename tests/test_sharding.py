@@ -0,0 +1,63 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from pipelines.exporters import open_exporter
+from pipelines.sharding import Shard, merge_outputs, parse_shard, shard_of, shard_urls
+
+URLS = [f"https://clutch.co/profile/company-{i}" for i in range(200)]
+
+def test_shards_partition_urls_by_profile():
+    shards = [parse_shard(f"{k}/4") for k in range(1, 5)]
+    owned = [list(shard_urls(URLS, shard)) for shard in shards]
+
+    assert sorted(sum(owned, [])) == sorted(URLS)
+    assert all(len(urls) > 20 for urls in owned)
+    url = URLS[7]
+    assert shard_of(url + "/?utm_source=x#reviews", 4) == shard_of(url, 4)
+    # Fixed for good: nodes and later runs must agree on the assignment.
+    assert [shard_of(u, 4) for u in URLS[:6]] == [2, 4, 1, 2, 4, 3]
+    assert Shard(1, 1).owns(url)
+
+@pytest.mark.parametrize("spec", ["0/4", "5/4", "4", "a/b", "1/0"])
+def test_invalid_shards_are_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
+
+def test_merge_keeps_the_last_record_of_each_profile(tmp_path):
+    first = tmp_path / "shard1.json"
+    second = tmp_path / "shard2.jsonl.gz"
+    with open_exporter(first) as exporter:
+        for i in (3, 1, 2, 1):
+            exporter.write({"profileURL": URLS[i], "summary": {"name": f"old {i}"}})
+    with open_exporter(second) as exporter:
+        for i in (2, 0):
+            exporter.write({"profileURL": URLS[i] + "/", "summary": {"name": f"new {i}"}})
+
+    out = tmp_path / "merged.jsonl"
+    assert merge_outputs([first, second], out, run_size=2) == 4
+
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["summary"]["name"] for r in records] == ["new 0", "old 1", "new 2", "old 3"]
+
+def test_merge_bounds_the_runs_open_at_once(tmp_path):
+    shard = tmp_path / "shard.jsonl"
+    with open_exporter(shard) as exporter:
+        for version in range(3):
+            for i in (2, 0, 3, 1):
+                exporter.write({"profileURL": URLS[i], "summary": {"name": f"v{version} {i}"}})
+
+    out = tmp_path / "merged.jsonl"
+    # Twelve one-record runs merged three at a time: two intermediate passes.
+    assert merge_outputs([shard], out, run_size=1, fan_in=3) == 4
+
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["summary"]["name"] for r in records] == ["v2 0", "v2 1", "v2 2", "v2 3"]
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure src/ is importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+pytest.importorskip("lxml")
+
+from clutch_client import ClutchClient
+from main import process_html
+from parsers.streaming import PageStream, StreamedPage
+from test_parsers import SAMPLE_HTML
+
+URL = "https://clutch.co/profile/example-company"
+PAGE = SAMPLE_HTML.replace("</body>", "<footer>" + "x" * 5000 + "</footer></body>")
+
+class StreamingResponse:
+    status_code = 200
+    encoding = "utf-8"
+    headers = {}
+
+    def __init__(self, body):
+        self.body = body
+        self.chunks_read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            self.chunks_read += 1
+            yield self.body[i : i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+class StreamingSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        assert stream
+        return self.response
+
+def _stream(body, chunk_size, markers=()):
+    stream = PageStream("utf-8", markers)
+    for i in range(0, len(body), chunk_size):
+        if stream.feed(body[i : i + chunk_size]):
+            break
+    return stream.close()
+
+def test_streamed_page_parses_like_the_whole_document():
+    body = PAGE.encode("utf-8")
+    document = _stream(body, 7)
+
+    assert document.size == len(body)
+    assert not document.truncated
+    assert process_html(document, URL).to_dict() == process_html(PAGE, URL, "lxml").to_dict()
+
+def test_stop_marker_split_across_chunks_ends_the_stream():
+    body = PAGE.encode("utf-8")
+    document = _stream(body, 3, [b"<footer"])
+
+    assert document.truncated
+    assert document.size < len(body)
+    assert process_html(document, URL).to_dict() == process_html(PAGE, URL).to_dict()
+
+def test_client_stops_reading_at_a_stop_marker():
+    response = StreamingResponse(PAGE.encode("utf-8"))
+    client = ClutchClient(stream=True, stream_stop_markers=("<footer",), stream_chunk_size=256)
+    client.session = StreamingSession(response)
+
+    document = client.fetch_profile(URL)
+
+    assert isinstance(document, StreamedPage)
+    assert document.truncated and response.closed
+    assert response.chunks_read < len(response.body) / 256
+    assert process_html(document, URL).summary()["name"] == "Example Company"